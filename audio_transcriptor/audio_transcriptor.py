@@ -1,13 +1,28 @@
 import os
+import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import speech_recognition as sr
-import threading
 import wave
 import contextlib
-from pydub import AudioSegment
-import whisper
 import tempfile
+import time
+
+# Make the shared transcriptor_core package importable when run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from transcriptor_core.presets import DECODE_PRESETS, DEFAULT_FILE_PRESET
+from transcriptor_core.lazy_import import warm_imports
+from transcriptor_core.engines import ENGINES, FILE_WHISPER_ENGINES, EngineError, create_engine, engine_uses_torch
+from transcriptor_core.file_jobs import run_file_job
+from transcriptor_core.cascade import cascade_summary
+from transcriptor_core.keyword_spotting import parse_keyphrases, format_hits
+from transcriptor_core.language_id import LANGUAGE_CHOICES
+from transcriptor_core.search_index import index_result, format_ms
+from transcriptor_core.service_client import find_service, run_remote_file_job
+from transcriptor_core.workers import submit_cpu_job
+from transcriptor_core.cancellation import CancelToken, JobCancelled
+from transcriptor_core import tracing
+from transcriptor_core.config import load_config, remember_model
+from transcriptor_core.quantize import quantized_name, split_quantized
 
 # Custom color scheme
 COLORS = {
@@ -22,81 +37,89 @@ COLORS = {
 }
 
 class AudioTranscriptorApp:
-    def __init__(self, root):
+    def __init__(self, root, container=None):
         self.root = root
-        self.root.title("Audio Transcriptor")
-        self.root.geometry("600x700")
-        self.root.resizable(True, True)
-        self.root.configure(bg=COLORS["white"])
+        # When hosted by the launcher the tool lives in a frame of its window
+        self.container = container or root
+        if container is None:
+            self.root.title("Audio Transcriptor")
+            self.root.geometry("600x700")
+            self.root.resizable(True, True)
+            self.root.configure(bg=COLORS["white"])
         
         self.audio_path = ""
         self.output_path = ""
         self.is_processing = False
+        self.cancel_token = None  # The running job's; the button cancels it
         
         # Recognition engine selection
         self.engine_var = tk.StringVar(value="whisper")
+        self.keyphrases = []  # Parsed when a keyword spotting job starts
         
         # Configure styles
         self.configure_styles()
         
         self.create_widgets()
+        
+        # Import the recognition stack in the background once the window is drawn
+        self.root.after(200, warm_imports, ["whisper", "speech_recognition", "numpy"])
     
     def configure_styles(self):
         # Create custom styles for widgets
         self.style = ttk.Style()
         
         # Configure frame styles
-        self.style.configure("Main.TFrame", background=COLORS["white"])
-        self.style.configure("Card.TFrame", background=COLORS["white"], 
+        self.style.configure("Audio.Main.TFrame", background=COLORS["white"])
+        self.style.configure("Audio.Card.TFrame", background=COLORS["white"], 
                             relief="raised", borderwidth=1)
         
         # Configure label styles
-        self.style.configure("Title.TLabel", 
+        self.style.configure("Audio.Title.TLabel", 
                             background=COLORS["white"], 
                             foreground=COLORS["primary_red"], 
                             font=("Segoe UI", 18, "bold"))
         
-        self.style.configure("Subtitle.TLabel", 
+        self.style.configure("Audio.Subtitle.TLabel", 
                             background=COLORS["white"], 
                             foreground=COLORS["secondary_red"], 
                             font=("Segoe UI", 12))
         
-        self.style.configure("Settings.TLabelframe", 
+        self.style.configure("Audio.Settings.TLabelframe", 
                             background=COLORS["white"],
                             foreground=COLORS["primary_red"])
         
-        self.style.configure("Settings.TLabelframe.Label", 
+        self.style.configure("Audio.Settings.TLabelframe.Label", 
                             background=COLORS["white"],
                             foreground=COLORS["primary_red"],
                             font=("Segoe UI", 11, "bold"))
         
-        self.style.configure("Status.TLabel", 
+        self.style.configure("Audio.Status.TLabel", 
                             background=COLORS["white"], 
                             foreground=COLORS["dark_gray"], 
                             font=("Segoe UI", 10))
                             
         # Configure button styles
-        self.style.configure("Accent.TButton", 
+        self.style.configure("Audio.Accent.TButton", 
                             font=("Segoe UI", 12, "bold"),
                             background=COLORS["secondary_red"],
                             foreground=COLORS["primary_red"])
 
-        self.style.configure("Footer.TLabel", 
+        self.style.configure("Audio.Footer.TLabel", 
                             background=COLORS["white"], 
                             foreground=COLORS["secondary_red"], 
                             font=("Segoe UI", 9))
         
     def create_widgets(self):
         # Main frame
-        main_frame = ttk.Frame(self.root, padding="20", style="Main.TFrame")
+        main_frame = ttk.Frame(self.container, padding="20", style="Audio.Main.TFrame")
         main_frame.pack(fill=tk.BOTH, expand=True)
         
         # Title
-        title_label = ttk.Label(main_frame, text="Audio Transcriptor", style="Title.TLabel")
+        title_label = ttk.Label(main_frame, text="Audio Transcriptor", style="Audio.Title.TLabel")
         title_label.pack(pady=10)
         
         # File selection frame
-        file_frame = ttk.LabelFrame(main_frame, text="Audio File Selection", padding="10", style="Settings.TLabelframe")
+        file_frame = ttk.LabelFrame(main_frame, text="Audio File Selection", padding="10", style="Audio.Settings.TLabelframe")
         file_frame.pack(fill=tk.X, pady=10)
         
         # Audio file selection
@@ -104,11 +127,11 @@ class AudioTranscriptorApp:
         file_entry = ttk.Entry(file_frame, textvariable=self.file_path_var, width=50)
         file_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         
-        browse_button = ttk.Button(file_frame, text="Browse", command=self.browse_audio, style="Accent.TButton")
+        browse_button = ttk.Button(file_frame, text="Browse", command=self.browse_audio, style="Audio.Accent.TButton")
         browse_button.pack(side=tk.RIGHT)
         
         # Output file frame
-        output_frame = ttk.LabelFrame(main_frame, text="Output File", padding="10", style="Settings.TLabelframe")
+        output_frame = ttk.LabelFrame(main_frame, text="Output File", padding="10", style="Audio.Settings.TLabelframe")
         output_frame.pack(fill=tk.X, pady=10)
         
         # Output path selection
@@ -116,11 +139,11 @@ class AudioTranscriptorApp:
         output_entry = ttk.Entry(output_frame, textvariable=self.output_path_var, width=50)
         output_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         
-        output_button = ttk.Button(output_frame, text="Browse", command=self.browse_output, style="Accent.TButton")
+        output_button = ttk.Button(output_frame, text="Browse", command=self.browse_output, style="Audio.Accent.TButton")
         output_button.pack(side=tk.RIGHT)
         
         # Engine selection frame
-        engine_frame = ttk.LabelFrame(main_frame, text="Recognition Engine", padding="10", style="Settings.TLabelframe")
+        engine_frame = ttk.LabelFrame(main_frame, text="Recognition Engine", padding="10", style="Audio.Settings.TLabelframe")
         engine_frame.pack(fill=tk.X, pady=10)
         
         # Radio buttons for engine selection
@@ -129,11 +152,13 @@ class AudioTranscriptorApp:
         whisper_radio.pack(anchor=tk.W, pady=2)
         
         # Whisper model selection frame
-        self.model_var = tk.StringVar(value="base")
-        model_frame = ttk.Frame(engine_frame, style="Main.TFrame")
+        last_model, last_quantized = split_quantized(load_config()["last_models"].get("audio", "base"))
+        self.model_var = tk.StringVar(value=last_model)
+        self.quantized_var = tk.BooleanVar(value=last_quantized)
+        model_frame = ttk.Frame(engine_frame, style="Audio.Main.TFrame")
         model_frame.pack(fill=tk.X, padx=20, pady=5)
         
-        model_label = ttk.Label(model_frame, text="Whisper Model:", style="Subtitle.TLabel")
+        model_label = ttk.Label(model_frame, text="Whisper Model:", style="Audio.Subtitle.TLabel")
         model_label.pack(side=tk.LEFT, padx=(0, 10))
         
         tiny_radio = ttk.Radiobutton(model_frame, text="Tiny (Fast)", 
@@ -148,13 +173,69 @@ class AudioTranscriptorApp:
                                      variable=self.model_var, value="small")
         small_radio.pack(side=tk.LEFT, padx=5)
         
+        # Dynamic int8 quantization of the PyTorch model (CPU only, cached on disk)
+        quantized_check = ttk.Checkbutton(model_frame, text="Quantized (int8)",
+                                         variable=self.quantized_var)
+        quantized_check.pack(side=tk.LEFT, padx=5)
+        
+        # Decode preset selection frame
+        self.preset_var = tk.StringVar(value=DEFAULT_FILE_PRESET)
+        preset_frame = ttk.Frame(engine_frame, style="Audio.Main.TFrame")
+        preset_frame.pack(fill=tk.X, padx=20, pady=5)
+        
+        preset_label = ttk.Label(preset_frame, text="Decode Preset:", style="Audio.Subtitle.TLabel")
+        preset_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        for preset_name, preset in DECODE_PRESETS.items():
+            preset_radio = ttk.Radiobutton(preset_frame, text=preset["label"],
+                                          variable=self.preset_var, value=preset_name)
+            preset_radio.pack(side=tk.LEFT, padx=5)
+        
+        # Spoken language; "auto" identifies it once from the first speech in the file
+        self.language_var = tk.StringVar(value="en")
+        language_frame = ttk.Frame(engine_frame, style="Audio.Main.TFrame")
+        language_frame.pack(fill=tk.X, padx=20, pady=5)
+        
+        language_label = ttk.Label(language_frame, text="Language:", style="Audio.Subtitle.TLabel")
+        language_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        language_combo = ttk.Combobox(language_frame, textvariable=self.language_var,
+                                      values=LANGUAGE_CHOICES, state="readonly", width=8)
+        language_combo.pack(side=tk.LEFT)
+        
+        # CTranslate2 radio (same Whisper model sizes, int8 CPU kernels)
+        ct2_radio = ttk.Radiobutton(engine_frame, text=ENGINES["whisper-ct2"].label, 
+                                   variable=self.engine_var, value="whisper-ct2")
+        ct2_radio.pack(anchor=tk.W, pady=2)
+        
+        # Cascade radio: tiny drafts everything, the selected model re-decodes the weak parts
+        cascade_radio = ttk.Radiobutton(engine_frame, text=ENGINES["whisper-cascade"].label, 
+                                       variable=self.engine_var, value="whisper-cascade")
+        cascade_radio.pack(anchor=tk.W, pady=2)
+        
         # Sphinx radio
         sphinx_radio = ttk.Radiobutton(engine_frame, text="CMU Sphinx (Offline)", 
                                       variable=self.engine_var, value="sphinx")
         sphinx_radio.pack(anchor=tk.W, pady=2)
         
+        # Keyword spotting radio: only reports where the keyphrases below occur
+        kws_radio = ttk.Radiobutton(engine_frame, text=ENGINES["sphinx-kws"].label, 
+                                   variable=self.engine_var, value="sphinx-kws")
+        kws_radio.pack(anchor=tk.W, pady=2)
+        
+        keyphrase_frame = ttk.Frame(engine_frame, style="Audio.Main.TFrame")
+        keyphrase_frame.pack(fill=tk.X, padx=20, pady=5)
+        
+        keyphrase_label = ttk.Label(keyphrase_frame, text="Keyphrases:", style="Audio.Subtitle.TLabel")
+        keyphrase_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Comma separated, each optionally with a threshold: acme widget /1e-25/, refund
+        self.keyphrases_var = tk.StringVar()
+        keyphrase_entry = ttk.Entry(keyphrase_frame, textvariable=self.keyphrases_var, width=40)
+        keyphrase_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
         # Process frame
-        process_frame = ttk.Frame(main_frame, style="Card.TFrame")
+        process_frame = ttk.Frame(main_frame, style="Audio.Card.TFrame")
         process_frame.pack(fill=tk.X, pady=10, padx=5, ipady=5)
         
         # Progress bar
@@ -164,32 +245,38 @@ class AudioTranscriptorApp:
         
         # Status label
         self.status_var = tk.StringVar(value="Ready to transcribe")
-        status_label = ttk.Label(process_frame, textvariable=self.status_var, style="Status.TLabel")
+        status_label = ttk.Label(process_frame, textvariable=self.status_var, style="Audio.Status.TLabel")
         status_label.pack(anchor=tk.W, pady=5, padx=10)
         
         # Audio info label
         self.audio_info_var = tk.StringVar(value="")
-        audio_info_label = ttk.Label(process_frame, textvariable=self.audio_info_var, style="Status.TLabel")
+        audio_info_label = ttk.Label(process_frame, textvariable=self.audio_info_var, style="Audio.Status.TLabel")
         audio_info_label.pack(anchor=tk.W, pady=5, padx=10)
         
+        # What a cancelled job leaves behind: the text decoded so far, or nothing
+        self.keep_partial_var = tk.BooleanVar(value=False)
+        keep_partial_check = ttk.Checkbutton(process_frame, text="Keep partial transcript when cancelled",
+                                             variable=self.keep_partial_var)
+        keep_partial_check.pack(anchor=tk.W, pady=5, padx=10)
+        
         # Transcribe button - made larger and more prominent
-        transcribe_frame = ttk.Frame(main_frame, style="Main.TFrame")
+        transcribe_frame = ttk.Frame(main_frame, style="Audio.Main.TFrame")
         transcribe_frame.pack(fill=tk.X, pady=10)
         
         self.transcribe_button = ttk.Button(
             transcribe_frame, 
             text="START TRANSCRIPTION", 
             command=self.start_transcription,
-            style="Accent.TButton"
+            style="Audio.Accent.TButton"
         )
         self.transcribe_button.pack(fill=tk.X, ipady=10, pady=10)
         
         # Footer
-        footer_frame = ttk.Frame(main_frame, style="Main.TFrame")
+        footer_frame = ttk.Frame(main_frame, style="Audio.Main.TFrame")
         footer_frame.pack(fill=tk.X, pady=10)
         
         footer_text = "Powered by OpenAI Whisper and CMU Sphinx • ItsAeox • 2025"
-        footer_label = ttk.Label(footer_frame, text=footer_text, style="Footer.TLabel", justify="center")
+        footer_label = ttk.Label(footer_frame, text=footer_text, style="Audio.Footer.TLabel", justify="center")
         footer_label.pack(side=tk.BOTTOM)
     
     def browse_audio(self):
@@ -237,6 +324,11 @@ class AudioTranscriptorApp:
             self.output_path = file_path
             self.output_path_var.set(file_path)
     
+    def selected_model(self):
+        # CTranslate2 weights are int8 already; the checkbox applies to the PyTorch engine
+        quantized = self.quantized_var.get() and self.engine_var.get() == "whisper"
+        return quantized_name(self.model_var.get(), quantized)
+    
     def start_transcription(self):
         if not self.audio_path:
             messagebox.showerror("Error", "Please select an audio file to transcribe.")
@@ -247,147 +339,126 @@ class AudioTranscriptorApp:
             return
         
         if self.is_processing:
+            # The same button stops the running job
+            self.cancel_transcription()
             return
         
+        if self.engine_var.get() == "sphinx-kws":
+            try:
+                self.keyphrases = parse_keyphrases(self.keyphrases_var.get())
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+        
         self.is_processing = True
-        self.transcribe_button.config(state=tk.DISABLED)
+        self.cancel_token = CancelToken()
+        self.transcribe_button.config(text="CANCEL TRANSCRIPTION")
         self.status_var.set("Starting transcription process...")
         self.progress_var.set(0)
         
-        # Start transcription in a separate thread
-        transcription_thread = threading.Thread(target=self.transcribe_audio)
-        transcription_thread.daemon = True
-        transcription_thread.start()
+        # Remember the choice so the launcher can pre-load it next time
+        if self.engine_var.get() == "whisper":
+            remember_model("audio", self.selected_model())
+        
+        # Start transcription on the shared worker pool
+        # Waits for a CPU slot when other jobs already use every core
+        submit_cpu_job(self.transcribe_audio, uses_torch=engine_uses_torch(self.engine_var.get()),
+                       on_wait=lambda: self.status_var.set("Waiting for a free CPU slot..."),
+                       cancel_token=self.cancel_token)
+    
+    def cancel_transcription(self):
+        # Takes effect at the job's next checkpoint, well within a second
+        self.cancel_token.cancel("Cancelled by user")
+        self.transcribe_button.config(state=tk.DISABLED)
+        self.status_var.set("Cancelling...")
     
     def transcribe_audio(self):
-        temp_files = []
+        job_started = time.perf_counter()
+        cancel_token = self.cancel_token
+        # Segments as they arrive, kept in case the job is cancelled part way
+        partial_segments = []
+        # Determine which engine to use
+        engine_name = self.engine_var.get()
         try:
+            # Cancelled while it waited for a CPU slot
+            cancel_token.check()
             self.status_var.set("Preparing audio...")
             self.root.update_idletasks()
             
             self.progress_var.set(10)
             
-            # Determine which engine to use
-            engine = self.engine_var.get()
+            if engine_name in FILE_WHISPER_ENGINES:
+                engine_options = {"model_name": self.selected_model(), "preset": self.preset_var.get()}
+                self.status_var.set(f"Loading Whisper {self.selected_model()} model...")
+            elif engine_name == "sphinx-kws":
+                engine_options = {"keyphrases": self.keyphrases}
+            else:
+                # Normalize audio to improve speech detection
+                engine_options = {"normalize_audio": True}
+            engine = create_engine(engine_name, **engine_options)
+            self.root.update_idletasks()
             
-            if engine == "whisper":
-                # Use Whisper for transcription
-                self.status_var.set(f"Loading Whisper {self.model_var.get()} model...")
-                self.root.update_idletasks()
-                
-                # Load the selected model
-                model = whisper.load_model(self.model_var.get())
-                
-                self.progress_var.set(30)
-                self.status_var.set("Transcribing with Whisper (this may take a few minutes)...")
-                self.root.update_idletasks()
-                
-                # Transcribe directly with Whisper - optimize for English
-                result = model.transcribe(
-                    self.audio_path,
-                    language="en",      # Specify English language
-                    task="transcribe"   # Explicitly set to transcription task
-                )
-                
-                self.progress_var.set(80)
-                self.status_var.set("Whisper transcription completed!")
-                
-                text = result["text"]
-                
-            else:  # Sphinx
-                # Initialize speech recognition with improved settings
-                recognizer = sr.Recognizer()
-                recognizer.energy_threshold = 300
-                recognizer.pause_threshold = 0.8
-                recognizer.dynamic_energy_threshold = True
-                
-                file_extension = os.path.splitext(self.audio_path)[1].lower()
-                
-                # For non-WAV files, convert to WAV first using pydub
-                temp_wav_path = None
-                
-                if file_extension != '.wav':
-                    self.status_var.set(f"Converting {file_extension} file to WAV format...")
-                    self.root.update_idletasks()
-                    
-                    try:
-                        audio = AudioSegment.from_file(self.audio_path)
-                        temp_wav_path = os.path.splitext(self.audio_path)[0] + "_temp.wav"
-                        temp_files.append(temp_wav_path)
-                        # Enhanced audio processing for better speech recognition
-                        audio = audio.set_channels(1).set_frame_rate(16000)
-                        # Normalize audio to improve speech detection
-                        audio = audio.normalize()
-                        audio.export(temp_wav_path, format="wav")
-                        
-                        # Use the temporary WAV file for transcription
-                        audio_file_path = temp_wav_path
-                    except Exception as e:
-                        raise Exception(f"Error converting audio file: {str(e)}")
+            # Load, decode and transcribe under the memory governor; very long files
+            # are decoded in chunks so one job cannot exhaust the machine's memory
+            def on_stage(message, progress):
+                self.status_var.set(message)
+                self.progress_var.set(progress)
+            
+            # A running transcription service already holds the models; hand it the job
+            service = find_service()
+            try:
+                if service is not None:
+                    result, memory_report = run_remote_file_job(service, engine_name, engine_options, self.audio_path,
+                                                                language=self.language_var.get(), on_stage=on_stage,
+                                                                on_segment=partial_segments.append,
+                                                                cancel_token=cancel_token)
                 else:
-                    # Process WAV files too for better quality
-                    try:
-                        audio = AudioSegment.from_file(self.audio_path)
-                        temp_wav_path = os.path.splitext(self.audio_path)[0] + "_processed.wav"
-                        temp_files.append(temp_wav_path)
-                        audio = audio.set_channels(1).set_frame_rate(16000)
-                        audio = audio.normalize()
-                        audio.export(temp_wav_path, format="wav")
-                        audio_file_path = temp_wav_path
-                    except:
-                        # Fall back to original file if processing fails
-                        audio_file_path = self.audio_path
-                    
-                # Load audio file
-                try:
-                    with sr.AudioFile(audio_file_path) as source:
-                        self.status_var.set("Adjusting for ambient noise...")
-                        self.root.update_idletasks()
-                        # Longer ambient noise adjustment for better baseline
-                        recognizer.adjust_for_ambient_noise(source, duration=1.0)
-                        
-                        self.status_var.set("Reading audio file...")
-                        self.root.update_idletasks()
-                        audio_data = recognizer.record(source)
-                except Exception as e:
-                    raise Exception(f"Error reading audio file: {str(e)}")
-                
-                self.progress_var.set(50)
-                self.status_var.set("Converting speech to text with Sphinx...")
-                self.root.update_idletasks()
-                
-                # Convert speech to text with Sphinx
-                text = ""
-                error_messages = []
-                
-                try:
-                    # Configure Sphinx for better accuracy with English specifically
-                    text = recognizer.recognize_sphinx(
-                        audio_data,
-                        language="en-US"  # Specify American English
-                    )
-                    self.status_var.set("CMU Sphinx completed")
-                except sr.UnknownValueError:
-                    error_messages.append("Sphinx could not understand the audio")
-                except sr.RequestError as e:
-                    error_messages.append(f"Sphinx error; {e}")
-                
-                # If we didn't get any transcription, raise an error
-                if not text:
-                    raise Exception("\n".join(error_messages))
+                    result, memory_report = run_file_job(engine, self.audio_path, language=self.language_var.get(),
+                                                         on_stage=on_stage, trace_prefix="audio",
+                                                         on_segment=partial_segments.append,
+                                                         cancel_token=cancel_token)
+            except EngineError as e:
+                raise Exception(str(e))
+            
+            self.progress_var.set(80)
+            self.status_var.set(f"{engine.label} completed!")
+            
+            if engine_name == "sphinx-kws":
+                # One "[hh:mm:ss.mmm] keyphrase" line per hit; no hits is still a result
+                hits = result["segments"]
+                text = format_hits(hits) if hits else "No keyphrases found"
+                self.status_var.set(f"Found {len(hits)} keyphrase hit(s)")
+            else:
+                text = result["text"]
+            if not text:
+                raise Exception("No speech was recognized in the audio")
             
             self.progress_var.set(90)
             self.status_var.set("Saving transcript...")
             self.root.update_idletasks()
             
             # Save transcript to file
-            with open(self.output_path, 'w', encoding='utf-8') as file:
-                file.write(text)
+            with tracing.span("audio.write", characters=len(text)):
+                with open(self.output_path, 'w', encoding='utf-8') as file:
+                    file.write(text)
+            
+            # Make the transcript searchable by phrase, with segment times
+            if engine_name != "sphinx-kws":
+                index_result(self.audio_path, result, self.output_path, engine.describe(), memory_report["duration"])
             
             self.progress_var.set(100)
-            self.status_var.set("Transcription completed successfully!")
+            self.status_var.set(f"Transcription completed successfully! "
+                                f"(language {memory_report['language']}, "
+                                f"process peak memory {memory_report['peak_rss_mb']:.0f} MB)")
+            if "cascade" in result:
+                # How much of the audio needed the larger model
+                self.status_var.set(f"Transcription completed successfully! ({cascade_summary(result)})")
             messagebox.showinfo("Success", f"Transcription completed and saved to:\n{self.output_path}")
             
+        except JobCancelled:
+            self.progress_var.set(0)
+            self.finish_cancelled(engine_name, partial_segments)
+            
         except Exception as e:
             error_message = f"Error: {str(e)}"
             print(f"Transcription error: {error_message}")
@@ -395,17 +466,35 @@ class AudioTranscriptorApp:
             messagebox.showerror("Error", f"An error occurred during transcription:\n{str(e)}")
         
         finally:
-            # Clean up temporary files
-            for temp_file in temp_files:
-                if temp_file and os.path.exists(temp_file):
-                    try:
-                        os.remove(temp_file)
-                    except:
-                        print(f"Warning: Could not delete temporary file: {temp_file}")
-                    
+            tracing.add_span("transcribe_audio", job_started, time.perf_counter(),
+                             file=os.path.basename(self.audio_path))
             self.is_processing = False
-            self.transcribe_button.config(state=tk.NORMAL)
+            self.transcribe_button.config(text="START TRANSCRIPTION", state=tk.NORMAL)
             self.root.update_idletasks()
+    
+    def finish_cancelled(self, engine_name, segments):
+        # Nothing is written for a cancelled job unless the partial text is wanted;
+        # it is never indexed, so search only ever finds complete transcripts
+        if not segments:
+            self.status_var.set("Transcription cancelled")
+            return
+        if not self.keep_partial_var.get():
+            self.status_var.set(f"Transcription cancelled; discarded {len(segments)} partial segment(s)")
+            return
+        
+        if engine_name == "sphinx-kws":
+            text = format_hits(segments)
+        else:
+            text = "".join(segment["text"] for segment in segments).strip()
+        reached = format_ms(segments[-1]["end"] * 1000)
+        try:
+            with open(self.output_path, 'w', encoding='utf-8') as file:
+                file.write(text)
+                file.write(f"\n\n[Transcription cancelled at {reached}]\n")
+        except OSError as e:
+            self.status_var.set(f"Transcription cancelled; could not save the partial transcript: {e}")
+            return
+        self.status_var.set(f"Transcription cancelled; partial transcript up to {reached} saved to {self.output_path}")
 
 def main():
     root = tk.Tk()
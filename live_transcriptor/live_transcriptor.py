@@ -1,17 +1,30 @@
 import os
+import sys
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import threading
 import queue
-import tempfile
 import time
-import speech_recognition as sr
-from pydub import AudioSegment
-import whisper
-import numpy as np
 import pyaudio
-import wave
-import contextlib
+
+# Make the shared transcriptor_core package importable when run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from transcriptor_core.session_recorder import SessionRecorder
+from transcriptor_core.live_pipeline import SilenceSegmenter, pcm_to_float, transcribe_pcm
+from transcriptor_core.ingest_server import IngestServer, DEFAULT_PORT
+from transcriptor_core.batch_scheduler import BatchScheduler
+from transcriptor_core.latency import LatencyTracker
+from transcriptor_core.capture_sources import MicrophoneSource
+from transcriptor_core.presets import DECODE_PRESETS, DEFAULT_LIVE_PRESET
+from transcriptor_core.engines import ENGINES, WHISPER_ENGINES, create_engine
+from transcriptor_core.keyword_spotting import format_offset
+from transcriptor_core.language_id import AUTO_LANGUAGE, FALLBACK_LANGUAGE, LANGUAGE_CHOICES, LanguageDetector
+from transcriptor_core.search_index import index_session
+from transcriptor_core.service_client import RemoteEngine, find_service
+from transcriptor_core.cancellation import CancelToken, JobCancelled, cancel_scope, wait_future
+from transcriptor_core.config import load_config, remember_model
+from transcriptor_core.quantize import quantized_name, split_quantized
+from transcriptor_core import tracing
 
 # Custom color scheme
 COLORS = {
@@ -26,16 +39,21 @@ COLORS = {
 }
 
 class LiveTranscriptorApp:
-    def __init__(self, root):
+    def __init__(self, root, capture_source=None, container=None):
         self.root = root
-        self.root.title("Live Voice Transcriptor")
-        self.root.geometry("750x850")
-        self.root.resizable(True, True)
-        self.root.configure(bg=COLORS["white"])
+        # When hosted by the launcher the tool lives in a frame of its window
+        self.container = container or root
+        if container is None:
+            self.root.title("Live Voice Transcriptor")
+            self.root.geometry("750x850")
+            self.root.resizable(True, True)
+            self.root.configure(bg=COLORS["white"])
         
         # Recording state
         self.is_recording = False
         self.is_transcribing = False
+        # Cancelled to drop a session's pending audio, or when the window closes
+        self.session_token = None
         self.audio_queue = queue.Queue()
         self.transcription_queue = queue.Queue()
         
@@ -48,17 +66,44 @@ class LiveTranscriptorApp:
         self.SILENCE_DURATION = 1.5  # Seconds of silence to trigger processing
         
         # For continuous recording
-        self.frames = []
-        self.silence_frames = 0
-        self.max_silence_frames = int(self.RATE / self.CHUNK * self.SILENCE_DURATION)
+        self.segmenter = SilenceSegmenter(
+            rate=self.RATE,
+            chunk=self.CHUNK,
+            silence_threshold=self.SILENCE_THRESHOLD,
+            silence_duration=self.SILENCE_DURATION,
+            channels=self.CHANNELS
+        )
         
         # PyAudio instance
         self.pyaudio = pyaudio.PyAudio()
         
+        # Capture source (microphone by default; files or synthetic signals for replay)
+        self.capture_source = capture_source or MicrophoneSource(self.pyaudio)
+        
+        # Session recording (compressed capture plus transcript alignment index)
+        self.session_recorder = None
+        
+        # Network ingest server (serves remote microphones with the resident model)
+        self.ingest_server = None
+        self.batch_scheduler = None
+        self.BATCH_SIZE = 8  # Utterances decoded together across sessions
+        
+        # Rolling per-stage latency statistics for tuning chunking and model size
+        self.latency_tracker = LatencyTracker()
+        self.recordings_dir = os.path.join(os.path.expanduser("~"), "Transcriptor Sessions")
+        
         # Recognition settings
-        self.whisper_model = None
-        self.whisper_model_name = "tiny"  # Default to tiny for faster processing
+        self.whisper_engine = None
+        self.whisper_engine_name = "whisper"  # Backend running the Whisper weights
+        self.whisper_model_name = load_config()["last_models"].get("live", "tiny")  # Tiny by default for speed
+        self.active_model_name = None  # Engine/model currently serving requests
+        self.sphinx_engine = create_engine("sphinx")
+        self.keyword_engine = None  # Sphinx keyword spotter while "Spot keyphrases" is on
+        self.keyword_hits = []
+        self.model_lock = threading.Lock()
+        self.model_load_generation = 0  # Bumped on every model change so stale loads are dropped
         self.language = "en"  # Set English as the default language
+        self.language_detector = None  # Identifies the session's language in auto mode
         
         # Configure styles
         self.configure_styles()
@@ -76,112 +121,145 @@ class LiveTranscriptorApp:
         self.style = ttk.Style()
         
         # Configure frame styles
-        self.style.configure("Main.TFrame", background=COLORS["white"])
-        self.style.configure("Card.TFrame", background=COLORS["white"], 
+        self.style.configure("Live.Main.TFrame", background=COLORS["white"])
+        self.style.configure("Live.Card.TFrame", background=COLORS["white"], 
                             relief="raised", borderwidth=1)
         
         # Configure label styles
-        self.style.configure("Title.TLabel", 
+        self.style.configure("Live.Title.TLabel", 
                             background=COLORS["white"], 
                             foreground=COLORS["primary_red"], 
                             font=("Segoe UI", 18, "bold"))
         
-        self.style.configure("Subtitle.TLabel", 
+        self.style.configure("Live.Subtitle.TLabel", 
                             background=COLORS["white"], 
                             foreground=COLORS["secondary_red"], 
                             font=("Segoe UI", 12))
         
-        self.style.configure("Settings.TLabelframe", 
+        self.style.configure("Live.Settings.TLabelframe", 
                             background=COLORS["white"],
                             foreground=COLORS["primary_red"])
         
-        self.style.configure("Settings.TLabelframe.Label", 
+        self.style.configure("Live.Settings.TLabelframe.Label", 
                             background=COLORS["white"],
                             foreground=COLORS["primary_red"],
                             font=("Segoe UI", 11, "bold"))
         
-        self.style.configure("Status.TLabel", 
+        self.style.configure("Live.Status.TLabel", 
                             background=COLORS["white"], 
-                            foreground=COLORS["white"], 
+                            foreground=COLORS["dark_gray"], 
                             font=("Segoe UI", 10))
         
-        # Configure button styles
-        self.style.configure("TButton", 
-                            font=("Segoe UI", 11))
-        
-        # Button hover effect - update to red with white text
-        self.style.map("TButton",
-                       background=[("active", COLORS["hover_red"])],
-                       foreground=[("active", COLORS["white"])])
+        # Configure button styles; inside the launcher the plain buttons keep its style
+        if self.container is self.root:
+            self.style.configure("TButton", 
+                                font=("Segoe UI", 11))
+            
+            # Button hover effect - update to red with white text
+            self.style.map("TButton",
+                           background=[("active", COLORS["hover_red"])],
+                           foreground=[("active", COLORS["white"])])
         
         # Record button style
-        self.style.configure("Record.TButton", 
+        self.style.configure("Live.Record.TButton", 
                             background=COLORS["primary_red"], 
                             foreground=COLORS["primary_red"],
                             font=("Segoe UI", 12, "bold"))
         
         # Record button hover effect
-        self.style.map("Record.TButton",
+        self.style.map("Live.Record.TButton",
                       background=[("active", COLORS["hover_red"])],
                       foreground=[("active", COLORS["primary_red"])])
         
         # Clear button style - Updated to match Record button colors
-        self.style.configure("Clear.TButton", 
+        self.style.configure("Live.Clear.TButton", 
                             background=COLORS["primary_red"], 
                             foreground=COLORS["primary_red"],
                             font=("Segoe UI", 11))
         
         # Clear button hover effect
-        self.style.map("Clear.TButton",
+        self.style.map("Live.Clear.TButton",
                       background=[("active", COLORS["hover_red"])],
                       foreground=[("active", COLORS["primary_red"])])
         
         # Configure labelframe styles
-        self.style.configure("Transcription.TLabelframe", 
+        self.style.configure("Live.Transcription.TLabelframe", 
                            background=COLORS["white"],
                            foreground=COLORS["secondary_red"])
         
-        self.style.configure("Transcription.TLabelframe.Label", 
+        self.style.configure("Live.Transcription.TLabelframe.Label", 
                            background=COLORS["white"],
                            foreground=COLORS["secondary_red"],
                            font=("Segoe UI", 11, "bold"))
     
-    def load_whisper_model(self):
+    def load_whisper_model(self, generation=0):
+        engine_name = self.whisper_engine_name
+        model_name = self.whisper_model_name
         try:
-            self.status_var.set("Loading Whisper model (this may take a moment)...")
-            self.root.update_idletasks()
-            self.whisper_model = whisper.load_model(self.whisper_model_name)
-            self.status_var.set("Whisper model loaded. Ready to transcribe in English.")
+            if self.whisper_engine is None:
+                self.status_var.set("Loading Whisper model (this may take a moment)...")
+                self.root.update_idletasks()
+            
+            # Load into a separate buffer so the current model keeps serving meanwhile.
+            # With the transcription service running, its resident model decodes instead.
+            service = find_service()
+            if service is not None:
+                new_engine = RemoteEngine(service, engine_name, model_name).load()
+            else:
+                new_engine = create_engine(engine_name, model_name=model_name).load()
+            
+            with self.model_lock:
+                # A newer model change was requested while this one was loading
+                if generation != self.model_load_generation:
+                    return
+                # Swap atomically; in-flight utterances finish on the model they started with
+                self.whisper_engine = new_engine
+                self.active_model_name = new_engine.describe()
+            
+            if self.is_recording:
+                self.status_var.set(f"Switched to {model_name} model. Recording...")
+            else:
+                self.status_var.set(f"Whisper {model_name} model loaded. "
+                                    f"Ready to transcribe (language: {self.language_var.get()}).")
         except Exception as e:
-            self.status_var.set(f"Error loading Whisper model: {str(e)}")
+            if self.whisper_engine is not None:
+                self.status_var.set(f"Error loading {model_name} model, keeping {self.active_model_name}: {str(e)}")
+            else:
+                self.status_var.set(f"Error loading Whisper model: {str(e)}")
+    
+    def get_whisper_engine(self):
+        with self.model_lock:
+            return self.whisper_engine
     
     def create_widgets(self):
         # Main frame
-        main_frame = ttk.Frame(self.root, style="Main.TFrame", padding="20")
+        main_frame = ttk.Frame(self.container, style="Live.Main.TFrame", padding="20")
         main_frame.pack(fill=tk.BOTH, expand=True)
         
         # Title
-        title_label = ttk.Label(main_frame, text="Live Voice Transcriptor", style="Title.TLabel")
+        title_label = ttk.Label(main_frame, text="Live Voice Transcriptor", style="Live.Title.TLabel")
         title_label.pack(pady=10)
         
         subtitle_label = ttk.Label(main_frame, 
                                 text="Transcribe your voice in real-time as you speak", 
-                                style="Subtitle.TLabel")
+                                style="Live.Subtitle.TLabel")
         subtitle_label.pack(pady=(0, 15))
         
         # Settings frame
-        settings_frame = ttk.LabelFrame(main_frame, text="Settings", padding="10", style="Settings.TLabelframe")
+        settings_frame = ttk.LabelFrame(main_frame, text="Settings", padding="10", style="Live.Settings.TLabelframe")
         settings_frame.pack(fill=tk.X, pady=10)
         
         # Whisper model selection
-        model_frame = ttk.Frame(settings_frame, style="Main.TFrame")
+        model_frame = ttk.Frame(settings_frame, style="Live.Main.TFrame")
         model_frame.pack(fill=tk.X, pady=5)
         
         model_label = ttk.Label(model_frame, text="Whisper Model:", background=COLORS["white"], 
                              foreground=COLORS["dark_gray"], font=("Segoe UI", 10))
         model_label.pack(side=tk.LEFT, padx=(0, 10))
         
-        self.model_var = tk.StringVar(value="tiny")
+        base_model_name, quantized = split_quantized(self.whisper_model_name)
+        self.model_var = tk.StringVar(value=base_model_name)
+        self.quantized_var = tk.BooleanVar(value=quantized)
         
         tiny_radio = ttk.Radiobutton(model_frame, text="Tiny (Fast)", 
                                     variable=self.model_var, value="tiny",
@@ -198,6 +276,55 @@ class LiveTranscriptorApp:
                                     command=self.change_whisper_model)
         small_radio.pack(side=tk.LEFT, padx=5)
         
+        # Dynamic int8 quantization of the PyTorch model (CPU only, cached on disk)
+        quantized_check = ttk.Checkbutton(model_frame, text="Quantized (int8)",
+                                         variable=self.quantized_var,
+                                         command=self.change_whisper_model)
+        quantized_check.pack(side=tk.LEFT, padx=5)
+        
+        # Whisper backend selection
+        engine_frame = ttk.Frame(settings_frame, style="Live.Main.TFrame")
+        engine_frame.pack(fill=tk.X, pady=5)
+        
+        engine_label = ttk.Label(engine_frame, text="Whisper Engine:", background=COLORS["white"],
+                              foreground=COLORS["dark_gray"], font=("Segoe UI", 10))
+        engine_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.engine_var = tk.StringVar(value=self.whisper_engine_name)
+        
+        for engine_name in WHISPER_ENGINES:
+            engine_radio = ttk.Radiobutton(engine_frame, text=ENGINES[engine_name].label,
+                                          variable=self.engine_var, value=engine_name,
+                                          command=self.change_whisper_model)
+            engine_radio.pack(side=tk.LEFT, padx=5)
+        
+        # Decode preset selection
+        preset_frame = ttk.Frame(settings_frame, style="Live.Main.TFrame")
+        preset_frame.pack(fill=tk.X, pady=5)
+        
+        preset_label = ttk.Label(preset_frame, text="Decode Preset:", background=COLORS["white"],
+                              foreground=COLORS["dark_gray"], font=("Segoe UI", 10))
+        preset_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.preset_var = tk.StringVar(value=DEFAULT_LIVE_PRESET)
+        for preset_name, preset in DECODE_PRESETS.items():
+            preset_radio = ttk.Radiobutton(preset_frame, text=preset["label"],
+                                          variable=self.preset_var, value=preset_name)
+            preset_radio.pack(side=tk.LEFT, padx=5)
+        
+        # Spoken language; "auto" identifies it once per session from the first speech
+        language_frame = ttk.Frame(settings_frame, style="Live.Main.TFrame")
+        language_frame.pack(fill=tk.X, pady=5)
+        
+        language_label = ttk.Label(language_frame, text="Language:", background=COLORS["white"],
+                                foreground=COLORS["dark_gray"], font=("Segoe UI", 10))
+        language_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.language_var = tk.StringVar(value=self.language)
+        language_combo = ttk.Combobox(language_frame, textvariable=self.language_var,
+                                      values=LANGUAGE_CHOICES, state="readonly", width=8)
+        language_combo.pack(side=tk.LEFT)
+        
         # Dual engine option
         self.dual_engine_var = tk.BooleanVar(value=False)
         dual_engine_check = ttk.Checkbutton(
@@ -207,23 +334,100 @@ class LiveTranscriptorApp:
         )
         dual_engine_check.pack(anchor=tk.W, pady=5)
         
+        # Keyword spotting option
+        keyword_frame = ttk.Frame(settings_frame, style="Live.Main.TFrame")
+        keyword_frame.pack(fill=tk.X, pady=5)
+        
+        self.spot_keywords_var = tk.BooleanVar(value=False)
+        spot_keywords_check = ttk.Checkbutton(
+            keyword_frame,
+            text="Spot keyphrases:",
+            variable=self.spot_keywords_var
+        )
+        spot_keywords_check.pack(side=tk.LEFT)
+        
+        # Comma separated, each optionally with a threshold: acme widget /1e-25/, refund
+        self.keyphrases_var = tk.StringVar()
+        keyphrase_entry = ttk.Entry(keyword_frame, textvariable=self.keyphrases_var, width=40)
+        keyphrase_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        # Session recording option
+        recording_frame = ttk.Frame(settings_frame, style="Live.Main.TFrame")
+        recording_frame.pack(fill=tk.X, pady=5)
+        
+        self.save_session_var = tk.BooleanVar(value=False)
+        save_session_check = ttk.Checkbutton(
+            recording_frame,
+            text="Save session recording",
+            variable=self.save_session_var
+        )
+        save_session_check.pack(side=tk.LEFT)
+        
+        self.recording_format_var = tk.StringVar(value="flac")
+        flac_radio = ttk.Radiobutton(recording_frame, text="FLAC (Lossless)",
+                                    variable=self.recording_format_var, value="flac")
+        flac_radio.pack(side=tk.LEFT, padx=5)
+        
+        opus_radio = ttk.Radiobutton(recording_frame, text="Opus (Compact)",
+                                    variable=self.recording_format_var, value="opus")
+        opus_radio.pack(side=tk.LEFT, padx=5)
+        
+        # Network server option
+        server_frame = ttk.Frame(settings_frame, style="Live.Main.TFrame")
+        server_frame.pack(fill=tk.X, pady=5)
+        
+        server_label = ttk.Label(server_frame, text="Network Server Port:", background=COLORS["white"],
+                              foreground=COLORS["dark_gray"], font=("Segoe UI", 10))
+        server_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.server_port_var = tk.StringVar(value=str(DEFAULT_PORT))
+        server_port_entry = ttk.Entry(server_frame, textvariable=self.server_port_var, width=8)
+        server_port_entry.pack(side=tk.LEFT, padx=5)
+        
+        batch_wait_label = ttk.Label(server_frame, text="Batch wait (ms):", background=COLORS["white"],
+                                  foreground=COLORS["dark_gray"], font=("Segoe UI", 10))
+        batch_wait_label.pack(side=tk.LEFT, padx=(10, 5))
+        
+        self.batch_wait_var = tk.StringVar(value="50")
+        batch_wait_entry = ttk.Entry(server_frame, textvariable=self.batch_wait_var, width=6)
+        batch_wait_entry.pack(side=tk.LEFT, padx=5)
+        
+        self.server_button = ttk.Button(
+            server_frame,
+            text="Start Server",
+            command=self.toggle_server
+        )
+        self.server_button.pack(side=tk.LEFT, padx=5)
+        
         # Status frame
-        status_frame = ttk.Frame(main_frame, style="Main.TFrame")
+        status_frame = ttk.Frame(main_frame, style="Live.Main.TFrame")
         status_frame.pack(fill=tk.X, pady=10)
         
         # Status label
         self.status_var = tk.StringVar(value="Loading Whisper model...")
-        status_label = ttk.Label(status_frame, textvariable=self.status_var, style="Status.TLabel")
+        status_label = ttk.Label(status_frame, textvariable=self.status_var, style="Live.Status.TLabel")
         status_label.pack(anchor=tk.W, pady=5)
         
+        # Latency statistics
+        self.latency_var = tk.StringVar(value="")
+        latency_label = ttk.Label(status_frame, textvariable=self.latency_var, background=COLORS["white"],
+                               foreground=COLORS["dark_gray"], font=("Consolas", 9), justify=tk.LEFT)
+        latency_label.pack(anchor=tk.W)
+        
+        # Most recent keyphrase hits with their offset into the session
+        self.keyword_hits_var = tk.StringVar(value="")
+        keyword_hits_label = ttk.Label(status_frame, textvariable=self.keyword_hits_var, background=COLORS["white"],
+                                    foreground=COLORS["primary_red"], font=("Consolas", 9), justify=tk.LEFT)
+        keyword_hits_label.pack(anchor=tk.W)
+        
         # Transcription display
         transcription_frame = ttk.LabelFrame(main_frame, text="Transcription", 
-                                          padding="10", style="Transcription.TLabelframe")
+                                          padding="10", style="Live.Transcription.TLabelframe")
         transcription_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
         # Whisper transcription
         whisper_frame = ttk.LabelFrame(transcription_frame, text="Whisper Transcription", 
-                                    padding="10", style="Transcription.TLabelframe")
+                                    padding="10", style="Live.Transcription.TLabelframe")
         whisper_frame.pack(fill=tk.BOTH, expand=True, side=tk.LEFT, padx=(0, 5))
         
         self.whisper_text = tk.Text(whisper_frame, wrap=tk.WORD, width=40, height=10,
@@ -236,7 +440,7 @@ class LiveTranscriptorApp:
         
         # Sphinx transcription
         sphinx_frame = ttk.LabelFrame(transcription_frame, text="Sphinx Transcription", 
-                                   padding="10", style="Transcription.TLabelframe")
+                                   padding="10", style="Live.Transcription.TLabelframe")
         sphinx_frame.pack(fill=tk.BOTH, expand=True, side=tk.RIGHT, padx=(5, 0))
         
         self.sphinx_text = tk.Text(sphinx_frame, wrap=tk.WORD, width=40, height=10,
@@ -248,7 +452,7 @@ class LiveTranscriptorApp:
         sphinx_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Control buttons frame
-        control_frame = ttk.Frame(main_frame, style="Main.TFrame")
+        control_frame = ttk.Frame(main_frame, style="Live.Main.TFrame")
         control_frame.pack(fill=tk.X, pady=10)
         
         # Start/Stop button
@@ -256,7 +460,7 @@ class LiveTranscriptorApp:
             control_frame,
             text="START RECORDING",
             command=self.toggle_recording,
-            style="Record.TButton"
+            style="Live.Record.TButton"
         )
         self.record_button.pack(fill=tk.X, ipady=10)
         
@@ -265,12 +469,21 @@ class LiveTranscriptorApp:
             control_frame,
             text="Clear Transcription",
             command=self.clear_transcription,
-            style="Clear.TButton"
+            style="Live.Clear.TButton"
         )
         self.clear_button.pack(pady=10)
         
+        # Latency export button
+        self.export_latency_button = ttk.Button(
+            control_frame,
+            text="Export Latency Stats",
+            command=self.export_latency,
+            style="Live.Clear.TButton"
+        )
+        self.export_latency_button.pack()
+        
         # Footer
-        footer_frame = ttk.Frame(main_frame, style="Main.TFrame")
+        footer_frame = ttk.Frame(main_frame, style="Live.Main.TFrame")
         footer_frame.pack(fill=tk.X, pady=10)
         
         footer_text = "Powered by OpenAI Whisper and CMU Sphinx • ItsAeox • 2025"
@@ -280,29 +493,62 @@ class LiveTranscriptorApp:
                               font=("Segoe UI", 9))
         footer_label.pack(side=tk.BOTTOM, pady=(10, 0))
     
+    def selected_model(self):
+        # CTranslate2 weights are int8 already; the checkbox applies to the PyTorch engine
+        quantized = self.quantized_var.get() and self.engine_var.get() == "whisper"
+        return quantized_name(self.model_var.get(), quantized)
+    
     def change_whisper_model(self):
-        if self.whisper_model_name != self.model_var.get():
-            self.whisper_model_name = self.model_var.get()
-            self.whisper_model = None  # Reset model
+        if (self.whisper_model_name != self.selected_model()
+                or self.whisper_engine_name != self.engine_var.get()):
+            self.whisper_model_name = self.selected_model()
+            self.whisper_engine_name = self.engine_var.get()
+            remember_model("live", self.whisper_model_name)
+            with self.model_lock:
+                self.model_load_generation += 1
+                generation = self.model_load_generation
             
-            # Load new model in background
-            self.status_var.set(f"Loading {self.whisper_model_name} model...")
-            load_thread = threading.Thread(target=self.load_whisper_model)
+            # Load new model in background while the current one keeps transcribing
+            if self.whisper_engine is not None:
+                self.status_var.set(f"Loading {self.whisper_model_name} model in background "
+                                    f"({self.active_model_name} still active)...")
+            else:
+                self.status_var.set(f"Loading {self.whisper_model_name} model...")
+            load_thread = threading.Thread(target=self.load_whisper_model, args=(generation,))
             load_thread.daemon = True
             load_thread.start()
     
     def toggle_recording(self):
-        if self.whisper_model is None:
+        if self.whisper_engine is None:
             messagebox.showerror("Error", "Whisper model is still loading. Please wait.")
             return
-            
+        
         if not self.is_recording:
+            if self.is_transcribing:
+                # Stopped, but utterances are still being decoded
+                self.discard_pending()
+                return
             self.start_recording()
         else:
             self.stop_recording()
     
     def start_recording(self):
+        # Build the keyword spotter up front so a typo is reported before recording starts
+        self.keyword_engine = None
+        self.keyword_hits = []
+        self.keyword_hits_var.set("")
+        if self.spot_keywords_var.get():
+            try:
+                self.keyword_engine = create_engine("sphinx-kws", keyphrases=self.keyphrases_var.get())
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+        
+        # Auto mode starts every session undecided and detects from its first speech
+        self.set_language_mode()
+        
         self.is_recording = True
+        self.session_token = CancelToken()
         self.record_button.config(text="STOP RECORDING")
         self.status_var.set("Recording... Speak into your microphone")
         
@@ -310,149 +556,263 @@ class LiveTranscriptorApp:
         if not self.dual_engine_var.get():
             self.clear_transcription()
         
-        # Reset frames
-        self.frames = []
-        self.silence_frames = 0
+        # Open a new session recording if requested
+        self.session_recorder = None
+        if self.save_session_var.get():
+            try:
+                os.makedirs(self.recordings_dir, exist_ok=True)
+                session_name = time.strftime("session_%Y%m%d_%H%M%S")
+                self.session_recorder = SessionRecorder(
+                    os.path.join(self.recordings_dir, session_name),
+                    rate=self.RATE,
+                    channels=self.CHANNELS,
+                    sample_width=self.pyaudio.get_sample_size(self.FORMAT),
+                    audio_format=self.recording_format_var.get()
+                )
+                self.status_var.set(f"Recording to {self.session_recorder.output_path}... Speak into your microphone")
+            except Exception as e:
+                self.session_recorder = None
+                self.status_var.set(f"Could not start session recording: {str(e)}")
         
         # Start recording in a separate thread
-        self.recording_thread = threading.Thread(target=self.record_audio)
+        self.recording_thread = threading.Thread(target=self.record_audio, name="live-capture")
         self.recording_thread.daemon = True
         self.recording_thread.start()
         
         # Start transcription processing in a separate thread
-        self.transcription_thread = threading.Thread(target=self.process_audio)
+        self.transcription_thread = threading.Thread(target=self.process_audio, name="live-decode")
         self.transcription_thread.daemon = True
         self.transcription_thread.start()
         
         # Start UI update thread
-        self.update_thread = threading.Thread(target=self.update_transcription)
+        self.update_thread = threading.Thread(target=self.update_transcription, name="live-display")
         self.update_thread.daemon = True
         self.update_thread.start()
     
     def stop_recording(self):
         self.is_recording = False
-        self.record_button.config(text="START RECORDING")
-        self.status_var.set("Recording stopped")
+        if self.is_transcribing:
+            # Queued utterances are still decoded unless the user discards them
+            self.record_button.config(text="DISCARD PENDING AUDIO")
+            self.status_var.set("Recording stopped; finishing the queued audio...")
+        else:
+            self.record_button.config(text="START RECORDING")
+            self.status_var.set("Recording stopped")
+    
+    def discard_pending(self):
+        # The utterance being decoded stops at its next decoder step
+        self.session_token.cancel("Discarded by user")
+        self.record_button.config(state=tk.DISABLED)
+        self.status_var.set("Discarding the queued audio...")
+    
+    def session_finished(self):
+        if not self.is_recording:
+            self.record_button.config(text="START RECORDING", state=tk.NORMAL)
+            if self.session_token.is_cancelled():
+                self.status_var.set("Recording stopped; queued audio discarded")
+            else:
+                self.status_var.set("Recording stopped")
     
     def record_audio(self):
-        stream = self.pyaudio.open(
-            format=self.FORMAT,
-            channels=self.CHANNELS,
-            rate=self.RATE,
-            input=True,
-            frames_per_buffer=self.CHUNK
-        )
+        source = self.capture_source
+        source.open(self.RATE, self.CHANNELS, self.CHUNK)
         
-        self.frames = []
+        self.segmenter.reset()
+        recorder = self.session_recorder
         
+        # When the most recent chunk arrived; the fallback capture end for an
+        # utterance without a single loud chunk
+        read_at = time.perf_counter()
         try:
             while self.is_recording:
-                data = stream.read(self.CHUNK)
-                self.frames.append(data)
+                data = source.read(self.CHUNK)
+                read_at = time.perf_counter()
+                if not data:
+                    # Replayed sources end; stop as if the user pressed STOP
+                    self.is_recording = False
+                    self.root.after(0, self.stop_recording)
+                    break
                 
-                # Check for silence to segment speech
-                audio_data = np.frombuffer(data, dtype=np.int16)
-                if np.abs(audio_data).mean() < self.SILENCE_THRESHOLD:
-                    self.silence_frames += 1
-                else:
-                    self.silence_frames = 0
+                # Stream the raw capture, silence included, into the session recording
+                if recorder is not None:
+                    recorder.write(data)
                 
-                # If we detect enough silence and have some data, process it
-                if self.silence_frames > self.max_silence_frames and len(self.frames) > 10:
-                    # Make a copy of the current frames and put them in the queue
-                    frames_copy = self.frames.copy()
-                    self.audio_queue.put(frames_copy)
-                    
-                    # Reset frames for next segment
-                    self.frames = []
-                    self.silence_frames = 0
+                # Queue each utterance once enough silence follows it
+                segment = self.segmenter.feed_chunk(data, read_at)
+                if segment is not None:
+                    self.enqueue_segment(segment, self.segmenter.last_speech_at or read_at)
         finally:
-            stream.stop_stream()
-            stream.close()
+            source.close()
+            
+            if recorder is not None:
+                recorder.close_audio()
             
             # Process any remaining audio
-            if self.frames:
-                self.audio_queue.put(self.frames)
+            segment = self.segmenter.flush()
+            if segment is not None:
+                self.enqueue_segment(segment, self.segmenter.last_speech_at or read_at)
+    
+    def enqueue_segment(self, segment, capture_end):
+        frames, start_sample = segment
+        trace = {
+            "capture_end": capture_end,
+            "audio_ms": int(len(frames) * self.CHUNK * 1000 / self.RATE),
+        }
+        trace["enqueued"] = time.perf_counter()
+        tracing.instant("live.segment", start_sample=start_sample, audio_ms=trace["audio_ms"])
+        self.audio_queue.put((frames, start_sample, trace))
     
     def process_audio(self):
+        # Decodes run under the session's token, so cancelling it also stops the
+        # utterance in progress
+        with cancel_scope(self.session_token) as token:
+            self.decode_utterances(token)
+    
+    def decode_utterances(self, token):
         self.is_transcribing = True
         
         try:
-            while self.is_recording or not self.audio_queue.empty():
+            while (self.is_recording or not self.audio_queue.empty()) and not token.is_cancelled():
                 try:
-                    frames = self.audio_queue.get(timeout=1)  # Wait for up to 1 second
-                    
-                    # Convert frames to temporary WAV file
-                    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                        temp_wav_path = temp_file.name
-                        
-                    wf = wave.open(temp_wav_path, 'wb')
-                    wf.setnchannels(self.CHANNELS)
-                    wf.setsampwidth(self.pyaudio.get_sample_size(self.FORMAT))
-                    wf.setframerate(self.RATE)
-                    wf.writeframes(b''.join(frames))
-                    wf.close()
+                    frames, start_sample, trace = self.audio_queue.get(timeout=1)  # Wait for up to 1 second
+                    pcm = b''.join(frames)
+                    trace["decode_start"] = time.perf_counter()
+                    trace["engine"] = self.active_model_name or self.whisper_model_name
                     
                     # Transcribe with Whisper
-                    whisper_text = self.transcribe_with_whisper(temp_wav_path)
+                    trace["whisper_start"] = time.perf_counter()
+                    whisper_text = self.transcribe_with_whisper(pcm)
+                    trace["whisper_end"] = time.perf_counter()
                     
                     # Transcribe with Sphinx if dual engine is enabled
                     if self.dual_engine_var.get():
-                        sphinx_text = self.transcribe_with_sphinx(temp_wav_path)
+                        trace["sphinx_start"] = time.perf_counter()
+                        sphinx_text = self.transcribe_with_sphinx(pcm)
+                        trace["sphinx_end"] = time.perf_counter()
+                        trace["engine"] += "+sphinx"
                     else:
                         sphinx_text = ""
                     
-                    # Add to transcription queue
-                    self.transcription_queue.put((whisper_text, sphinx_text))
+                    # Keyphrase hits are timed from the start of the session
+                    if self.keyword_engine is not None:
+                        with tracing.span("live.keywords", start_sample=start_sample):
+                            self.spot_keywords(pcm, start_sample)
+                    trace["decode_end"] = time.perf_counter()
                     
-                    # Remove temporary file
-                    try:
-                        os.unlink(temp_wav_path)
-                    except:
-                        pass
+                    # Per-utterance spans from the timestamps already taken for latency stats
+                    if tracing.is_enabled():
+                        details = {"start_sample": start_sample, "audio_ms": trace["audio_ms"]}
+                        tracing.add_span("live.queue_wait", trace["enqueued"], trace["decode_start"], **details)
+                        tracing.add_span("live.whisper", trace["whisper_start"], trace["whisper_end"],
+                                         text=whisper_text, **details)
+                        if "sphinx_start" in trace:
+                            tracing.add_span("live.sphinx", trace["sphinx_start"], trace["sphinx_end"],
+                                             text=sphinx_text, **details)
+                    
+                    # Add to transcription queue
+                    self.transcription_queue.put((whisper_text, sphinx_text, trace))
                     
+                    # Align the finalized lines with the session recording
+                    if self.session_recorder is not None:
+                        end_sample = start_sample + len(frames) * self.CHUNK
+                        self.session_recorder.add_entry(start_sample, end_sample, "whisper", whisper_text)
+                        self.session_recorder.add_entry(start_sample, end_sample, "sphinx", sphinx_text)
+                
                 except queue.Empty:
                     continue
+                except JobCancelled:
+                    break
                 except Exception as e:
                     print(f"Processing error: {e}")
                     continue
-                    
+        
         finally:
+            if token.is_cancelled():
+                # Drop the utterances nobody wants decoded any more
+                while True:
+                    try:
+                        self.audio_queue.get_nowait()
+                    except queue.Empty:
+                        break
             self.is_transcribing = False
+            try:
+                self.root.after(0, self.session_finished)
+            except (RuntimeError, tk.TclError):
+                # The window was closed
+                pass
+            
+            # Every finalized line is in the session index now; make the session searchable
+            if self.session_recorder is not None:
+                try:
+                    index_session(self.session_recorder.index_path)
+                except Exception as e:
+                    print(f"Warning: Could not index session: {e}")
     
-    def transcribe_with_whisper(self, audio_path):
+    def set_language_mode(self):
+        if self.language_var.get() == AUTO_LANGUAGE:
+            self.language = FALLBACK_LANGUAGE
+            self.language_detector = LanguageDetector()
+        else:
+            self.language = self.language_var.get()
+            self.language_detector = None
+    
+    def transcribe_with_whisper(self, pcm):
         try:
-            # Set language to English specifically for better accuracy
-            result = self.whisper_model.transcribe(
-                audio_path, 
-                language=self.language,  # Specify English language
-                task="transcribe"
-            )
+            # Take the engine once per utterance so a hot-swap never lands mid-decode
+            engine = self.get_whisper_engine()
+            samples = pcm_to_float(pcm, self.CHANNELS)
+            
+            # A fixed language skips detection; auto mode detects on the first speech
+            # and again only after several weak decodes
+            language = self.language
+            if self.language_detector is not None:
+                language = self.language_detector.language_for(engine, samples)
+            
+            # While serving network clients, join their batched decodes
+            scheduler = self.batch_scheduler
+            if scheduler is not None:
+                result = wait_future(scheduler.submit(samples, language))
+            else:
+                result = engine.transcribe(samples, language=language, preset=self.preset_var.get())
+            if self.language_detector is not None:
+                self.language_detector.observe(result)
             return result["text"].strip()
+        except JobCancelled:
+            raise
         except Exception as e:
             print(f"Whisper transcription error: {e}")
             return ""
     
-    def transcribe_with_sphinx(self, audio_path):
+    def transcribe_with_sphinx(self, pcm):
         try:
-            recognizer = sr.Recognizer()
-            with sr.AudioFile(audio_path) as source:
-                audio_data = recognizer.record(source)
-                
-            # Specifically set to use English for Sphinx
-            text = recognizer.recognize_sphinx(
-                audio_data,
-                language="en-US"  # Specify American English
-            )
-            return text.strip()
+            return transcribe_pcm(self.sphinx_engine, pcm, channels=self.CHANNELS)
         except Exception as e:
             print(f"Sphinx transcription error: {e}")
             return ""
     
+    def spot_keywords(self, pcm, start_sample):
+        try:
+            result = self.keyword_engine.transcribe(pcm_to_float(pcm, self.CHANNELS))
+        except JobCancelled:
+            raise
+        except Exception as e:
+            print(f"Keyword spotting error: {e}")
+            return
+        offset = start_sample / float(self.RATE)
+        for hit in result["segments"]:
+            start = offset + hit["start"]
+            self.keyword_hits.append(f"[{format_offset(start)}] {hit['text']}")
+            print(f"Keyphrase at {format_offset(start)}: {hit['text']}")
+            if self.session_recorder is not None:
+                self.session_recorder.add_entry(int(start * self.RATE), int((offset + hit["end"]) * self.RATE),
+                                                "keywords", hit["text"])
+        if result["segments"]:
+            self.keyword_hits_var.set("Keyphrases: " + "  ".join(self.keyword_hits[-5:]))
+    
     def update_transcription(self):
         while self.is_recording or self.is_transcribing or not self.transcription_queue.empty():
             try:
-                whisper_text, sphinx_text = self.transcription_queue.get(timeout=0.5)
+                whisper_text, sphinx_text, trace = self.transcription_queue.get(timeout=0.5)
                 
                 if whisper_text:
                     # Append to the text widget with a newline if there's already content
@@ -471,20 +831,132 @@ class LiveTranscriptorApp:
                         self.sphinx_text.insert(tk.END, sphinx_text)
                     self.sphinx_text.see(tk.END)  # Scroll to the end
                 
+                # Close the utterance trace and refresh the rolling percentiles
+                trace["displayed"] = time.perf_counter()
+                tracing.add_span("live.display", trace["decode_end"], trace["displayed"])
+                self.latency_tracker.record(trace)
+                self.latency_var.set(self.latency_tracker.summary())
+            
             except queue.Empty:
                 time.sleep(0.1)
                 continue
             except Exception as e:
                 print(f"UI update error: {e}")
     
+    def export_latency(self):
+        file_path = filedialog.asksaveasfilename(
+            title="Export Latency Stats",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if file_path:
+            try:
+                self.latency_tracker.export(file_path)
+                self.status_var.set(f"Latency stats exported to {file_path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not export latency stats:\n{str(e)}")
+    
+    def toggle_server(self):
+        if self.ingest_server is None:
+            self.start_server()
+        else:
+            self.stop_server()
+    
+    def start_server(self):
+        if self.whisper_engine is None:
+            messagebox.showerror("Error", "Whisper model is still loading. Please wait.")
+            return
+        
+        try:
+            port = int(self.server_port_var.get())
+            max_wait = float(self.batch_wait_var.get()) / 1000.0
+            # In auto mode every network connection identifies its own language
+            language = self.language_var.get()
+            
+            # Utterances from every session, local microphone included, share batched decodes
+            self.batch_scheduler = BatchScheduler(
+                self.get_whisper_engine,
+                max_batch=self.BATCH_SIZE,
+                max_wait=max_wait,
+                language=FALLBACK_LANGUAGE if language == AUTO_LANGUAGE else language,
+                preset=self.preset_var.get()
+            )
+            self.batch_scheduler.start()
+            
+            # Every connection shares the resident (hot-swappable) engine
+            self.ingest_server = IngestServer(
+                self.get_whisper_engine,
+                port=port,
+                language=language,
+                dual_engine=self.dual_engine_var.get(),
+                silence_threshold=self.SILENCE_THRESHOLD,
+                silence_duration=self.SILENCE_DURATION,
+                on_result=self.on_server_result,
+                on_client=self.on_server_client,
+                batch_scheduler=self.batch_scheduler,
+                preset=self.preset_var.get()
+            )
+            self.ingest_server.start()
+        except Exception as e:
+            self.ingest_server = None
+            if self.batch_scheduler is not None:
+                self.batch_scheduler.stop()
+                self.batch_scheduler = None
+            messagebox.showerror("Error", f"Could not start network server:\n{str(e)}")
+            return
+        
+        self.server_button.config(text="Stop Server")
+        self.status_var.set(f"Network server listening on port {port}")
+    
+    def stop_server(self):
+        if self.ingest_server is not None:
+            self.ingest_server.stop()
+            self.ingest_server = None
+        if self.batch_scheduler is not None:
+            self.batch_scheduler.stop()
+            self.batch_scheduler = None
+        self.server_button.config(text="Start Server")
+        self.status_var.set("Network server stopped")
+    
+    def on_server_client(self, client, connected):
+        clients = len(self.ingest_server.clients) if self.ingest_server is not None else 0
+        state = "connected" if connected else "disconnected"
+        self.root.after(0, self.status_var.set, f"Client {client} {state} ({clients} active)")
+    
+    def on_server_result(self, client, result):
+        # Tk widgets must only be touched from the main loop
+        self.root.after(0, self.append_server_result, client, result)
+    
+    def append_server_result(self, client, result):
+        for widget, text in ((self.whisper_text, result["whisper"]), (self.sphinx_text, result["sphinx"])):
+            if not text:
+                continue
+            line = f"[{client}] {text}"
+            if widget.get("1.0", tk.END).strip():
+                widget.insert(tk.END, f"\n{line}")
+            else:
+                widget.insert(tk.END, line)
+            widget.see(tk.END)
+    
     def clear_transcription(self):
         self.whisper_text.delete("1.0", tk.END)
         self.sphinx_text.delete("1.0", tk.END)
     
     def on_closing(self):
+        self.shutdown()
+        self.root.destroy()
+    
+    def shutdown(self):
+        if self.ingest_server is not None:
+            self.stop_server()
+        if self.session_token is not None:
+            # Nothing is left to show the pending text in; stop decoding now
+            self.session_token.cancel("Window closed")
         if self.is_recording:
             self.stop_recording()
-        self.root.destroy()
+            # Give the recording thread a moment to finalize the session file
+            if self.session_recorder is not None:
+                self.recording_thread.join(timeout=2)
 
 def main():
     root = tk.Tk()
@@ -0,0 +1 @@
+# Transcript search module initialization
@@ -0,0 +1,151 @@
+import os
+import sys
+import sqlite3
+import tkinter as tk
+from tkinter import ttk
+
+# Make the shared transcriptor_core package importable when run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from transcriptor_core.search_index import search, stats, format_ms
+
+# Custom color scheme
+COLORS = {
+    "primary_red": "#C41E3A",      # Cardinal red - primary color
+    "secondary_red": "#8B0000",    # Dark red for accents
+    "light_red": "#FF6B6B",        # Light red for highlights
+    "white": "#FFFFFF",            # White
+    "light_gray": "#F5F5F5",       # Light gray for backgrounds
+    "dark_gray": "#333333",        # Dark gray for text
+    "border_gray": "#E0E0E0",      # Border color for separation
+    "hover_red": "#D32C47"         # Slightly lighter red for hover effects
+}
+
+class TranscriptSearchApp:
+    def __init__(self, root, container=None):
+        self.root = root
+        # When hosted by the launcher the tool lives in a frame of its window
+        self.container = container or root
+        if container is None:
+            self.root.title("Transcript Search")
+            self.root.geometry("800x600")
+            self.root.resizable(True, True)
+            self.root.configure(bg=COLORS["white"])
+        
+        # Results by tree item id
+        self.results = {}
+        
+        # Configure styles
+        self.configure_styles()
+        
+        self.create_widgets()
+        self.show_index_stats()
+    
+    def configure_styles(self):
+        # Create custom styles for widgets
+        self.style = ttk.Style()
+        
+        self.style.configure("Search.Main.TFrame", background=COLORS["white"])
+        
+        self.style.configure("Search.Title.TLabel",
+                            background=COLORS["white"],
+                            foreground=COLORS["primary_red"],
+                            font=("Segoe UI", 18, "bold"))
+        
+        self.style.configure("Search.Status.TLabel",
+                            background=COLORS["white"],
+                            foreground=COLORS["dark_gray"],
+                            font=("Segoe UI", 10))
+        
+        self.style.configure("Search.Accent.TButton",
+                            font=("Segoe UI", 12, "bold"),
+                            background=COLORS["secondary_red"],
+                            foreground=COLORS["primary_red"])
+    
+    def create_widgets(self):
+        # Main frame
+        main_frame = ttk.Frame(self.container, padding="20", style="Search.Main.TFrame")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Title
+        title_label = ttk.Label(main_frame, text="Transcript Search", style="Search.Title.TLabel")
+        title_label.pack(pady=10)
+        
+        # Query row
+        query_frame = ttk.Frame(main_frame, style="Search.Main.TFrame")
+        query_frame.pack(fill=tk.X, pady=10)
+        
+        self.query_var = tk.StringVar()
+        query_entry = ttk.Entry(query_frame, textvariable=self.query_var, width=50)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        query_entry.bind("<Return>", lambda event: self.run_search())
+        
+        search_button = ttk.Button(query_frame, text="Search", command=self.run_search, style="Search.Accent.TButton")
+        search_button.pack(side=tk.RIGHT)
+        
+        # Results: media file, offset into it and the matching segment
+        results_frame = ttk.Frame(main_frame, style="Search.Main.TFrame")
+        results_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        
+        self.results_tree = ttk.Treeview(results_frame, columns=("file", "time", "text"), show="headings")
+        self.results_tree.heading("file", text="File")
+        self.results_tree.heading("time", text="Time")
+        self.results_tree.heading("text", text="Transcript")
+        self.results_tree.column("file", width=200)
+        self.results_tree.column("time", width=100, stretch=False)
+        self.results_tree.column("text", width=400)
+        self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.results_tree.bind("<Double-1>", self.copy_location)
+        
+        results_scrollbar = ttk.Scrollbar(results_frame, command=self.results_tree.yview)
+        self.results_tree.configure(yscrollcommand=results_scrollbar.set)
+        results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Status label
+        self.status_var = tk.StringVar(value="")
+        status_label = ttk.Label(main_frame, textvariable=self.status_var, style="Search.Status.TLabel")
+        status_label.pack(anchor=tk.W, pady=5)
+    
+    def show_index_stats(self):
+        try:
+            entry = stats()
+            self.status_var.set(f"{entry['media']} file(s) and {entry['segments']} segment(s) indexed. "
+                                f"Double-click a result to copy its location.")
+        except sqlite3.Error as e:
+            self.status_var.set(f"Could not open the search index: {e}")
+    
+    def run_search(self):
+        query = self.query_var.get().strip()
+        if not query:
+            return
+        
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.results = {}
+        try:
+            hits = search(query, limit=500)
+        except sqlite3.Error as e:
+            self.status_var.set(f"Search error: {e}")
+            return
+        
+        for hit in hits:
+            item = self.results_tree.insert("", tk.END, values=(
+                os.path.basename(hit["media"]), format_ms(hit["start_ms"]), hit["snippet"]))
+            self.results[item] = hit
+        self.status_var.set(f"{len(hits)} match(es) for \"{query}\"")
+    
+    def copy_location(self, event):
+        item = self.results_tree.focus()
+        hit = self.results.get(item)
+        if hit is None:
+            return
+        location = f"{hit['media']} @ {format_ms(hit['start_ms'])} ({hit['start_ms']} ms)"
+        self.root.clipboard_clear()
+        self.root.clipboard_append(location)
+        self.status_var.set(f"Copied: {location}")
+
+def main():
+    root = tk.Tk()
+    app = TranscriptSearchApp(root)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
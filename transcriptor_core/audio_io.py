@@ -0,0 +1,254 @@
+import contextlib
+import json
+import queue
+import subprocess
+import threading
+import wave
+
+from transcriptor_core.lazy_import import lazy_import
+from transcriptor_core import tracing
+
+np = lazy_import("numpy")
+
+SAMPLE_RATE = 16000
+
+
+def run_ffmpeg(command, input_bytes=None):
+    try:
+        completed = subprocess.run(command, input=input_bytes, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError(f"{command[0]} was not found; please install ffmpeg to decode audio files")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore').strip()}")
+    return completed.stdout
+
+
+def probe(path):
+    # Duration, sample rate and channel count of the first audio stream
+    if path.lower().endswith(".wav"):
+        try:
+            with contextlib.closing(wave.open(path, "rb")) as f:
+                return {
+                    "duration": f.getnframes() / float(f.getframerate()),
+                    "sample_rate": f.getframerate(),
+                    "channels": f.getnchannels(),
+                }
+        except (wave.Error, EOFError):
+            pass
+    
+    output = run_ffmpeg([
+        "ffprobe", "-v", "error", "-select_streams", "a:0",
+        "-show_entries", "stream=sample_rate,channels:format=duration",
+        "-of", "json", path,
+    ])
+    info = json.loads(output.decode("utf-8"))
+    stream = (info.get("streams") or [{}])[0]
+    return {
+        "duration": float(info.get("format", {}).get("duration", 0.0)),
+        "sample_rate": int(stream.get("sample_rate", 0)),
+        "channels": int(stream.get("channels", 0)),
+    }
+
+
+def read_wav_pcm16(path, sample_rate=SAMPLE_RATE):
+    # Already-16 kHz mono 16-bit WAV needs no decoder at all; None otherwise
+    if not read_wav_header_matches(path, sample_rate):
+        return None
+    with contextlib.closing(wave.open(path, "rb")) as f:
+        return f.readframes(f.getnframes())
+
+
+def load_audio(path, sample_rate=SAMPLE_RATE):
+    # Decode any file ffmpeg understands (audio or video container) to mono float32
+    if path.lower().endswith(".wav"):
+        with tracing.span("decode_audio", decoder="wav"):
+            pcm = read_wav_pcm16(path, sample_rate)
+        if pcm is not None:
+            return pcm16_to_float(pcm)
+    
+    with tracing.span("decode_audio", decoder="ffmpeg"):
+        pcm = run_ffmpeg([
+            "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+            "-i", path,
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+            "-",
+        ])
+    return pcm16_to_float(pcm)
+
+
+def decode_pcm(path):
+    # Native-rate, native-channel 16-bit PCM; with resample_pcm this splits
+    # load_audio into its two costs for benchmarking
+    if path.lower().endswith(".wav"):
+        try:
+            with contextlib.closing(wave.open(path, "rb")) as f:
+                if f.getsampwidth() == 2 and f.getcomptype() == "NONE":
+                    return f.readframes(f.getnframes())
+        except (wave.Error, EOFError):
+            pass
+    return run_ffmpeg([
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", path, "-f", "s16le", "-acodec", "pcm_s16le", "-",
+    ])
+
+
+def resample_pcm(pcm, rate, channels, sample_rate=SAMPLE_RATE):
+    if rate == sample_rate and channels == 1:
+        return pcm16_to_float(pcm)
+    return pcm16_to_float(run_ffmpeg([
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-f", "s16le", "-ar", str(rate), "-ac", str(channels), "-i", "-",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-",
+    ], input_bytes=pcm))
+
+
+class StreamResampler:
+    # One ffmpeg process for a whole stream, so the resampling filter keeps its
+    # state across blocks instead of restarting at every block boundary the way
+    # separate resample_pcm calls do. A reader thread drains ffmpeg's output so
+    # writing a block never blocks on a full pipe.
+    def __init__(self, rate, channels, sample_rate=SAMPLE_RATE):
+        command = [
+            "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(rate), "-ac", str(channels), "-i", "-",
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-",
+        ]
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            raise RuntimeError("ffmpeg was not found; please install ffmpeg to decode audio files")
+        self.output = queue.Queue()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+    
+    def _read(self):
+        while True:
+            block = self.process.stdout.read1(65536)
+            # An empty block marks the end of the stream
+            self.output.put(block)
+            if not block:
+                return
+    
+    def _take(self, until_end=False):
+        blocks = []
+        while True:
+            try:
+                block = self.output.get() if until_end else self.output.get_nowait()
+            except queue.Empty:
+                break
+            if not block:
+                break
+            blocks.append(block)
+        return b"".join(blocks)
+    
+    def feed(self, pcm):
+        # Returns the resampled PCM ready so far; the filter holds a little back
+        self.process.stdin.write(pcm)
+        self.process.stdin.flush()
+        return self._take()
+    
+    def close(self):
+        # Returns the rest of the stream
+        self.process.stdin.close()
+        tail = self._take(until_end=True)
+        if self.process.wait() != 0:
+            raise RuntimeError(f"Failed to resample audio: {self.process.stderr.read().decode(errors='ignore').strip()}")
+        self.process.stdout.close()
+        self.process.stderr.close()
+        return tail
+    
+    def abort(self):
+        if self.process.poll() is None:
+            self.process.kill()
+
+
+def _pcm_blocks(path, block_bytes, sample_rate=SAMPLE_RATE):
+    # 16 kHz mono 16-bit PCM in blocks, without holding the whole file
+    if path.lower().endswith(".wav") and read_wav_header_matches(path, sample_rate):
+        with contextlib.closing(wave.open(path, "rb")) as f:
+            while True:
+                block = f.readframes(block_bytes // 2)
+                if not block:
+                    return
+                yield block
+    
+    command = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "-",
+    ]
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg was not found; please install ffmpeg to decode audio files")
+    try:
+        while True:
+            block = process.stdout.read(block_bytes)
+            if not block:
+                break
+            yield block
+        if process.wait() != 0:
+            raise RuntimeError(f"Failed to decode audio: {process.stderr.read().decode(errors='ignore').strip()}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def read_wav_header_matches(path, sample_rate=SAMPLE_RATE):
+    try:
+        with contextlib.closing(wave.open(path, "rb")) as f:
+            return (f.getframerate() == sample_rate and f.getnchannels() == 1 and f.getsampwidth() == 2
+                    and f.getcomptype() == "NONE")
+    except (wave.Error, EOFError):
+        return False
+
+
+def quiet_cut(pcm, sample_rate=SAMPLE_RATE, search_seconds=2.0, window_seconds=0.1):
+    # Byte offset of the quietest window near the end of pcm, so a chunk boundary
+    # falls in a pause instead of the middle of a word
+    window = int(window_seconds * sample_rate)
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    tail = samples[max(0, len(samples) - int(search_seconds * sample_rate)):]
+    windows = len(tail) // window
+    if windows < 2:
+        return len(samples) * 2
+    energy = np.abs(tail[:windows * window].reshape(windows, window).astype(np.int32)).mean(axis=1)
+    quietest = int(np.argmin(energy))
+    return (len(samples) - len(tail) + quietest * window + window // 2) * 2
+
+
+def iter_audio_chunks(path, chunk_seconds, sample_rate=SAMPLE_RATE):
+    # Yields (offset_seconds, float32 samples) chunks of about chunk_seconds each
+    chunk_bytes = int(chunk_seconds * sample_rate) * 2
+    buffer = b""
+    offset_samples = 0
+    for block in _pcm_blocks(path, 1 << 20, sample_rate):
+        buffer += block
+        while len(buffer) >= chunk_bytes:
+            cut = quiet_cut(buffer[:chunk_bytes], sample_rate)
+            yield offset_samples / float(sample_rate), pcm16_to_float(buffer[:cut])
+            offset_samples += cut // 2
+            buffer = buffer[cut:]
+    if buffer:
+        yield offset_samples / float(sample_rate), pcm16_to_float(buffer)
+
+
+def pcm16_to_float(pcm):
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def float_to_pcm16(samples):
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+
+def normalize(samples, headroom_db=0.1):
+    # Peak normalization, matching pydub's AudioSegment.normalize()
+    peak = np.abs(samples).max() if len(samples) else 0.0
+    if peak <= 0:
+        return samples
+    target = 10 ** (-headroom_db / 20.0)
+    return samples * (target / peak)
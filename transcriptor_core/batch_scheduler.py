@@ -0,0 +1,174 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from transcriptor_core.model_cache import inference_lock
+from transcriptor_core.lazy_import import lazy_import
+from transcriptor_core import tracing
+from transcriptor_core.presets import DEFAULT_LIVE_PRESET, decode_options, batch_decode_options
+
+torch = lazy_import("torch")
+whisper = lazy_import("whisper")
+
+
+
+class BatchScheduler:
+    # Collects utterances from many live sessions for up to max_wait seconds and
+    # decodes them as one padded (batch, n_mels, 3000) mel tensor, so the encoder
+    # and decoder matmuls run once per batch instead of once per utterance.
+    # Engines without batch support are decoded one utterance at a time.
+    def __init__(self, engine_provider, max_batch=8, max_wait=0.05, language="en", preset=DEFAULT_LIVE_PRESET):
+        self.engine_provider = engine_provider
+        self.preset = preset
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.language = language
+        self.pending = queue.Queue()
+        self.is_running = False
+        self.worker = None
+        # Set by stop(); submit() refuses new work from then on, so no future is
+        # left waiting for a worker that has exited
+        self.closed = False
+        self.lock = threading.Lock()
+        
+        # Simple counters for tuning max_wait against batch fill
+        self.batches_run = 0
+        self.utterances_run = 0
+    
+    def start(self):
+        with self.lock:
+            self.closed = False
+        self.is_running = True
+        self.worker = threading.Thread(target=self.run)
+        self.worker.daemon = True
+        self.worker.start()
+    
+    def stop(self):
+        with self.lock:
+            self.closed = True
+        self.is_running = False
+        if self.worker is not None:
+            self.worker.join(timeout=5)
+            self.worker = None
+        
+        # Whatever the worker did not get to is failed rather than abandoned
+        while True:
+            try:
+                _, future, _ = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            if not future.done():
+                future.set_exception(RuntimeError("Batch scheduler stopped"))
+    
+    def submit(self, samples, language=None):
+        # samples: 16 kHz mono float32; returns a Future resolving to a result
+        # dict like engine.transcribe's, with "text" stripped and one segment per
+        # utterance for batched decodes, so sessions can judge the decode's quality.
+        # language overrides the scheduler's own for sessions that detect theirs.
+        future = Future()
+        with self.lock:
+            if self.closed:
+                future.set_exception(RuntimeError("Batch scheduler stopped"))
+            else:
+                self.pending.put((samples, future, language or self.language))
+        return future
+    
+    def average_batch_size(self):
+        if self.batches_run == 0:
+            return 0.0
+        return self.utterances_run / self.batches_run
+    
+    def run(self):
+        while self.is_running or not self.pending.empty():
+            try:
+                first = self.pending.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            # Keep collecting until the batch is full or the oldest request hits max_wait
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                self.decode_batch(batch)
+            except Exception as e:
+                print(f"Batched transcription error: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    def decode_batch(self, batch):
+        # Drop requests whose session gave up waiting; the rest can no longer be cancelled
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        
+        engine = self.engine_provider()
+        if engine is None:
+            raise RuntimeError("Whisper model is not loaded")
+        
+        if not engine.capabilities["batch"]:
+            for samples, future, language in batch:
+                result = engine.transcribe(samples, language=language, preset=self.preset)
+                result["text"] = result["text"].strip()
+                future.set_result(result)
+            return
+        
+        # Utterances longer than one 30 s window need the sliding-window transcribe;
+        # the rest are batched per language, since one decode takes one language
+        by_language = {}
+        for samples, future, language in batch:
+            if len(samples) > whisper.audio.N_SAMPLES:
+                result = engine.transcribe(samples, language=language, preset=self.preset)
+                result["text"] = result["text"].strip()
+                future.set_result(result)
+            else:
+                by_language.setdefault(language, []).append((samples, future))
+        
+        for language, short_items in by_language.items():
+            self.decode_short(engine, short_items, language)
+    
+    def decode_short(self, engine, short_items, language):
+        model = engine.model
+        mels = [
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(samples), model.dims.n_mels)
+            for samples, _ in short_items
+        ]
+        mel_batch = torch.stack(mels).to(model.device)
+        options = whisper.DecodingOptions(
+            language=language,
+            task="transcribe",
+            without_timestamps=True,
+            **batch_decode_options(self.preset, model.device)
+        )
+        
+        with inference_lock(model):
+            with tracing.span("batch.decode", utterances=len(short_items)):
+                results = whisper.decode(model, mel_batch, options)
+        
+        self.batches_run += 1
+        self.utterances_run += len(short_items)
+        
+        thresholds = decode_options(self.preset)
+        
+        # Route every result back to the session that submitted it
+        for (_, future), result in zip(short_items, results):
+            # Same rule whisper.transcribe uses for treating a window as silence
+            if (result.no_speech_prob > thresholds["no_speech_threshold"]
+                    and result.avg_logprob < thresholds["logprob_threshold"]):
+                future.set_result({"text": "", "segments": []})
+            else:
+                text = result.text.strip()
+                future.set_result({
+                    "text": text,
+                    "segments": [{"text": text, "avg_logprob": result.avg_logprob}],
+                })
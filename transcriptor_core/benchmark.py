@@ -0,0 +1,293 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+import zlib
+
+from transcriptor_core.lazy_import import lazy_import
+from transcriptor_core.audio_io import SAMPLE_RATE, probe, decode_pcm, resample_pcm
+from transcriptor_core.capture_sources import SyntheticSource
+from transcriptor_core.engines import ENGINES, create_engine
+from transcriptor_core.latency import percentile
+from transcriptor_core.live_pipeline import SilenceSegmenter, transcribe_pcm
+from transcriptor_core.memory import PeakRssMonitor
+from transcriptor_core.presets import DEFAULT_FILE_PRESET, DEFAULT_LIVE_PRESET
+
+moviepy = lazy_import("moviepy.editor")
+
+# Times every stage of the audio, video and live paths for each engine and model,
+# on generated media so runs on different days and machines are comparable.
+# Stages: probe, extract (video only), decode, resample, model_load, inference, write.
+
+DEFAULT_MEDIA_DIR = os.path.join(tempfile.gettempdir(), "transcriptor_benchmark_media")
+
+# name -> (kind, duration seconds, sample rate, channels, container)
+MEDIA = {
+    "speech_30s": ("speech", 30, 16000, 1, "wav"),
+    "silence_30s": ("silence", 30, 16000, 1, "wav"),
+    "stereo_44k_30s": ("speech", 30, 44100, 2, "wav"),
+    "speech_30s_flac": ("speech", 30, 44100, 1, "flac"),
+    "long_10min": ("speech", 600, 16000, 1, "wav"),
+    "video_30s": ("speech", 30, 44100, 2, "mp4"),
+}
+QUICK_MEDIA = ["speech_30s", "silence_30s", "stereo_44k_30s"]
+
+DEFAULT_MODELS = {"whisper": "base", "whisper-ct2": "base", "fake": "fake"}
+
+
+def write_wav(path, pcm, rate, channels):
+    with contextlib.closing(wave.open(path, "wb")) as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(pcm)
+
+
+def generate_media(name, media_dir=DEFAULT_MEDIA_DIR):
+    # Deterministic, so a file is only generated once per media directory
+    kind, duration, rate, channels, container = MEDIA[name]
+    path = os.path.join(media_dir, f"{name}.{container}")
+    if os.path.exists(path):
+        return path
+    os.makedirs(media_dir, exist_ok=True)
+    
+    if kind == "silence":
+        source = SyntheticSource(duration=duration, burst_seconds=0.0, gap_seconds=duration)
+    else:
+        source = SyntheticSource(duration=duration, seed=zlib.crc32(name.encode("utf-8")) % 1000)
+    pcm = source.load(rate, channels)
+    
+    if container == "wav":
+        write_wav(path, pcm, rate, channels)
+        return path
+    
+    # Compressed audio and video containers need ffmpeg
+    wav_path = os.path.join(media_dir, f"{name}.source.wav")
+    write_wav(wav_path, pcm, rate, channels)
+    if container == "mp4":
+        command = ["ffmpeg", "-y", "-loglevel", "error",
+                   "-f", "lavfi", "-i", f"color=c=black:s=320x240:d={duration}",
+                   "-i", wav_path, "-c:v", "libx264", "-c:a", "aac", "-shortest", path]
+    else:
+        command = ["ffmpeg", "-y", "-loglevel", "error", "-i", wav_path, path]
+    try:
+        subprocess.run(command, capture_output=True, check=True)
+    finally:
+        os.remove(wav_path)
+    return path
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+    
+    @contextlib.contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(time.perf_counter() - started, 4)
+
+
+def run_file_case(engine, path, video=False):
+    # Mirrors transcribe_audio / transcribe_video, one timed stage at a time
+    timer = StageTimer()
+    with PeakRssMonitor() as memory:
+        started = time.perf_counter()
+        temp_dir = tempfile.mkdtemp(prefix="transcriptor_bench_")
+        try:
+            source_path = path
+            if video:
+                with timer.stage("extract"):
+                    clip = moviepy.VideoFileClip(path)
+                    source_path = os.path.join(temp_dir, "audio.wav")
+                    clip.audio.write_audiofile(source_path, verbose=False, logger=None)
+                    clip.close()
+            with timer.stage("probe"):
+                info = probe(source_path)
+            with timer.stage("decode"):
+                pcm = decode_pcm(source_path)
+            with timer.stage("resample"):
+                samples = resample_pcm(pcm, info["sample_rate"], info["channels"])
+            with timer.stage("inference"):
+                result = engine.transcribe(samples, language="en")
+            with timer.stage("write"):
+                with open(os.path.join(temp_dir, "transcript.txt"), "w", encoding="utf-8") as f:
+                    f.write(result["text"])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        wall = time.perf_counter() - started
+    
+    audio_seconds = len(samples) / float(SAMPLE_RATE)
+    return {
+        "path": "video" if video else "audio",
+        "audio_seconds": round(audio_seconds, 2),
+        "wall_seconds": round(wall, 4),
+        "real_time_factor": round(wall / audio_seconds, 4) if audio_seconds else 0.0,
+        "peak_rss_mb": round(memory.peak_mb, 1),
+        "stages": timer.stages,
+        "segments": len(result["segments"]),
+    }
+
+
+def run_live_case(engine, path):
+    # The live pipeline without a microphone: segment as fast as possible and
+    # decode each utterance the moment it closes
+    info = probe(path)
+    samples = resample_pcm(decode_pcm(path), info["sample_rate"], info["channels"])
+    pcm = (samples * 32767).astype("int16").tobytes()
+    
+    segmenter = SilenceSegmenter(rate=SAMPLE_RATE)
+    latencies = []
+    with PeakRssMonitor() as memory:
+        started = time.perf_counter()
+        utterances = segmenter.feed_bytes(pcm)
+        final = segmenter.flush()
+        if final is not None:
+            utterances.append(final)
+        for frames, _ in utterances:
+            decode_started = time.perf_counter()
+            transcribe_pcm(engine, b"".join(frames), preset=DEFAULT_LIVE_PRESET)
+            latencies.append((time.perf_counter() - decode_started) * 1000.0)
+        wall = time.perf_counter() - started
+    
+    latencies.sort()
+    audio_seconds = len(samples) / float(SAMPLE_RATE)
+    return {
+        "path": "live",
+        "audio_seconds": round(audio_seconds, 2),
+        "wall_seconds": round(wall, 4),
+        "real_time_factor": round(wall / audio_seconds, 4) if audio_seconds else 0.0,
+        "peak_rss_mb": round(memory.peak_mb, 1),
+        "utterances": len(latencies),
+        "utterance_latency_ms": {f"p{pct}": round(percentile(latencies, pct), 2) for pct in (50, 95, 99)},
+    }
+
+
+def run_suite(engine_models, media_names, media_dir=DEFAULT_MEDIA_DIR, preset=DEFAULT_FILE_PRESET):
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "cpus": os.cpu_count()},
+        "engines": {},
+        "cases": {},
+    }
+    
+    media = {}
+    for name in media_names:
+        try:
+            media[name] = generate_media(name, media_dir)
+        except Exception as e:
+            print(f"Skipping {name}: could not generate media ({e})")
+    
+    for engine_name, model_name in engine_models:
+        engine_key = f"{engine_name}/{model_name}"
+        engine = create_engine(engine_name, model_name=model_name, preset=preset)
+        with PeakRssMonitor() as memory:
+            started = time.perf_counter()
+            try:
+                engine.load()
+            except Exception as e:
+                print(f"Skipping {engine_key}: {e}")
+                continue
+        report["engines"][engine_key] = {
+            "model_load_seconds": round(time.perf_counter() - started, 4),
+            "model_rss_mb": round(memory.peak_mb - memory.start_mb, 1),
+        }
+        
+        for name, path in media.items():
+            video = MEDIA[name][4] == "mp4"
+            runs = [("file", lambda: run_file_case(engine, path, video=video))]
+            if not video and name != "long_10min":
+                runs.append(("live", lambda: run_live_case(engine, path)))
+            for mode, run in runs:
+                case_key = f"{engine_key}:{name}:{mode}"
+                try:
+                    report["cases"][case_key] = run()
+                except Exception as e:
+                    report["cases"][case_key] = {"error": str(e)}
+                print(f"{case_key}: {summarize(report['cases'][case_key])}")
+    return report
+
+
+def summarize(case):
+    if "error" in case:
+        return f"error: {case['error']}"
+    return (f"wall {case['wall_seconds']:.3f}s  RTF {case['real_time_factor']:.4f}  "
+            f"peak RSS {case['peak_rss_mb']:.0f} MB")
+
+
+def compare(report, baseline, tolerance=0.10):
+    # A case regresses when wall time or peak RSS grows by more than tolerance
+    regressions = []
+    for case_key, case in report["cases"].items():
+        previous = baseline.get("cases", {}).get(case_key)
+        if not previous or "error" in case or "error" in previous:
+            continue
+        for metric in ("wall_seconds", "peak_rss_mb"):
+            if not previous.get(metric):
+                continue
+            change = (case[metric] - previous[metric]) / previous[metric]
+            marker = "REGRESSION" if change > tolerance else ""
+            print(f"{case_key} {metric}: {previous[metric]} -> {case[metric]} ({change * 100:+.1f}%) {marker}")
+            if change > tolerance:
+                regressions.append((case_key, metric, change))
+    return regressions
+
+
+def parse_engine_models(specs):
+    # "whisper:tiny,base" -> [("whisper", "tiny"), ("whisper", "base")]
+    engine_models = []
+    for spec in specs:
+        engine_name, _, models = spec.partition(":")
+        if engine_name not in ENGINES:
+            raise ValueError(f"Unknown engine {engine_name}; choose from {', '.join(ENGINES)}")
+        for model_name in (models.split(",") if models else [DEFAULT_MODELS.get(engine_name)]):
+            engine_models.append((engine_name, model_name))
+    return engine_models
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the audio, video and live paths")
+    parser.add_argument("--engine", action="append", default=[],
+                        help="engine[:model,model] to benchmark, e.g. whisper:tiny,base (default: fake)")
+    parser.add_argument("--media", action="append", choices=list(MEDIA),
+                        help="Media to run (default: a quick set)")
+    parser.add_argument("--all-media", action="store_true", help="Include long files and containers")
+    parser.add_argument("--media-dir", default=DEFAULT_MEDIA_DIR)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against a saved report")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Allowed slowdown in percent")
+    args = parser.parse_args()
+    
+    try:
+        engine_models = parse_engine_models(args.engine or ["fake"])
+    except ValueError as e:
+        parser.error(str(e))
+    media_names = list(MEDIA) if args.all_media else (args.media or QUICK_MEDIA)
+    
+    report = run_suite(engine_models, media_names, args.media_dir)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance / 100.0)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.tolerance:.0f}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
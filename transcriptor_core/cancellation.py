@@ -0,0 +1,117 @@
+import contextlib
+import threading
+
+# Cooperative cancellation. Nothing is killed from outside: a job's CancelToken
+# is installed for the thread running it (cancel_scope), and the places where
+# work can stop cleanly call checkpoint(), which raises JobCancelled once the
+# token is cancelled. Checkpoints sit between chunks, between segments and, for
+# Whisper, before every encoder and decoder step, so a cancelled job stops
+# within a fraction of a second. The exception unwinds through the usual with
+# and finally blocks, which hand back the model lock, the CPU slot and the
+# memory reservation and drop the job's audio.
+POLL_SECONDS = 0.25   # How often blocking waits look at the token
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self.event = threading.Event()
+        self.reason = None
+        self.callbacks = []
+        self.lock = threading.Lock()
+    
+    def cancel(self, reason="Cancelled"):
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.reason = reason
+            self.event.set()
+            callbacks = list(self.callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Warning: Cancel callback failed: {e}")
+    
+    def is_cancelled(self):
+        return self.event.is_set()
+    
+    def check(self):
+        if self.event.is_set():
+            raise JobCancelled(self.reason)
+    
+    def on_cancel(self, callback):
+        # For work the token cannot reach, like a job running in another process;
+        # runs right away when the token is already cancelled
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+    
+    def wait(self, timeout=None):
+        return self.event.wait(timeout)
+
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def cancel_scope(token):
+    # Makes `token` the one checkpoint() sees on this thread
+    previous = getattr(_local, "token", None)
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def current_token():
+    return getattr(_local, "token", None)
+
+
+def checkpoint():
+    token = current_token()
+    if token is not None:
+        token.check()
+
+
+def wait_future(future):
+    # future.result() that is also a checkpoint. A cancelled waiter cancels the
+    # future as well, so a worker that has not picked it up yet skips it; one
+    # already running it finishes and the result is dropped.
+    done = threading.Event()
+    future.add_done_callback(lambda _: done.set())
+    try:
+        while not done.wait(POLL_SECONDS):
+            checkpoint()
+    except JobCancelled:
+        future.cancel()
+        raise
+    return future.result()
+
+
+@contextlib.contextmanager
+def module_checkpoints(*modules):
+    # A forward pre-hook on each torch module makes every call to it a
+    # checkpoint; Whisper runs its encoder once per 30 s window and its decoder
+    # once per token. The hooks are only installed while a token is in scope and
+    # are removed on the way out, since the model is shared.
+    token = current_token()
+    if token is None:
+        yield
+        return
+    
+    def hook(module, inputs):
+        token.check()
+    
+    handles = [module.register_forward_pre_hook(hook) for module in modules]
+    try:
+        yield
+    finally:
+        for handle in handles:
+            handle.remove()
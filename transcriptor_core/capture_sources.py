@@ -0,0 +1,116 @@
+import time
+import numpy as np
+
+
+class MicrophoneSource:
+    # Default live capture: the PyAudio default input device
+    def __init__(self, pyaudio_instance):
+        self.pyaudio = pyaudio_instance
+        self.stream = None
+    
+    def open(self, rate, channels, chunk):
+        import pyaudio
+        self.stream = self.pyaudio.open(
+            format=pyaudio.paInt16,
+            channels=channels,
+            rate=rate,
+            input=True,
+            frames_per_buffer=chunk
+        )
+    
+    def read(self, chunk):
+        return self.stream.read(chunk)
+    
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+
+
+class PcmReplaySource:
+    # Replays 16-bit PCM chunk by chunk. speed=1.0 paces like a microphone,
+    # larger values replay faster and 0 replays as fast as the pipeline reads.
+    # An empty read signals the end of the stream.
+    def __init__(self, pcm=b"", speed=1.0):
+        self.pcm = pcm
+        self.speed = speed
+        self.rate = 16000
+        self.channels = 1
+        self.position = 0
+        self.started = None
+        self.samples_read = 0
+    
+    def load(self, rate, channels):
+        return self.pcm
+    
+    def open(self, rate, channels, chunk):
+        self.rate = rate
+        self.channels = channels
+        self.pcm = self.load(rate, channels)
+        self.position = 0
+        self.samples_read = 0
+        self.started = time.monotonic()
+    
+    def read(self, chunk):
+        chunk_bytes = chunk * self.channels * 2
+        data = self.pcm[self.position:self.position + chunk_bytes]
+        self.position += len(data)
+        
+        if data and self.speed > 0:
+            # Pace against the start time rather than sleeping per chunk so errors don't accumulate
+            self.samples_read += len(data) // (self.channels * 2)
+            due = self.started + self.samples_read / float(self.rate) / self.speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+    
+    def close(self):
+        pass
+    
+    def duration(self):
+        return len(self.pcm) / float(self.rate * self.channels * 2)
+
+
+class FileSource(PcmReplaySource):
+    # Replays any file ffmpeg can decode (WAV, FLAC, MP3, ...) as if it were the microphone
+    def __init__(self, path, speed=1.0):
+        super().__init__(speed=speed)
+        self.path = path
+    
+    def load(self, rate, channels):
+        from pydub import AudioSegment
+        audio = AudioSegment.from_file(self.path)
+        audio = audio.set_frame_rate(rate).set_channels(channels).set_sample_width(2)
+        return audio.raw_data
+
+
+class SyntheticSource(PcmReplaySource):
+    # Deterministic speech-like bursts (harmonic tones with a syllable-rate envelope)
+    # separated by silence, for exercising segmentation without any media files
+    def __init__(self, duration=30.0, burst_seconds=2.0, gap_seconds=2.0, seed=0, speed=1.0):
+        super().__init__(speed=speed)
+        self.total_duration = duration
+        self.burst_seconds = burst_seconds
+        self.gap_seconds = gap_seconds
+        self.seed = seed
+    
+    def load(self, rate, channels):
+        rng = np.random.RandomState(self.seed)
+        pieces = []
+        elapsed = 0.0
+        while elapsed < self.total_duration:
+            burst_samples = int(self.burst_seconds * rate)
+            t = np.arange(burst_samples) / float(rate)
+            pitch = rng.uniform(110, 220)
+            voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+            envelope = 0.5 * (1 - np.cos(2 * np.pi * 4.0 * t))  # ~4 syllables per second
+            pieces.append(voice * envelope * 6000 + rng.normal(0, 50, burst_samples))
+            pieces.append(rng.normal(0, 50, int(self.gap_seconds * rate)))
+            elapsed += self.burst_seconds + self.gap_seconds
+        
+        signal = np.clip(np.concatenate(pieces), -32768, 32767).astype(np.int16)
+        if channels > 1:
+            signal = np.repeat(signal, channels)
+        return signal.tobytes()
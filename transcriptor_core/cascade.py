@@ -0,0 +1,169 @@
+import argparse
+import time
+
+from transcriptor_core.audio_io import SAMPLE_RATE
+from transcriptor_core.cancellation import JobCancelled, checkpoint
+
+# Two-pass cascade: a small draft model transcribes everything, then only the
+# segments it was unsure of are decoded again with a larger model. Whisper
+# reports per segment how confident the decode was (avg_logprob), whether the
+# window looked like silence (no_speech_prob) and how repetitive the text is
+# (compression_ratio, high for loops); these pick the segments to escalate.
+# The limits are stricter than Whisper's own fallback thresholds, which only
+# catch outright failures.
+DRAFT_MODEL = "tiny"
+WEAK_LOGPROB = -0.7        # Whisper falls back to sampling below -1.0
+WEAK_COMPRESSION = 2.0     # ... and above 2.4
+WEAK_NO_SPEECH = 0.4       # Text over audio the model half thinks is silence
+SPAN_PADDING = 0.5         # Seconds of context around each re-decoded span
+SPAN_MERGE_GAP = 1.0       # Weak segments closer than this are re-decoded together
+
+
+def is_weak_segment(segment):
+    if not segment["text"].strip():
+        return False
+    avg_logprob = segment.get("avg_logprob")
+    compression_ratio = segment.get("compression_ratio")
+    no_speech_prob = segment.get("no_speech_prob")
+    return ((avg_logprob is not None and avg_logprob < WEAK_LOGPROB)
+            or (compression_ratio is not None and compression_ratio > WEAK_COMPRESSION)
+            or (no_speech_prob is not None and no_speech_prob > WEAK_NO_SPEECH))
+
+
+def weak_spans(segments):
+    # (start, end) seconds of the weak segments, with neighbours merged so one
+    # decode covers a run of weak segments. The padding is added when decoding.
+    spans = []
+    for segment in segments:
+        if not is_weak_segment(segment):
+            continue
+        start = segment["start"]
+        end = segment["end"]
+        if spans and start - spans[-1][1] <= SPAN_MERGE_GAP:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def merge_segments(draft_segments, refined):
+    # refined is a list of ((start, end), segments in file time), with spans
+    # unpadded. Each side keeps only the segments centred on its own side of the
+    # span edges: the refine pass also decoded the padding around the span, and
+    # those words are already in the neighbouring draft segments.
+    def inside(segment, start, end):
+        return start <= (segment["start"] + segment["end"]) / 2.0 < end
+    
+    merged = [segment for segment in draft_segments
+              if not any(inside(segment, start, end) for (start, end), _ in refined)]
+    for (start, end), segments in refined:
+        merged.extend(segment for segment in segments if inside(segment, start, end))
+    merged.sort(key=lambda segment: segment["start"])
+    return merged
+
+
+def cascade_transcribe(draft_engine, refine_engine, samples, language="en", preset=None):
+    duration = len(samples) / float(SAMPLE_RATE)
+    draft = draft_engine.transcribe(samples, language=language, preset=preset)
+    # The draft pass settles the language when none was given
+    language = draft.get("language") or language
+    
+    # Re-decoding with the draft model itself would only repeat the draft
+    if refine_engine.model_name == draft_engine.model_name:
+        spans = []
+    else:
+        spans = weak_spans(draft["segments"])
+    refined = []
+    escalated_seconds = 0.0
+    for start, end in spans:
+        checkpoint()
+        # Decode with context on each side; merge_segments trims it off again
+        padded_start = max(0.0, start - SPAN_PADDING)
+        padded_end = min(duration, end + SPAN_PADDING)
+        piece = samples[int(padded_start * SAMPLE_RATE):int(padded_end * SAMPLE_RATE)]
+        try:
+            result = refine_engine.transcribe(piece, language=language, preset=preset)
+        except JobCancelled:
+            raise
+        except Exception as e:
+            # The draft text stands for a span the larger model could not decode
+            print(f"Cascade: re-decoding {start:.1f}-{end:.1f}s failed, keeping the draft: {e}")
+            continue
+        segments = []
+        for segment in result["segments"]:
+            segment = dict(segment)
+            segment["start"] += padded_start
+            segment["end"] += padded_start
+            segments.append(segment)
+        refined.append(((start, end), segments))
+        escalated_seconds += padded_end - padded_start
+    
+    segments = merge_segments(draft["segments"], refined)
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": language,
+        "cascade": {
+            "draft_model": draft_engine.model_name,
+            "refine_model": refine_engine.model_name,
+            "segments": len(draft["segments"]),
+            "weak_segments": sum(1 for segment in draft["segments"] if is_weak_segment(segment)),
+            "audio_seconds": round(duration, 2),
+            "escalated_seconds": round(escalated_seconds, 2),
+            "escalated_share": round(escalated_seconds / duration, 4) if duration > 0 else 0.0,
+        },
+    }
+
+
+def combine_reports(reports):
+    # One cascade report for a file decoded in chunks
+    combined = dict(reports[0]) if reports else {}
+    for key in ("segments", "weak_segments", "audio_seconds", "escalated_seconds"):
+        combined[key] = round(sum(report[key] for report in reports), 2)
+    if reports and combined["audio_seconds"] > 0:
+        combined["escalated_share"] = round(combined["escalated_seconds"] / combined["audio_seconds"], 4)
+    return combined
+
+
+def cascade_summary(result):
+    cascade = result.get("cascade")
+    if not cascade:
+        return ""
+    if cascade["refine_model"] == cascade["draft_model"]:
+        return f"draft only, {cascade['draft_model']} is also the refine model"
+    return (f"{cascade['weak_segments']} of {cascade['segments']} segment(s) re-decoded with "
+            f"{cascade['refine_model']}, {cascade['escalated_share']:.0%} of the audio")
+
+
+def main():
+    from transcriptor_core.audio_io import load_audio
+    from transcriptor_core.engines import WHISPER_ENGINES, create_engine
+    
+    parser = argparse.ArgumentParser(description="Transcribe with a draft model and re-decode only its weak segments")
+    parser.add_argument("audio_path")
+    parser.add_argument("--engine", default="whisper", choices=WHISPER_ENGINES)
+    parser.add_argument("--draft", default=DRAFT_MODEL)
+    parser.add_argument("--refine", default="small")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--compare", action="store_true",
+                        help="Also run the refine model on the whole file, for timing")
+    args = parser.parse_args()
+    
+    samples = load_audio(args.audio_path)
+    draft_engine = create_engine(args.engine, model_name=args.draft).load()
+    refine_engine = create_engine(args.engine, model_name=args.refine).load()
+    
+    started = time.perf_counter()
+    result = cascade_transcribe(draft_engine, refine_engine, samples, language=args.language)
+    elapsed = time.perf_counter() - started
+    print(result["text"].strip())
+    print(f"Cascade {args.draft} -> {args.refine}: {elapsed:.1f}s; {cascade_summary(result)}")
+    
+    if args.compare:
+        started = time.perf_counter()
+        refine_engine.transcribe(samples, language=args.language)
+        print(f"{args.refine} on the whole file: {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+
+# Small per-user settings file shared by the launcher and the tools
+CONFIG_PATH = os.environ.get("TRANSCRIPTOR_CONFIG",
+                             os.path.join(os.path.expanduser("~"), ".transcriptor_suite.json"))
+
+DEFAULTS = {
+    "last_tool": "live",
+    "last_models": {"audio": "base", "video": "base", "live": "tiny"},
+    "prewarm_enabled": True,
+    "prewarm_memory_budget_mb": 2048,
+    "cpu_max_jobs": None,      # None lets the core count decide
+    "cpu_pin_jobs": False,
+    "job_memory_ceiling_mb": None,   # None means 75% of physical memory
+    "job_queue_path": None,          # Shared queue database; None means ~/transcriptor_queue.sqlite
+    "service_url": "http://127.0.0.1:8766",  # Tools hand jobs to this service when it runs; None disables
+}
+
+_config_lock = threading.Lock()
+
+
+def load_config():
+    config = json.loads(json.dumps(DEFAULTS))
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        for key, value in saved.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key].update(value)
+            else:
+                config[key] = value
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Warning: Could not read settings from {CONFIG_PATH}: {e}")
+    return config
+
+
+def update_config(**changes):
+    with _config_lock:
+        config = load_config()
+        for key, value in changes.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key].update(value)
+            else:
+                config[key] = value
+        try:
+            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
+                json.dump(config, f, indent=2)
+        except Exception as e:
+            print(f"Warning: Could not save settings to {CONFIG_PATH}: {e}")
+        return config
+
+
+def remember_tool(tool):
+    update_config(last_tool=tool)
+
+
+def remember_model(tool, model_name):
+    update_config(last_tool=tool, last_models={tool: model_name})
+
+
+def predicted_model(config=None, tool=None):
+    # The model the user is most likely to pick next: last model of the last tool
+    config = config or load_config()
+    tool = tool or config.get("last_tool", DEFAULTS["last_tool"])
+    return config["last_models"].get(tool, DEFAULTS["last_models"].get(tool, "base"))
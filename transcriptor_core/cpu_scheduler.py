@@ -0,0 +1,180 @@
+import argparse
+import contextlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from transcriptor_core.lazy_import import lazy_import
+from transcriptor_core.config import load_config
+from transcriptor_core.cancellation import POLL_SECONDS, cancel_scope, checkpoint, current_token
+
+torch = lazy_import("torch")
+
+# Whisper on CPU stops scaling well past a few intra-op threads, so on big
+# machines several jobs with a few threads each beat one job holding every core
+MIN_THREADS_PER_JOB = 4
+
+
+def available_cores():
+    # Cores this process may run on (respects taskset/cgroup limits on Linux)
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def plan_allocation(core_count, min_threads_per_job=MIN_THREADS_PER_JOB, max_jobs=None):
+    # Returns (parallel_jobs, threads_per_job) with parallel_jobs * threads_per_job <= core_count
+    parallel_jobs = max(1, core_count // max(1, min_threads_per_job))
+    if max_jobs:
+        parallel_jobs = min(parallel_jobs, max_jobs)
+    threads_per_job = max(1, core_count // parallel_jobs)
+    return parallel_jobs, threads_per_job
+
+
+def set_thread_budget(threads, cores=None, uses_torch=True):
+    # Both apply to the calling thread: OpenMP sizes each caller's team from its own
+    # setting, and on Linux sched_setaffinity(0) pins only the calling thread
+    if uses_torch:
+        torch.set_num_threads(threads)
+    if cores is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+
+class CpuScheduler:
+    # Hands each concurrent transcription job a slot: a thread budget and, when
+    # pinning, its own block of cores. Jobs beyond the slot count wait their turn
+    # instead of oversubscribing the CPU.
+    def __init__(self, cores=None, min_threads_per_job=MIN_THREADS_PER_JOB, max_jobs=None, pin=False):
+        self.cores = cores or available_cores()
+        self.parallel_jobs, self.threads_per_job = plan_allocation(len(self.cores), min_threads_per_job,
+                                                                   max_jobs)
+        self.pin = pin
+        self.free_slots = queue.Queue()
+        for index in range(self.parallel_jobs):
+            start = index * self.threads_per_job
+            self.free_slots.put(self.cores[start:start + self.threads_per_job])
+    
+    def describe(self):
+        pinned = ", pinned" if self.pin else ""
+        return (f"{self.parallel_jobs} parallel job(s) x {self.threads_per_job} thread(s) "
+                f"on {len(self.cores)} core(s){pinned}")
+    
+    @contextlib.contextmanager
+    def job_slot(self, uses_torch=True, on_wait=None, cancel_token=None):
+        try:
+            slot = self.free_slots.get_nowait()
+        except queue.Empty:
+            if on_wait is not None:
+                on_wait()
+            # Poll rather than block, so a job cancelled while it waits leaves the line
+            with cancel_scope(cancel_token or current_token()):
+                slot = None
+                while slot is None:
+                    checkpoint()
+                    try:
+                        slot = self.free_slots.get(timeout=POLL_SECONDS)
+                    except queue.Empty:
+                        pass
+        
+        set_thread_budget(self.threads_per_job, slot if self.pin else None, uses_torch)
+        try:
+            yield slot
+        finally:
+            # Pool threads are reused by other work, so hand back every core
+            if self.pin and hasattr(os, "sched_setaffinity"):
+                os.sched_setaffinity(0, self.cores)
+            self.free_slots.put(slot)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_cpu_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            config = load_config()
+            _scheduler = CpuScheduler(max_jobs=config["cpu_max_jobs"], pin=config["cpu_pin_jobs"])
+        return _scheduler
+
+
+# Batch mode: one worker process per slot, each limited to its own thread budget
+
+def init_worker(slots, threads, pin):
+    cores = slots.get()
+    set_thread_budget(threads, cores if pin else None)
+
+
+def transcribe_to_file(path, engine_name, model_name, preset):
+    from transcriptor_core.engines import create_engine
+    from transcriptor_core.audio_io import SAMPLE_RATE, load_audio
+    
+    engine = create_engine(engine_name, model_name=model_name, preset=preset).load()
+    samples = load_audio(path)
+    started = time.perf_counter()
+    result = engine.transcribe(samples, language="en")
+    elapsed = time.perf_counter() - started
+    
+    output_path = os.path.splitext(path)[0] + "_transcript.txt"
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(result["text"])
+    return output_path, len(samples) / float(SAMPLE_RATE), elapsed
+
+
+def transcribe_batch(paths, engine_name="whisper", model_name="base", preset="balanced",
+                     max_jobs=None, pin=False):
+    scheduler = CpuScheduler(max_jobs=max_jobs, pin=pin)
+    print(f"Running {scheduler.describe()}")
+    
+    slots = multiprocessing.Queue()
+    for _ in range(scheduler.parallel_jobs):
+        slots.put(scheduler.free_slots.get())
+    
+    started = time.perf_counter()
+    audio_seconds = 0.0
+    with ProcessPoolExecutor(max_workers=scheduler.parallel_jobs, initializer=init_worker,
+                             initargs=(slots, scheduler.threads_per_job, pin)) as executor:
+        futures = {executor.submit(transcribe_to_file, path, engine_name, model_name, preset): path
+                   for path in paths}
+        for future in as_completed(futures):
+            try:
+                output_path, duration, elapsed = future.result()
+                audio_seconds += duration
+                print(f"{futures[future]} -> {output_path} (RTF {elapsed / duration:.3f})")
+            except Exception as e:
+                print(f"Error transcribing {futures[future]}: {e}")
+    wall = time.perf_counter() - started
+    if wall > 0:
+        print(f"Transcribed {audio_seconds:.1f}s of audio in {wall:.1f}s "
+              f"({audio_seconds / wall:.2f}x real time overall)")
+
+
+def main():
+    from transcriptor_core.engines import FILE_WHISPER_ENGINES
+    from transcriptor_core.presets import DECODE_PRESETS, DEFAULT_FILE_PRESET
+    
+    parser = argparse.ArgumentParser(description="Transcribe many files at once without oversubscribing the CPU")
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--engine", default="whisper", choices=FILE_WHISPER_ENGINES)
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--preset", default=DEFAULT_FILE_PRESET, choices=list(DECODE_PRESETS))
+    parser.add_argument("--jobs", type=int, help="Cap on parallel jobs (default: from the core count)")
+    parser.add_argument("--pin", action="store_true", help="Pin each worker process to its own cores")
+    parser.add_argument("--plan", action="store_true", help="Only print the CPU allocation")
+    args = parser.parse_args()
+    
+    if args.plan:
+        print(CpuScheduler(max_jobs=args.jobs, pin=args.pin).describe())
+        return
+    if not args.paths:
+        parser.error("at least one file is required")
+    transcribe_batch(args.paths, args.engine, args.model, args.preset, max_jobs=args.jobs, pin=args.pin)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+from transcriptor_core.lazy_import import lazy_import
+from transcriptor_core import tracing
+from transcriptor_core.model_cache import get_whisper_model, get_engine_model, inference_lock, is_loaded
+from transcriptor_core.memory import estimated_memory_mb, QUANTIZED_MEMORY_FACTOR
+from transcriptor_core.presets import DEFAULT_FILE_PRESET, decode_options
+from transcriptor_core.quantize import split_quantized
+from transcriptor_core.cpu_scheduler import get_cpu_scheduler
+from transcriptor_core.sphinx_pool import get_decoder_pool, decode_utterance
+from transcriptor_core.keyword_spotting import keyphrase_file, parse_keyphrases, spot, split_blocks
+from transcriptor_core.cascade import DRAFT_MODEL, cascade_transcribe, combine_reports
+from transcriptor_core.audio_io import SAMPLE_RATE, load_audio, float_to_pcm16, normalize
+from transcriptor_core.cancellation import checkpoint, module_checkpoints
+
+sr = lazy_import("speech_recognition")
+np = lazy_import("numpy")
+whisper = lazy_import("whisper")
+
+
+class EngineError(Exception):
+    pass
+
+
+class NoSpeechError(EngineError):
+    # The engine ran but found nothing it could recognize
+    pass
+
+
+class TranscriptionEngine:
+    # Common interface for every recognition backend. Engines take 16 kHz mono
+    # float32 arrays and return {"text": str, "segments": [{"start", "end", "text"}]}
+    # with times in seconds; segments may be empty when the engine has no timing.
+    name = ""
+    label = ""
+    capabilities = {
+        "timestamps": False,     # segments carry real start/end times
+        "streaming": False,      # stream_segments yields before decoding finishes
+        "batch": False,          # supports BatchScheduler's batched decode
+        "multilingual": False,
+    }
+    # Working memory per second of audio in MB: the 16-bit and float32 copies of
+    # the samples plus whatever features the engine computes for the whole input
+    working_mb_per_second = 0.25
+    # Decodes with PyTorch, so a CPU slot has to size torch's thread pool for it
+    uses_torch = False
+    
+    def __init__(self, model_name=None, preset=DEFAULT_FILE_PRESET):
+        self.model_name = model_name
+        self.preset = preset
+        self.model = None
+    
+    def describe(self):
+        return f"{self.name}/{self.model_name}" if self.model_name else self.name
+    
+    def load(self):
+        return self
+    
+    def model_memory_mb(self):
+        return 0
+    
+    def is_model_resident(self):
+        return self.model is not None
+    
+    def estimate_peak_mb(self, duration):
+        # Memory a job on `duration` seconds of audio adds to the process
+        model_mb = 0 if self.is_model_resident() else self.model_memory_mb()
+        return int(model_mb + duration * self.working_mb_per_second)
+    
+    def transcribe(self, samples, language="en", preset=None):
+        raise NotImplementedError
+    
+    def detect_language(self, samples):
+        # (language code, probability) for up to 30 s of speech; (None, 0.0) when
+        # the engine cannot tell, and the caller keeps its fallback language
+        return None, 0.0
+    
+    def stream_segments(self, samples, language="en", preset=None):
+        for segment in self.transcribe(samples, language=language, preset=preset)["segments"]:
+            yield segment
+    
+    def transcribe_file(self, path, language="en", preset=None):
+        return self.transcribe(load_audio(path), language=language, preset=preset)
+    
+    def transcribe_chunks(self, chunks, language="en", preset=None, on_segment=None, language_detector=None):
+        # chunks yields (offset_seconds, samples); only one chunk is in memory at a time.
+        # on_segment sees each segment, with file times, as soon as its chunk is done.
+        # With a language_detector, a chunk is re-identified only after weak chunks.
+        results = []
+        error = None
+        for offset, samples in chunks:
+            checkpoint()
+            if language_detector is not None:
+                language = language_detector.language_for(self, samples)
+            try:
+                result = self.transcribe(samples, language=language, preset=preset)
+            except EngineError as e:
+                # A silent stretch should not fail the whole file
+                error = e
+                continue
+            if language_detector is not None:
+                language_detector.observe(result)
+            segments = []
+            for segment in result["segments"]:
+                segment = dict(segment)
+                segment["start"] += offset
+                segment["end"] += offset
+                segments.append(segment)
+                if on_segment is not None:
+                    on_segment(segment)
+            results.append(dict(result, segments=segments))
+        if error is not None and not any(result["text"].strip() for result in results):
+            raise error
+        return self.combine_chunks(results, language)
+    
+    def combine_chunks(self, results, language):
+        # One result from the per-chunk results, whose segments are already in file time
+        texts = [result["text"].strip() for result in results]
+        return {
+            "text": " ".join(text for text in texts if text),
+            "segments": [segment for result in results for segment in result["segments"]],
+            "language": language,
+        }
+
+
+class WhisperEngine(TranscriptionEngine):
+    name = "whisper"
+    label = "OpenAI Whisper (High Accuracy)"
+    capabilities = {"timestamps": True, "streaming": False, "batch": True, "multilingual": True}
+    # transcribe() computes the STFT and log-mel spectrogram of the whole file up front
+    working_mb_per_second = 0.5
+    uses_torch = True
+    
+    def __init__(self, model_name="base", preset=DEFAULT_FILE_PRESET):
+        super().__init__(model_name, preset)
+    
+    def model_memory_mb(self):
+        return estimated_memory_mb(self.model_name)
+    
+    def is_model_resident(self):
+        return self.model is not None or is_loaded(self.model_name)
+    
+    def load(self):
+        if self.model is None:
+            self.model = get_whisper_model(self.model_name)
+        return self
+    
+    def transcribe(self, samples, language="en", preset=None):
+        self.load()
+        lock = inference_lock(self.model)
+        # Waiting here means another tool or session is decoding on the same model
+        with tracing.span("whisper.lock_wait"):
+            lock.acquire()
+        try:
+            # Every encoder window and decoder step checks for a cancelled job
+            with module_checkpoints(self.model.encoder, self.model.decoder):
+                with tracing.span("whisper.decode", model=self.model_name, samples=len(samples)):
+                    result = self.model.transcribe(
+                        samples,
+                        language=language,
+                        task="transcribe",
+                        **decode_options(preset or self.preset, self.model.device)
+                    )
+        finally:
+            lock.release()
+        return {
+            "text": result["text"],
+            "segments": [
+                {"start": segment["start"], "end": segment["end"], "text": segment["text"],
+                 "avg_logprob": segment.get("avg_logprob"), "no_speech_prob": segment.get("no_speech_prob"),
+                 "compression_ratio": segment.get("compression_ratio")}
+                for segment in result.get("segments", [])
+            ],
+            "language": result.get("language", language),
+        }
+    
+    def detect_language(self, samples):
+        self.load()
+        if not self.model.is_multilingual:
+            # The .en models only know English
+            return "en", 1.0
+        # One encoder pass over a single 30 s window, without decoding any text
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(samples), self.model.dims.n_mels)
+        with inference_lock(self.model), module_checkpoints(self.model.encoder, self.model.decoder):
+            with tracing.span("whisper.detect_language", model=self.model_name):
+                _, probabilities = self.model.detect_language(mel.to(self.model.device))
+        language = max(probabilities, key=probabilities.get)
+        return language, probabilities[language]
+
+
+class CTranslate2WhisperEngine(TranscriptionEngine):
+    # Whisper weights on CTranslate2 (through faster-whisper) with int8 CPU kernels
+    name = "whisper-ct2"
+    label = "Whisper on CTranslate2 int8 (Fast CPU)"
+    capabilities = {"timestamps": True, "streaming": True, "batch": False, "multilingual": True}
+    # faster-whisper extracts features for the whole input in float64 numpy
+    working_mb_per_second = 0.6
+    
+    def __init__(self, model_name="base", preset=DEFAULT_FILE_PRESET, compute_type="int8", cpu_threads=None):
+        # The PyTorch int8 variants map onto the same CTranslate2 model
+        super().__init__(split_quantized(model_name)[0], preset)
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+    
+    def load(self):
+        if self.model is None:
+            def loader():
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    raise EngineError("The CTranslate2 engine needs the faster-whisper package "
+                                      "(pip install faster-whisper)")
+                # CTranslate2 fixes its thread count per model, so size it to one CPU slot
+                cpu_threads = self.cpu_threads or get_cpu_scheduler().threads_per_job
+                return WhisperModel(self.model_name, device="cpu", compute_type=self.compute_type,
+                                    cpu_threads=cpu_threads)
+            self.model = get_engine_model(self.cache_key(), loader)
+        return self
+    
+    def cache_key(self):
+        return ("ct2", self.model_name, self.compute_type)
+    
+    def model_memory_mb(self):
+        return int(estimated_memory_mb(self.model_name) * QUANTIZED_MEMORY_FACTOR)
+    
+    def is_model_resident(self):
+        return self.model is not None or is_loaded(self.cache_key())
+    
+    def options(self, preset):
+        options = decode_options(preset or self.preset)
+        return {
+            "beam_size": options["beam_size"] or 1,
+            "best_of": options["best_of"] or 1,
+            "temperature": list(options["temperature"]),
+            "compression_ratio_threshold": options["compression_ratio_threshold"],
+            "log_prob_threshold": options["logprob_threshold"],
+            "no_speech_threshold": options["no_speech_threshold"],
+            "condition_on_previous_text": options["condition_on_previous_text"],
+        }
+    
+    def stream_segments(self, samples, language="en", preset=None):
+        self.load()
+        # faster-whisper decodes lazily, one window per iteration
+        segments, _ = self.model.transcribe(samples, language=language, task="transcribe",
+                                            **self.options(preset))
+        for segment in segments:
+            # Each iteration decodes one more window; stopping here abandons the rest
+            checkpoint()
+            tracing.instant("ct2.segment", start=segment.start, end=segment.end)
+            yield {"start": segment.start, "end": segment.end, "text": segment.text,
+                   "avg_logprob": segment.avg_logprob, "no_speech_prob": segment.no_speech_prob,
+                   "compression_ratio": segment.compression_ratio}
+    
+    def detect_language(self, samples):
+        self.load()
+        # faster-whisper identifies the language eagerly and decodes lazily, so
+        # leaving the segments unread costs one encoder pass
+        with tracing.span("ct2.detect_language", model=self.model_name):
+            _, info = self.model.transcribe(samples[:30 * SAMPLE_RATE], language=None, task="transcribe")
+        return info.language, info.language_probability
+    
+    def transcribe(self, samples, language="en", preset=None):
+        segments = list(self.stream_segments(samples, language=language, preset=preset))
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": language,
+        }
+
+
+class CascadeEngine(TranscriptionEngine):
+    # A tiny draft pass over everything, then model_name re-decodes only the
+    # segments the draft was unsure of (see cascade.py)
+    name = "whisper-cascade"
+    label = "Whisper Cascade (Tiny Draft + Selective Re-decode)"
+    capabilities = {"timestamps": True, "streaming": False, "batch": False, "multilingual": True}
+    working_mb_per_second = WhisperEngine.working_mb_per_second
+    uses_torch = WhisperEngine.uses_torch
+    
+    def __init__(self, model_name="small", preset=DEFAULT_FILE_PRESET, draft_model=DRAFT_MODEL, backend="whisper"):
+        super().__init__(model_name, preset)
+        self.draft = create_engine(backend, model_name=draft_model, preset=preset)
+        # With the draft size selected there is nothing to refine with; share the
+        # engine so the model is not loaded twice (cascade_transcribe skips the pass)
+        if model_name == draft_model:
+            self.refine = self.draft
+        else:
+            self.refine = create_engine(backend, model_name=model_name, preset=preset)
+    
+    def describe(self):
+        return f"{self.name}/{self.draft.model_name}+{self.model_name}"
+    
+    def model_memory_mb(self):
+        if self.refine is self.draft:
+            return self.draft.model_memory_mb()
+        return self.draft.model_memory_mb() + self.refine.model_memory_mb()
+    
+    def is_model_resident(self):
+        return self.draft.is_model_resident() and self.refine.is_model_resident()
+    
+    def estimate_peak_mb(self, duration):
+        return self.draft.estimate_peak_mb(duration) + self.refine.estimate_peak_mb(0)
+    
+    def load(self):
+        self.draft.load()
+        self.refine.load()
+        self.model = self.refine.model
+        return self
+    
+    def detect_language(self, samples):
+        return self.draft.detect_language(samples)
+    
+    def transcribe(self, samples, language="en", preset=None):
+        self.load()
+        with tracing.span("cascade.transcribe", draft=self.draft.model_name, refine=self.model_name) as details:
+            result = cascade_transcribe(self.draft, self.refine, samples, language=language,
+                                        preset=preset or self.preset)
+            details.update(result["cascade"])
+        return result
+    
+    def combine_chunks(self, results, language):
+        combined = super().combine_chunks(results, language)
+        combined["cascade"] = combine_reports([result["cascade"] for result in results])
+        return combined
+
+
+class SphinxEngine(TranscriptionEngine):
+    name = "sphinx"
+    label = "CMU Sphinx (Offline)"
+    capabilities = {"timestamps": False, "streaming": False, "batch": False, "multilingual": False}
+    
+    def __init__(self, model_name=None, preset=DEFAULT_FILE_PRESET, normalize_audio=False):
+        super().__init__(None, preset)
+        self.normalize_audio = normalize_audio
+    
+    def model_memory_mb(self):
+        return 60
+    
+    def is_model_resident(self):
+        return get_decoder_pool().warm_count() > 0
+    
+    def load(self):
+        # Warms one pooled decoder so the first utterance doesn't pay for the model load
+        try:
+            with get_decoder_pool().decoder():
+                pass
+        except sr.RequestError as e:
+            raise EngineError(f"Sphinx error; {e}")
+        return self
+    
+    def transcribe(self, samples, language="en", preset=None):
+        if self.normalize_audio:
+            # Normalize audio to improve speech detection
+            samples = normalize(samples)
+        
+        try:
+            # Specifically set to use English for Sphinx; decoders are reused across calls
+            with get_decoder_pool("en-US").decoder() as decoder:
+                text = decode_utterance(decoder, float_to_pcm16(samples))
+        except sr.RequestError as e:
+            raise EngineError(f"Sphinx error; {e}")
+        if text is None:
+            raise NoSpeechError("Sphinx could not understand the audio")
+        
+        duration = len(samples) / float(SAMPLE_RATE)
+        return {
+            "text": text,
+            "segments": [{"start": 0.0, "end": duration, "text": text}] if text else [],
+            "language": "en",
+        }
+
+
+class KeywordSpottingEngine(TranscriptionEngine):
+    # Sphinx searching only for the given keyphrases. Segments are the hits, each
+    # with the phrase as its text; finding nothing is a normal result, not an error.
+    name = "sphinx-kws"
+    label = "Sphinx Keyword Spotting (Fast)"
+    capabilities = {"timestamps": True, "streaming": False, "batch": False, "multilingual": False}
+    
+    def __init__(self, model_name=None, preset=DEFAULT_FILE_PRESET, keyphrases="", language="en-US"):
+        super().__init__(None, preset)
+        # A list of (phrase, threshold) pairs, or text in the form parse_keyphrases accepts
+        self.keyphrases = parse_keyphrases(keyphrases) if isinstance(keyphrases, str) else list(keyphrases)
+        self.sphinx_language = language
+        self.pool = None
+    
+    def describe(self):
+        return f"{self.name}/{len(self.keyphrases)} keyphrase(s)"
+    
+    def model_memory_mb(self):
+        # Acoustic model and dictionary only
+        return 30
+    
+    def is_model_resident(self):
+        return self.pool is not None and self.pool.warm_count() > 0
+    
+    def load(self):
+        if self.pool is None:
+            self.pool = get_decoder_pool(self.sphinx_language, keyphrase_file(self.keyphrases))
+            try:
+                with self.pool.decoder():
+                    pass
+            except sr.RequestError as e:
+                self.pool = None
+                raise EngineError(f"Sphinx error; {e}")
+        return self
+    
+    def transcribe(self, samples, language="en", preset=None):
+        self.load()
+        with self.pool.decoder() as decoder:
+            hits = spot(decoder, split_blocks(float_to_pcm16(samples)))
+        return {
+            "text": " ".join(hit["text"] for hit in hits),
+            "segments": hits,
+            "language": "en",
+        }
+
+
+class FakeEngine(TranscriptionEngine):
+    # Offline stand-in for benchmarks: no weights to download, deterministic output,
+    # and work that grows with the audio length like a real decoder's
+    name = "fake"
+    label = "Fake engine (benchmarks only)"
+    capabilities = {"timestamps": True, "streaming": False, "batch": False, "multilingual": False}
+    
+    FRAME = 400   # 25 ms analysis window
+    HOP = 160     # 10 ms hop, the same framing as Whisper's mel spectrogram
+    MIN_GAP = 50  # 0.5 s
+    # Windowed frames plus their complex128 spectrum
+    working_mb_per_second = 0.6
+    
+    def __init__(self, model_name="fake", preset=DEFAULT_FILE_PRESET, threshold=0.1):
+        super().__init__(model_name, preset)
+        self.threshold = threshold
+    
+    def load(self):
+        if self.model is None:
+            # A small window table stands in for the weights
+            self.model = get_engine_model(("fake", self.FRAME), lambda: np.hanning(self.FRAME).astype(np.float32))
+        return self
+    
+    def transcribe(self, samples, language="en", preset=None):
+        self.load()
+        segments = []
+        if len(samples) >= self.FRAME:
+            # Frame energies from a short-time FFT, then runs of voiced frames become segments
+            count = 1 + (len(samples) - self.FRAME) // self.HOP
+            frames = np.lib.stride_tricks.as_strided(
+                samples, shape=(count, self.FRAME), strides=(samples.strides[0] * self.HOP, samples.strides[0]))
+            energy = np.abs(np.fft.rfft(frames * self.model, axis=1)).mean(axis=1)
+            voiced = energy > self.threshold
+            start = None
+            end = None
+            for index, is_voiced in enumerate(voiced):
+                if not is_voiced:
+                    continue
+                # Pauses shorter than MIN_GAP frames stay inside the segment
+                if start is not None and index - end > self.MIN_GAP:
+                    segments.append(self.segment(start, end, len(segments)))
+                    start = None
+                if start is None:
+                    start = index
+                end = index
+            if start is not None:
+                segments.append(self.segment(start, end, len(segments)))
+        return {
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "segments": segments,
+            "language": language,
+        }
+    
+    def segment(self, start, end, index):
+        return {
+            "start": start * self.HOP / float(SAMPLE_RATE),
+            "end": (end * self.HOP + self.FRAME) / float(SAMPLE_RATE),
+            "text": f" segment {index + 1}",
+        }
+
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    CTranslate2WhisperEngine.name: CTranslate2WhisperEngine,
+    SphinxEngine.name: SphinxEngine,
+    KeywordSpottingEngine.name: KeywordSpottingEngine,
+    CascadeEngine.name: CascadeEngine,
+    FakeEngine.name: FakeEngine,
+}
+
+# Engines whose model size is chosen with the Tiny/Base/Small selector
+WHISPER_ENGINES = [WhisperEngine.name, CTranslate2WhisperEngine.name]
+# ... and for file jobs, where the cascade's second pass is affordable
+FILE_WHISPER_ENGINES = WHISPER_ENGINES + [CascadeEngine.name]
+
+
+def engine_uses_torch(name):
+    return name in ENGINES and ENGINES[name].uses_torch
+
+
+def create_engine(name, **options):
+    if name not in ENGINES:
+        raise EngineError(f"Unknown transcription engine: {name}")
+    return ENGINES[name](**options)
@@ -0,0 +1,98 @@
+from transcriptor_core import tracing
+from transcriptor_core.audio_io import probe, load_audio, iter_audio_chunks
+from transcriptor_core.cancellation import cancel_scope, checkpoint, current_token
+from transcriptor_core.language_id import AUTO_LANGUAGE, FALLBACK_LANGUAGE, detect_file_language
+from transcriptor_core.memory import PeakRssMonitor, get_memory_governor
+
+
+def run_file_job(engine, path, language="en", on_stage=None, trace_prefix="job", on_segment=None,
+                 cancel_token=None):
+    # Load, decode and transcribe one file under the memory governor. on_stage is
+    # called with (message, progress percent) as the job moves along, on_segment
+    # with each segment as soon as the engine has it. language "auto" identifies it
+    # once from the first speech in the file. Cancelling cancel_token stops the job
+    # at its next checkpoint with JobCancelled. Returns the engine result and a
+    # memory report with the estimated peak and the process's measured peak while
+    # the job ran.
+    with cancel_scope(cancel_token or current_token()):
+        return _run_file_job(engine, path, language, on_stage, trace_prefix, on_segment)
+
+
+def _run_file_job(engine, path, language, on_stage, trace_prefix, on_segment):
+    def stage(message, progress):
+        checkpoint()
+        if on_stage is not None:
+            on_stage(message, progress)
+    
+    with tracing.span(f"{trace_prefix}.probe"):
+        duration = probe(path)["duration"]
+    
+    governor = get_memory_governor()
+    plan = governor.plan(engine, duration)
+    
+    def waiting():
+        stage(f"Waiting for memory (needs ~{plan['estimate_mb']} MB)...", 20)
+    
+    with governor.reserve(plan["estimate_mb"], on_wait=waiting), PeakRssMonitor(governor=governor) as memory:
+        stage(f"Loading {engine.label}...", 25)
+        with tracing.span(f"{trace_prefix}.load_model", engine=engine.describe()):
+            engine.load()
+        
+        language_detector = None
+        if language == AUTO_LANGUAGE:
+            if engine.capabilities["multilingual"]:
+                stage("Identifying the spoken language...", 28)
+                with tracing.span(f"{trace_prefix}.detect_language") as details:
+                    language_detector = detect_file_language(engine, path)
+                    details["language"] = language_detector.current()
+                language = language_detector.current()
+            else:
+                language = FALLBACK_LANGUAGE
+        
+        if plan["mode"] == "chunked":
+            # Too long to decode in one piece under the ceiling; only one chunk is held at a time
+            stage(f"Transcribing in {plan['chunk_seconds']} s chunks to stay under the memory limit...", 50)
+            with tracing.span(f"{trace_prefix}.transcribe", engine=engine.describe(), chunked=True,
+                              audio_seconds=round(duration, 2)) as details:
+                result = engine.transcribe_chunks(iter_audio_chunks(path, plan["chunk_seconds"]),
+                                                  language=language, on_segment=on_segment,
+                                                  language_detector=language_detector)
+                details["segments"] = len(result["segments"])
+        else:
+            stage("Reading audio file...", 30)
+            with tracing.span(f"{trace_prefix}.read", file=path):
+                samples = load_audio(path)
+            
+            stage(f"Transcribing with {engine.label} (this may take a few minutes)...", 50)
+            with tracing.span(f"{trace_prefix}.transcribe", engine=engine.describe(),
+                              audio_seconds=round(duration, 2)) as details:
+                if on_segment is not None and engine.capabilities["streaming"]:
+                    # Engines that decode lazily hand over each segment as it is decoded
+                    segments = []
+                    for segment in engine.stream_segments(samples, language=language):
+                        checkpoint()
+                        on_segment(segment)
+                        segments.append(segment)
+                    result = {"text": "".join(segment["text"] for segment in segments),
+                              "segments": segments, "language": language}
+                else:
+                    result = engine.transcribe(samples, language=language)
+                    if on_segment is not None:
+                        for segment in result["segments"]:
+                            on_segment(segment)
+                details["segments"] = len(result["segments"])
+            del samples
+    
+    report = {
+        "mode": plan["mode"],
+        "duration": duration,
+        "language": result.get("language", language),
+        "chunk_seconds": plan["chunk_seconds"],
+        "estimated_mb": plan["estimate_mb"],
+        # Whole-process figures; other jobs running alongside count towards them
+        "peak_rss_mb": round(memory.peak_mb, 1),
+        "concurrent_jobs": memory.max_jobs,
+        # What this job added, only when it ran alone
+        "peak_growth_mb": round(memory.peak_mb - memory.start_mb, 1) if memory.max_jobs <= 1 else None,
+    }
+    return result, report
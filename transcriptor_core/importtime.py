@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Cold-start report for the launcher and the tools. Each target is executed in
+# a fresh interpreter with -X importtime, the same way the launcher loads it.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "launcher": "transcriptor_launcher.py",
+    "audio_transcriptor": os.path.join("audio_transcriptor", "audio_transcriptor.py"),
+    "video_transcriptor": os.path.join("video_transcriptor", "video_transcriptor.py"),
+    "live_transcriptor": os.path.join("live_transcriptor", "live_transcriptor.py"),
+}
+
+# Exec the module without running main(), and print how long that took
+PROBE = """
+import importlib.util, sys, time
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location({name!r}, {path!r})
+module = importlib.util.module_from_spec(spec)
+sys.modules[{name!r}] = module
+spec.loader.exec_module(module)
+print("EXEC_MS", (time.perf_counter() - started) * 1000.0)
+"""
+
+
+def measure(name, relative_path):
+    path = os.path.join(ROOT_DIR, relative_path)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(name=name, path=path)],
+        capture_output=True, text=True, cwd=ROOT_DIR
+    )
+    
+    exec_ms = None
+    for line in completed.stdout.splitlines():
+        if line.startswith("EXEC_MS"):
+            exec_ms = float(line.split()[1])
+    
+    # Lines look like "import time:       512 |       2048 |   package.module"
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        module_name = fields[2].rstrip()
+        imports.append({
+            "module": module_name.strip(),
+            "depth": (len(module_name) - len(module_name.lstrip())) // 2,
+            "self_ms": int(fields[0]) / 1000.0,
+            "cumulative_ms": int(fields[1]) / 1000.0,
+        })
+    
+    # Top-level imports (depth 0) are what the module itself pulled in
+    top_level = sorted((entry for entry in imports if entry["depth"] == 0),
+                       key=lambda entry: entry["cumulative_ms"], reverse=True)
+    return {
+        "target": name,
+        "ok": completed.returncode == 0 and exec_ms is not None,
+        "exec_ms": round(exec_ms, 1) if exec_ms is not None else None,
+        "modules_imported": len(imports),
+        "top_imports": top_level,
+        "error": completed.stderr.strip().splitlines()[-1] if completed.returncode != 0 else "",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report cold-start import time of the launcher and tools")
+    parser.add_argument("targets", nargs="*", help=f"Targets to measure: {', '.join(TARGETS)} (default: all)")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list")
+    parser.add_argument("--budget-ms", type=float,
+                        help="Exit with an error if any target takes longer than this to load")
+    parser.add_argument("--json", dest="json_path", help="Write the full report to this file")
+    args = parser.parse_args()
+    
+    for name in args.targets:
+        if name not in TARGETS:
+            parser.error(f"unknown target: {name}")
+    
+    reports = [measure(name, TARGETS[name]) for name in (args.targets or TARGETS)]
+    
+    over_budget = []
+    for report in reports:
+        if not report["ok"]:
+            print(f"{report['target']}: failed to load ({report['error']})")
+            over_budget.append(report["target"])
+            continue
+        print(f"{report['target']}: {report['exec_ms']:.1f} ms, {report['modules_imported']} modules")
+        for entry in report["top_imports"][:args.top]:
+            print(f"    {entry['cumulative_ms']:9.1f} ms  {entry['module']}")
+        if args.budget_ms is not None and report["exec_ms"] > args.budget_ms:
+            over_budget.append(report["target"])
+    
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
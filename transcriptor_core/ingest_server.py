@@ -0,0 +1,301 @@
+import argparse
+import json
+import queue
+import socket
+import socketserver
+import threading
+import time
+import wave
+
+from transcriptor_core.live_pipeline import SilenceSegmenter, pcm_to_float, transcribe_pcm
+from transcriptor_core.cancellation import CancelToken, JobCancelled, cancel_scope, checkpoint, wait_future
+from transcriptor_core.engines import WHISPER_ENGINES, create_engine
+from transcriptor_core.quantize import quantized_name
+from transcriptor_core.batch_scheduler import BatchScheduler
+from transcriptor_core.presets import DECODE_PRESETS, DEFAULT_LIVE_PRESET
+from transcriptor_core.language_id import AUTO_LANGUAGE, FALLBACK_LANGUAGE, LANGUAGE_CHOICES, LanguageDetector
+
+# Clients stream raw 16-bit little-endian mono PCM at 16 kHz over TCP and
+# receive one JSON line per recognized utterance. Half-closing the socket
+# (shutdown(SHUT_WR)) flushes the last utterance before the server hangs up.
+DEFAULT_PORT = 8765
+RATE = 16000
+SAMPLE_WIDTH = 2
+CHUNK = 1024
+RECV_SIZE = 8192
+
+
+class IngestConnectionHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        client = f"{self.client_address[0]}:{self.client_address[1]}"
+        segmenter = SilenceSegmenter(
+            rate=RATE,
+            chunk=CHUNK,
+            silence_threshold=server.silence_threshold,
+            silence_duration=server.silence_duration
+        )
+        segment_queue = queue.Queue()
+        send_lock = threading.Lock()
+        
+        # Recognition runs beside the socket reader, like process_audio beside record_audio
+        worker = threading.Thread(target=self.process_segments, args=(client, segment_queue, send_lock))
+        worker.daemon = True
+        worker.start()
+        server.client_connected(client, self.request)
+        
+        try:
+            while not server.is_stopping:
+                data = self.request.recv(RECV_SIZE)
+                if not data:
+                    break
+                for segment in segmenter.feed_bytes(data):
+                    segment_queue.put(segment)
+        except OSError as e:
+            print(f"Ingest connection error ({client}): {e}")
+        finally:
+            segment = segmenter.flush()
+            if segment is not None:
+                segment_queue.put(segment)
+            segment_queue.put(None)
+            worker.join()
+            server.client_disconnected(client)
+    
+    def process_segments(self, client, segment_queue, send_lock):
+        # Under the server's token, so stopping the server interrupts a decode in progress
+        with cancel_scope(self.server.cancel_token):
+            self.decode_segments(client, segment_queue, send_lock)
+    
+    def decode_segments(self, client, segment_queue, send_lock):
+        server = self.server
+        index = 0
+        # In auto mode each connection is its own session with its own language
+        language_detector = LanguageDetector() if server.language == AUTO_LANGUAGE else None
+        while True:
+            item = segment_queue.get()
+            if item is None or server.cancel_token.is_cancelled():
+                # A stopped server drops the utterances still queued
+                break
+            frames, start_sample = item
+            pcm = b''.join(frames)
+            
+            result = {
+                "segment": index,
+                "start_ms": int(start_sample * 1000 / RATE),
+                "end_ms": int((start_sample + len(pcm) // SAMPLE_WIDTH) * 1000 / RATE),
+                "whisper": "",
+                "sphinx": "",
+                "language": server.language,
+            }
+            index += 1
+            
+            try:
+                samples = pcm_to_float(pcm)
+                engine = server.engine_provider()
+                checkpoint()
+                if language_detector is not None:
+                    result["language"] = (language_detector.language_for(engine, samples)
+                                          if engine is not None else FALLBACK_LANGUAGE)
+                decoded = None
+                if server.batch_scheduler is not None:
+                    # Concurrent connections are decoded together in one batched pass
+                    decoded = wait_future(server.batch_scheduler.submit(samples, result["language"]))
+                elif engine is not None:
+                    decoded = engine.transcribe(samples, language=result["language"], preset=server.preset)
+                if decoded is not None:
+                    if language_detector is not None:
+                        language_detector.observe(decoded)
+                    result["whisper"] = decoded["text"].strip()
+            except JobCancelled:
+                break
+            except Exception as e:
+                print(f"Whisper transcription error ({client}): {e}")
+            
+            if server.dual_engine:
+                try:
+                    result["sphinx"] = transcribe_pcm(server.sphinx_engine, pcm)
+                except Exception as e:
+                    print(f"Sphinx transcription error ({client}): {e}")
+            
+            if not result["whisper"] and not result["sphinx"]:
+                continue
+            
+            server.report_result(client, result)
+            try:
+                with send_lock:
+                    self.request.sendall((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+            except OSError:
+                # The client went away; keep draining so the reader can finish
+                pass
+
+
+class IngestServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, engine_provider, host="0.0.0.0", port=DEFAULT_PORT, language="en",
+                 dual_engine=False, silence_threshold=1000, silence_duration=1.5,
+                 on_result=None, on_client=None, batch_scheduler=None, preset=DEFAULT_LIVE_PRESET):
+        # engine_provider returns the shared resident Whisper engine for every connection
+        self.engine_provider = engine_provider
+        self.sphinx_engine = create_engine("sphinx")
+        self.batch_scheduler = batch_scheduler
+        self.preset = preset
+        self.language = language
+        self.dual_engine = dual_engine
+        self.silence_threshold = silence_threshold
+        self.silence_duration = silence_duration
+        self.on_result = on_result
+        self.on_client = on_client
+        self.is_stopping = False
+        # Cancelled on stop, so connection workers give up their decodes in progress
+        self.cancel_token = CancelToken()
+        self.clients = {}   # client address -> its socket, so stop() can hang up on it
+        self.clients_lock = threading.Lock()
+        self.serve_thread = None
+        super().__init__((host, port), IngestConnectionHandler)
+    
+    def start(self):
+        self.serve_thread = threading.Thread(target=self.serve_forever)
+        self.serve_thread.daemon = True
+        self.serve_thread.start()
+    
+    def stop(self):
+        self.is_stopping = True
+        self.cancel_token.cancel("Server stopped")
+        self.shutdown()
+        # Handlers wait in recv(); shutting their sockets down wakes them now
+        # instead of at the client's next packet
+        with self.clients_lock:
+            sockets = list(self.clients.values())
+        for sock in sockets:
+            self.hang_up(sock)
+        self.server_close()
+    
+    def hang_up(self, sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            # Already closed by the client
+            pass
+    
+    def client_connected(self, client, sock):
+        with self.clients_lock:
+            self.clients[client] = sock
+        if self.is_stopping:
+            # Accepted just before the accept loop stopped
+            self.hang_up(sock)
+        if self.on_client is not None:
+            self.on_client(client, True)
+    
+    def client_disconnected(self, client):
+        with self.clients_lock:
+            self.clients.pop(client, None)
+        if self.on_client is not None:
+            self.on_client(client, False)
+    
+    def report_result(self, client, result):
+        if self.on_result is not None:
+            try:
+                self.on_result(client, result)
+            except Exception as e:
+                print(f"Ingest result callback error: {e}")
+
+
+def stream_wav(host, port, wav_path, realtime=False):
+    # Loopback test client: streams a 16 kHz mono 16-bit WAV and returns the results
+    with wave.open(wav_path, "rb") as wf:
+        if wf.getframerate() != RATE or wf.getnchannels() != 1 or wf.getsampwidth() != SAMPLE_WIDTH:
+            raise ValueError("Ingest clients must send 16 kHz mono 16-bit audio")
+        pcm = wf.readframes(wf.getnframes())
+    
+    results = []
+    with socket.create_connection((host, port)) as sock:
+        reader = sock.makefile("r", encoding="utf-8")
+        
+        def receive():
+            for line in reader:
+                results.append(json.loads(line))
+        
+        receiver = threading.Thread(target=receive)
+        receiver.daemon = True
+        receiver.start()
+        
+        step = CHUNK * SAMPLE_WIDTH
+        for offset in range(0, len(pcm), step):
+            sock.sendall(pcm[offset:offset + step])
+            if realtime:
+                time.sleep(CHUNK / RATE)
+        sock.shutdown(socket.SHUT_WR)
+        receiver.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live transcription ingest server")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    serve_parser = subparsers.add_parser("serve", help="Run the ingest server")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--model", default="tiny", choices=["tiny", "base", "small"])
+    serve_parser.add_argument("--quantized", action="store_true",
+                              help="Use the dynamic int8 variant of the PyTorch model")
+    serve_parser.add_argument("--engine", default="whisper", choices=WHISPER_ENGINES,
+                              help="Backend running the Whisper model")
+    serve_parser.add_argument("--dual-engine", action="store_true", help="Also run Sphinx on every utterance")
+    serve_parser.add_argument("--preset", default=DEFAULT_LIVE_PRESET, choices=list(DECODE_PRESETS))
+    serve_parser.add_argument("--language", default="en", choices=LANGUAGE_CHOICES,
+                              help="\"auto\" identifies each connection's language from its first speech")
+    serve_parser.add_argument("--batch-size", type=int, default=8,
+                              help="Maximum utterances decoded together (1 disables batching)")
+    serve_parser.add_argument("--max-wait-ms", type=float, default=50,
+                              help="Longest an utterance waits for batch partners")
+    
+    client_parser = subparsers.add_parser("client", help="Stream a WAV file to a running server")
+    client_parser.add_argument("wav_path")
+    client_parser.add_argument("--host", default="127.0.0.1")
+    client_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    client_parser.add_argument("--realtime", action="store_true", help="Pace the stream at 1x speed")
+    
+    args = parser.parse_args()
+    
+    if args.command == "client":
+        for result in stream_wav(args.host, args.port, args.wav_path, realtime=args.realtime):
+            print(json.dumps(result, ensure_ascii=False))
+        return
+    
+    model_name = quantized_name(args.model, args.quantized)
+    print(f"Loading Whisper {model_name} model ({args.engine})...")
+    engine = create_engine(args.engine, model_name=model_name, preset=args.preset).load()
+    
+    def print_result(client, result):
+        print(f"[{client}] {result['whisper']}")
+    
+    def print_client(client, connected):
+        print(f"[{client}] {'connected' if connected else 'disconnected'}")
+    
+    scheduler = None
+    if args.batch_size > 1:
+        scheduler = BatchScheduler(lambda: engine, max_batch=args.batch_size,
+                                   max_wait=args.max_wait_ms / 1000.0, preset=args.preset,
+                                   language=FALLBACK_LANGUAGE if args.language == AUTO_LANGUAGE else args.language)
+        scheduler.start()
+    
+    server = IngestServer(lambda: engine, host=args.host, port=args.port, language=args.language,
+                         dual_engine=args.dual_engine, on_result=print_result, on_client=print_client,
+                         batch_scheduler=scheduler, preset=args.preset)
+    print(f"Listening on {args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if scheduler is not None:
+            scheduler.stop()
+            print(f"Average batch size: {scheduler.average_batch_size():.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+import argparse
+import contextlib
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from transcriptor_core.cancellation import CancelToken, JobCancelled
+from transcriptor_core.cascade import cascade_summary
+from transcriptor_core.config import load_config
+from transcriptor_core.cpu_scheduler import get_cpu_scheduler
+from transcriptor_core.engines import FILE_WHISPER_ENGINES, EngineError, create_engine, engine_uses_torch
+from transcriptor_core.file_jobs import run_file_job
+from transcriptor_core.presets import DECODE_PRESETS, DEFAULT_FILE_PRESET
+from transcriptor_core.search_index import index_result
+
+# A durable job queue in one SQLite file, so any number of headless workers on
+# any number of machines can share the work through a common volume with no
+# broker. A worker leases a job for a limited time and keeps renewing the lease
+# while it runs; a crashed worker stops renewing, and once its lease expires the
+# job goes back to the queue for another worker. Failed jobs are retried with a
+# growing delay until they run out of attempts.
+#
+# The database uses a rollback journal rather than WAL: WAL needs shared memory,
+# which processes on different hosts cannot share. The shared volume must
+# support file locking (NFSv4, SMB).
+
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 30
+POLL_SECONDS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    media_path TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    model TEXT,
+    preset TEXT NOT NULL,
+    language TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',   -- queued, leased, done, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    enqueued_at REAL NOT NULL,
+    finished_at REAL,
+    audio_seconds REAL,
+    wall_seconds REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs(status, available_at);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    jobs_done INTEGER NOT NULL DEFAULT 0,
+    jobs_failed INTEGER NOT NULL DEFAULT 0,
+    audio_seconds REAL NOT NULL DEFAULT 0,
+    busy_seconds REAL NOT NULL DEFAULT 0
+);
+"""
+
+JOB_COLUMNS = ["id", "media_path", "output_path", "engine", "model", "preset", "language", "status",
+               "attempts", "max_attempts", "lease_owner", "lease_expires", "error"]
+
+
+@contextlib.contextmanager
+def connect(path):
+    connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode=DELETE")
+        connection.executescript(SCHEMA)
+        yield connection
+    finally:
+        connection.close()
+
+
+@contextlib.contextmanager
+def transaction(connection):
+    # IMMEDIATE takes the write lock up front, so two workers can never lease the same job
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    else:
+        connection.execute("COMMIT")
+
+
+def enqueue(queue_path, media_paths, engine="whisper", model="base", preset=DEFAULT_FILE_PRESET,
+            language="en", output_dir=None, max_attempts=MAX_ATTEMPTS):
+    now = time.time()
+    job_ids = []
+    with connect(queue_path) as connection, transaction(connection):
+        for media_path in media_paths:
+            # Paths are stored as given, so they must be valid on every worker host
+            output_name = os.path.splitext(os.path.basename(media_path))[0] + "_transcript.txt"
+            output_path = os.path.join(output_dir or os.path.dirname(media_path), output_name)
+            job_ids.append(connection.execute(
+                "INSERT INTO jobs (media_path, output_path, engine, model, preset, language, max_attempts, "
+                "available_at, enqueued_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (media_path, output_path, engine, model, preset, language, max_attempts, now, now)).lastrowid)
+    return job_ids
+
+
+def _expire_leases(connection, now):
+    # Jobs whose worker stopped renewing: retry them, or fail them once out of attempts
+    connection.execute(
+        "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+        "error = 'lease expired (worker ' || lease_owner || ' stopped responding)', "
+        "lease_owner = NULL, lease_expires = NULL, available_at = ? "
+        "WHERE status = 'leased' AND lease_expires < ?", (now, now))
+
+
+def lease(queue_path, worker_id, lease_seconds=LEASE_SECONDS):
+    now = time.time()
+    with connect(queue_path) as connection, transaction(connection):
+        _expire_leases(connection, now)
+        row = connection.execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE status = 'queued' AND available_at <= ? "
+            "ORDER BY available_at, id LIMIT 1", (now,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_COLUMNS, row))
+        connection.execute(
+            "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+            "WHERE id = ?", (worker_id, now + lease_seconds, job["id"]))
+        job["attempts"] += 1
+        return job
+
+
+def renew(queue_path, job_id, worker_id, lease_seconds=LEASE_SECONDS):
+    # False when the lease was lost (it expired and another worker took the job)
+    with connect(queue_path) as connection, transaction(connection):
+        cursor = connection.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (time.time() + lease_seconds, job_id, worker_id))
+        return cursor.rowcount == 1
+
+
+def complete(queue_path, job_id, worker_id, audio_seconds, wall_seconds):
+    now = time.time()
+    with connect(queue_path) as connection, transaction(connection):
+        cursor = connection.execute(
+            "UPDATE jobs SET status = 'done', finished_at = ?, audio_seconds = ?, wall_seconds = ?, "
+            "lease_owner = NULL, lease_expires = NULL, error = NULL "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (now, audio_seconds, wall_seconds, job_id, worker_id))
+        connection.execute(
+            "UPDATE workers SET jobs_done = jobs_done + 1, audio_seconds = audio_seconds + ?, "
+            "busy_seconds = busy_seconds + ?, last_seen = ? WHERE id = ?",
+            (audio_seconds, wall_seconds, now, worker_id))
+        return cursor.rowcount == 1
+
+
+def fail(queue_path, job_id, worker_id, error, wall_seconds=0.0, retry=True):
+    now = time.time()
+    with connect(queue_path) as connection, transaction(connection):
+        row = connection.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ?",
+                                 (job_id, worker_id)).fetchone()
+        if row is None:
+            return False
+        attempts, max_attempts = row
+        if retry and attempts < max_attempts:
+            # Back off so a file that fails fast doesn't spin through its attempts
+            connection.execute(
+                "UPDATE jobs SET status = 'queued', available_at = ?, error = ?, "
+                "lease_owner = NULL, lease_expires = NULL WHERE id = ?",
+                (now + RETRY_DELAY_SECONDS * attempts, error, job_id))
+        else:
+            connection.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ?, "
+                "lease_owner = NULL, lease_expires = NULL WHERE id = ?", (now, error, job_id))
+        connection.execute(
+            "UPDATE workers SET jobs_failed = jobs_failed + 1, busy_seconds = busy_seconds + ?, last_seen = ? "
+            "WHERE id = ?", (wall_seconds, now, worker_id))
+        return True
+
+
+def release(queue_path, job_id, worker_id):
+    # Hands a job back untouched, without using up an attempt
+    with connect(queue_path) as connection, transaction(connection):
+        cursor = connection.execute(
+            "UPDATE jobs SET status = 'queued', attempts = attempts - 1, available_at = ?, "
+            "lease_owner = NULL, lease_expires = NULL WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (time.time(), job_id, worker_id))
+        return cursor.rowcount == 1
+
+
+def requeue_failed(queue_path):
+    with connect(queue_path) as connection, transaction(connection):
+        return connection.execute(
+            "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, error = NULL "
+            "WHERE status = 'failed'", (time.time(),)).rowcount
+
+
+def register_worker(queue_path, worker_id):
+    now = time.time()
+    with connect(queue_path) as connection, transaction(connection):
+        connection.execute(
+            "INSERT INTO workers (id, host, pid, started_at, last_seen) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET pid = excluded.pid, started_at = excluded.started_at, "
+            "last_seen = excluded.last_seen",
+            (worker_id, socket.gethostname(), os.getpid(), now, now))
+
+
+def queue_status(queue_path):
+    with connect(queue_path) as connection:
+        counts = dict(connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        workers = connection.execute(
+            "SELECT id, host, last_seen, jobs_done, jobs_failed, audio_seconds, busy_seconds "
+            "FROM workers ORDER BY id").fetchall()
+    return {
+        "jobs": {status: counts.get(status, 0) for status in ("queued", "leased", "done", "failed")},
+        "workers": [
+            {"id": worker_id, "host": host, "idle_seconds": round(time.time() - last_seen),
+             "jobs_done": jobs_done, "jobs_failed": jobs_failed, "audio_seconds": round(audio_seconds, 1),
+             "busy_seconds": round(busy_seconds, 1),
+             # Audio seconds transcribed per second spent working
+             "speed": round(audio_seconds / busy_seconds, 2) if busy_seconds else 0.0}
+            for worker_id, host, last_seen, jobs_done, jobs_failed, audio_seconds, busy_seconds in workers
+        ],
+    }
+
+
+class LeaseKeeper:
+    # Renews a job's lease in the background for as long as the job runs, and
+    # cancels the job once the lease is lost: its result would be thrown away
+    def __init__(self, queue_path, job_id, worker_id, lease_seconds=LEASE_SECONDS, cancel_token=None):
+        self.queue_path = queue_path
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.cancel_token = cancel_token
+        self.lost = False
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"lease-{job_id}", daemon=True)
+    
+    def run(self):
+        while not self.stop_event.wait(self.lease_seconds / 3.0):
+            try:
+                if not renew(self.queue_path, self.job_id, self.worker_id, self.lease_seconds):
+                    self.lost = True
+                    print(f"Job {self.job_id}: lease lost to another worker")
+                    if self.cancel_token is not None:
+                        self.cancel_token.cancel("Lease lost")
+                    return
+            except sqlite3.Error as e:
+                # A briefly unreachable share; the next renewal may still make it in time
+                print(f"Job {self.job_id}: could not renew lease: {e}")
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop_event.set()
+        self.thread.join()
+
+
+class QueueWorker:
+    def __init__(self, queue_path, worker_id=None, lease_seconds=LEASE_SECONDS, poll_seconds=POLL_SECONDS):
+        self.queue_path = queue_path
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.engines = {}
+        self.engines_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        # Cancel tokens of the jobs running now, by job id
+        self.running = {}
+        self.running_lock = threading.Lock()
+    
+    def engine_for(self, job):
+        # Engines (and through the model cache, their weights) are shared by every job in the process
+        key = (job["engine"], job["model"], job["preset"])
+        with self.engines_lock:
+            engine = self.engines.get(key)
+            if engine is None:
+                if job["engine"] in FILE_WHISPER_ENGINES:
+                    engine = create_engine(job["engine"], model_name=job["model"], preset=job["preset"])
+                else:
+                    engine = create_engine(job["engine"])
+                self.engines[key] = engine
+            return engine
+    
+    def process(self, job):
+        started = time.perf_counter()
+        print(f"[{self.worker_id}] job {job['id']} (attempt {job['attempts']}/{job['max_attempts']}): "
+              f"{job['media_path']}")
+        token = CancelToken()
+        keeper = LeaseKeeper(self.queue_path, job["id"], self.worker_id, self.lease_seconds, token)
+        with self.running_lock:
+            self.running[job["id"]] = token
+        try:
+            with keeper:
+                engine = self.engine_for(job)
+                with get_cpu_scheduler().job_slot(uses_torch=engine_uses_torch(job["engine"]), cancel_token=token):
+                    result, report = run_file_job(engine, job["media_path"], language=job["language"],
+                                                  trace_prefix="queue", cancel_token=token)
+                if keeper.lost:
+                    # Another worker owns the job now; its result will be the one recorded
+                    return
+                if not result["text"].strip():
+                    raise EngineError("No speech was recognized")
+                temp_path = job["output_path"] + f".{self.worker_id}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(result["text"])
+                os.replace(temp_path, job["output_path"])
+                index_result(job["media_path"], result, job["output_path"], engine.describe(), report["duration"])
+        except JobCancelled as e:
+            print(f"[{self.worker_id}] job {job['id']} stopped: {e}")
+            if not keeper.lost:
+                # The worker is shutting down; another one can start the job right away
+                release(self.queue_path, job["id"], self.worker_id)
+            return
+        except Exception as e:
+            wall = time.perf_counter() - started
+            print(f"[{self.worker_id}] job {job['id']} failed: {e}")
+            # A missing file or one without speech gives the same answer every time
+            fail(self.queue_path, job["id"], self.worker_id, str(e), wall,
+                 retry=not isinstance(e, (FileNotFoundError, EngineError)))
+            return
+        finally:
+            with self.running_lock:
+                del self.running[job["id"]]
+        wall = time.perf_counter() - started
+        complete(self.queue_path, job["id"], self.worker_id, report["duration"], wall)
+        print(f"[{self.worker_id}] job {job['id']} done in {wall:.1f}s "
+              f"({report['duration'] / wall:.2f}x real time) -> {job['output_path']}")
+        if "cascade" in result:
+            print(f"[{self.worker_id}] job {job['id']}: {cascade_summary(result)}")
+    
+    def run_loop(self, exit_when_empty=False):
+        while not self.stop_event.is_set():
+            try:
+                job = lease(self.queue_path, self.worker_id, self.lease_seconds)
+            except sqlite3.Error as e:
+                print(f"[{self.worker_id}] queue unavailable: {e}")
+                job = None
+            if job is None:
+                if exit_when_empty:
+                    return
+                self.stop_event.wait(self.poll_seconds)
+                continue
+            self.process(job)
+    
+    def run(self, loops=None, exit_when_empty=False):
+        # One loop per CPU slot by default, so a big machine runs several jobs at once
+        register_worker(self.queue_path, self.worker_id)
+        loops = loops or get_cpu_scheduler().parallel_jobs
+        print(f"Worker {self.worker_id}: {loops} parallel job(s), {get_cpu_scheduler().describe()}")
+        threads = [threading.Thread(target=self.run_loop, args=(exit_when_empty,),
+                                    name=f"queue-worker-{index}", daemon=True) for index in range(loops)]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            print("Stopping worker")
+            self.stop()
+            for thread in threads:
+                thread.join(timeout=5)
+    
+    def stop(self):
+        # Running jobs stop at their next checkpoint and go back to the queue;
+        # any that do not finish stopping keep their lease until it expires
+        self.stop_event.set()
+        with self.running_lock:
+            tokens = list(self.running.values())
+        for token in tokens:
+            token.cancel("Worker stopped")
+
+
+def default_queue_path():
+    return load_config().get("job_queue_path") or os.path.join(os.path.expanduser("~"), "transcriptor_queue.sqlite")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared transcription job queue")
+    parser.add_argument("--queue", default=default_queue_path(), help="Queue database on the shared volume")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    enqueue_parser = subparsers.add_parser("enqueue", help="Add media files to the queue")
+    enqueue_parser.add_argument("paths", nargs="+")
+    enqueue_parser.add_argument("--engine", default="whisper", choices=FILE_WHISPER_ENGINES + ["sphinx"])
+    enqueue_parser.add_argument("--model", default="base")
+    enqueue_parser.add_argument("--preset", default=DEFAULT_FILE_PRESET, choices=list(DECODE_PRESETS))
+    enqueue_parser.add_argument("--language", default="en")
+    enqueue_parser.add_argument("--output-dir", help="Write transcripts here instead of next to the media")
+    enqueue_parser.add_argument("--attempts", type=int, default=MAX_ATTEMPTS)
+    
+    worker_parser = subparsers.add_parser("worker", help="Lease and transcribe jobs until stopped")
+    worker_parser.add_argument("--id", help="Worker name (default: host-pid)")
+    worker_parser.add_argument("--jobs", type=int, help="Parallel jobs (default: one per CPU slot)")
+    worker_parser.add_argument("--lease", type=int, default=LEASE_SECONDS, help="Lease length in seconds")
+    worker_parser.add_argument("--exit-when-empty", action="store_true")
+    
+    subparsers.add_parser("status", help="Job counts and per-worker throughput")
+    subparsers.add_parser("requeue-failed", help="Give failed jobs a fresh set of attempts")
+    args = parser.parse_args()
+    
+    if args.command == "enqueue":
+        paths = [os.path.abspath(path) for path in args.paths]
+        output_dir = os.path.abspath(args.output_dir) if args.output_dir else None
+        job_ids = enqueue(args.queue, paths, args.engine, args.model, args.preset, args.language,
+                          output_dir, args.attempts)
+        print(f"Queued {len(job_ids)} job(s) in {args.queue}")
+    elif args.command == "worker":
+        QueueWorker(args.queue, args.id, args.lease).run(args.jobs, args.exit_when_empty)
+    elif args.command == "requeue-failed":
+        print(f"Requeued {requeue_failed(args.queue)} job(s)")
+    else:
+        status = queue_status(args.queue)
+        print("  ".join(f"{name} {count}" for name, count in status["jobs"].items()))
+        for worker in status["workers"]:
+            print(f"{worker['id']:24s} {worker['host']:16s} done {worker['jobs_done']:5d}  "
+                  f"failed {worker['jobs_failed']:3d}  audio {worker['audio_seconds']:9.0f}s  "
+                  f"{worker['speed']:6.2f}x real time  idle {worker['idle_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import zlib
+
+from transcriptor_core.audio_io import SAMPLE_RATE, _pcm_blocks, probe
+from transcriptor_core.cancellation import checkpoint
+from transcriptor_core.sphinx_pool import get_decoder_pool
+
+# Sphinx keyword spotting: instead of decoding every word against the language
+# model, the decoder only tracks the listed keyphrases, which scans audio many
+# times faster than full transcription. Each keyphrase has a detection threshold
+# (pocketsphinx's /1e-N/ syntax): closer to 1 misses more, closer to 0 fires more.
+
+DEFAULT_THRESHOLD = 1e-20
+FRAMES_PER_SECOND = 100      # pocketsphinx's default 10 ms frame rate
+BLOCK_SAMPLES = SAMPLE_RATE  # Hits are collected once per second of audio
+
+KEYWORD_DIR = os.path.join(tempfile.gettempdir(), "transcriptor_keywords")
+
+
+def parse_keyphrases(text, default_threshold=DEFAULT_THRESHOLD):
+    # "acme widget /1e-25/, refund" -> [("acme widget", 1e-25), ("refund", 1e-20)];
+    # entries are separated by commas or new lines
+    keyphrases = []
+    for entry in text.replace("\n", ",").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        threshold = default_threshold
+        if entry.endswith("/") and entry.count("/") >= 2:
+            phrase, _, value = entry[:-1].rpartition("/")
+            try:
+                threshold = float(value)
+            except ValueError:
+                raise ValueError(f"Invalid threshold in keyphrase entry: {entry}")
+            entry = phrase.strip()
+        if not 0 < threshold < 1:
+            raise ValueError(f"Threshold for \"{entry}\" must be between 0 and 1")
+        keyphrases.append((" ".join(entry.lower().split()), threshold))
+    if not keyphrases:
+        raise ValueError("Enter at least one keyphrase")
+    return keyphrases
+
+
+def keyphrase_file(keyphrases):
+    # pocketsphinx reads keyphrases from a file; identical lists share one file
+    # and therefore one decoder pool
+    content = "".join(f"{phrase} /{threshold:g}/\n" for phrase, threshold in keyphrases)
+    path = os.path.join(KEYWORD_DIR, f"{zlib.crc32(content.encode('utf-8')):08x}.kws")
+    if not os.path.exists(path):
+        os.makedirs(KEYWORD_DIR, exist_ok=True)
+        temp_path = path + f".{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    return path
+
+
+def _segment_frames(segment):
+    # pocketsphinx 0.1.x segments have start_frame/end_frame, 5.x has start/duration
+    if hasattr(segment, "start_frame"):
+        return segment.start_frame, segment.end_frame
+    return segment.start, segment.start + segment.duration
+
+
+def spot(decoder, blocks, offset_seconds=0.0):
+    # Runs 16 kHz mono 16-bit PCM blocks through a keyword decoder and returns the
+    # hits as segments. The utterance restarts after each hit, as pocketsphinx's
+    # continuous spotting does, so frame numbers are kept relative to its start.
+    hits = []
+    utterance_frame = 0
+    samples_seen = 0
+    
+    def collect():
+        for segment in decoder.seg():
+            start, end = _segment_frames(segment)
+            hits.append({
+                "start": offset_seconds + (utterance_frame + start) / float(FRAMES_PER_SECOND),
+                "end": offset_seconds + (utterance_frame + end) / float(FRAMES_PER_SECOND),
+                "text": segment.word,
+                "score": getattr(segment, "prob", None),
+            })
+    
+    decoder.start_utt()
+    try:
+        for block in blocks:
+            # One second of audio per block; a cancelled job stops here
+            checkpoint()
+            decoder.process_raw(block, False, False)
+            samples_seen += len(block) // 2
+            if decoder.hyp() is not None:
+                decoder.end_utt()
+                collect()
+                utterance_frame = samples_seen * FRAMES_PER_SECOND // SAMPLE_RATE
+                decoder.start_utt()
+    finally:
+        # The decoder goes back to a shared pool, so never leave an utterance open
+        decoder.end_utt()
+    if decoder.hyp() is not None:
+        collect()
+    return hits
+
+
+def split_blocks(pcm, block_samples=BLOCK_SAMPLES):
+    block_bytes = block_samples * 2
+    for start in range(0, len(pcm), block_bytes):
+        yield pcm[start:start + block_bytes]
+
+
+def spot_file(path, keyphrases, language="en-US"):
+    # Streams the file, so archives of any length run in constant memory
+    pool = get_decoder_pool(language, keyphrase_file(keyphrases))
+    with pool.decoder() as decoder:
+        return spot(decoder, _pcm_blocks(path, BLOCK_SAMPLES * 2))
+
+
+def format_offset(seconds):
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+
+def format_hits(hits):
+    return "\n".join(f"[{format_offset(hit['start'])}] {hit['text']}" for hit in hits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find where keyphrases occur in audio and video files")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--keyphrase", action="append", default=[],
+                        help="Phrase to find, optionally with a threshold: \"acme widget /1e-25/\"")
+    parser.add_argument("--keyphrases-file", help="File with one keyphrase per line")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Threshold for phrases without their own")
+    parser.add_argument("--jsonl", help="Append every hit as a JSON line to this file")
+    args = parser.parse_args()
+    
+    text = "\n".join(args.keyphrase)
+    if args.keyphrases_file:
+        with open(args.keyphrases_file, "r", encoding="utf-8") as f:
+            text += "\n" + f.read()
+    try:
+        keyphrases = parse_keyphrases(text, args.threshold)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    output = open(args.jsonl, "a", encoding="utf-8") if args.jsonl else None
+    try:
+        for path in args.paths:
+            started = time.perf_counter()
+            try:
+                hits = spot_file(path, keyphrases)
+                duration = probe(path)["duration"]
+            except Exception as e:
+                print(f"{path}: error: {e}")
+                continue
+            elapsed = time.perf_counter() - started
+            speed = f", {duration / elapsed:.0f}x real time" if elapsed > 0 and duration else ""
+            print(f"{path}: {len(hits)} hit(s){speed}")
+            for hit in hits:
+                print(f"  [{format_offset(hit['start'])}] {hit['text']}")
+                if output is not None:
+                    output.write(json.dumps({"file": path, "start_ms": int(hit["start"] * 1000),
+                                             "end_ms": int(hit["end"] * 1000), "keyphrase": hit["text"]}) + "\n")
+    finally:
+        if output is not None:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
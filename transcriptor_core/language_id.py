@@ -0,0 +1,150 @@
+import argparse
+import os
+import threading
+
+from transcriptor_core.audio_io import SAMPLE_RATE, iter_audio_chunks
+from transcriptor_core.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# Auto-language mode: identify the language once, from the first window that
+# actually holds speech, and keep using it. Whisper's own auto mode would run a
+# detection pass on every utterance; here detection runs again only when the
+# transcription starts to look wrong, i.e. several weak decodes in a row, which
+# is what a speaker switching language looks like.
+AUTO_LANGUAGE = "auto"
+FALLBACK_LANGUAGE = "en"
+LANGUAGE_CHOICES = [AUTO_LANGUAGE, "en", "es", "fr", "de", "it", "pt", "nl", "pl", "ru", "uk", "tr",
+                    "ar", "hi", "zh", "ja", "ko"]
+
+DETECT_SECONDS = 30          # Whisper identifies the language from one 30 s window
+MIN_SPEECH_SECONDS = 1.0     # Shorter windows give unreliable guesses
+MAX_SCAN_SECONDS = 300       # Files silent for longer than this keep the fallback
+SPEECH_LEVEL = 1000 / 32768.0   # Mean amplitude of a speech frame, as SilenceSegmenter counts it
+FRAME = 1024
+WEAK_LOGPROB = -1.0          # Mean segment log probability of a poor decode
+WEAK_STREAK = 3              # Poor decodes in a row before the language is checked again
+
+
+def first_speech_window(samples, seconds=DETECT_SECONDS):
+    # The samples from the first frame loud enough to be speech, up to `seconds`
+    # long; None when there is not enough speech to identify a language
+    count = len(samples) // FRAME
+    if count == 0:
+        return None
+    levels = np.abs(samples[:count * FRAME].reshape(count, FRAME)).mean(axis=1)
+    loud = np.flatnonzero(levels >= SPEECH_LEVEL)
+    if len(loud) == 0:
+        return None
+    start = int(loud[0]) * FRAME
+    window = samples[start:start + int(seconds * SAMPLE_RATE)]
+    if len(window) < MIN_SPEECH_SECONDS * SAMPLE_RATE:
+        return None
+    return window
+
+
+def is_weak(result):
+    # Only engines that report log probabilities (Whisper) can mark a decode weak
+    logprobs = [segment["avg_logprob"] for segment in result["segments"]
+                if segment.get("avg_logprob") is not None]
+    return bool(logprobs) and sum(logprobs) / len(logprobs) < WEAK_LOGPROB
+
+
+class LanguageDetector:
+    # The language of one file or one live session
+    def __init__(self, fallback=FALLBACK_LANGUAGE):
+        self.fallback = fallback
+        self.language = None
+        self.probability = 0.0
+        self.detections = 0
+        self.weak_streak = 0
+        self.lock = threading.Lock()
+    
+    def set(self, language, probability):
+        with self.lock:
+            self.language = language
+            self.probability = probability
+            self.weak_streak = 0
+    
+    def current(self):
+        with self.lock:
+            return self.language or self.fallback
+    
+    def needs_detection(self):
+        with self.lock:
+            return self.language is None or self.weak_streak >= WEAK_STREAK
+    
+    def language_for(self, engine, samples):
+        # The language to decode `samples` in, identifying it first if it is unknown
+        # or recent decodes were weak
+        if self.needs_detection():
+            window = first_speech_window(samples)
+            if window is not None:
+                language, probability = engine.detect_language(window)
+                with self.lock:
+                    self.detections += 1
+                if language is not None:
+                    if language != self.language:
+                        print(f"Detected language: {language} ({probability:.0%})")
+                    self.set(language, probability)
+                else:
+                    # The engine cannot identify languages; stop asking
+                    self.set(self.fallback, 0.0)
+        return self.current()
+    
+    def observe(self, result):
+        with self.lock:
+            self.weak_streak = self.weak_streak + 1 if is_weak(result) else 0
+
+
+_file_languages = {}
+_file_languages_lock = threading.Lock()
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+def detect_file_language(engine, path, fallback=FALLBACK_LANGUAGE):
+    # A detector seeded from the file's first speech-bearing window. Results are
+    # cached per file, so re-running a file skips the detection pass.
+    detector = LanguageDetector(fallback)
+    key = _file_key(path)
+    with _file_languages_lock:
+        cached = _file_languages.get(key)
+    if cached is not None:
+        detector.set(*cached)
+        return detector
+    
+    for offset, samples in iter_audio_chunks(path, DETECT_SECONDS):
+        if offset >= MAX_SCAN_SECONDS:
+            break
+        detector.language_for(engine, samples)
+        if not detector.needs_detection():
+            break
+    if detector.needs_detection():
+        # No speech in the scanned part of the file
+        detector.set(fallback, 0.0)
+    else:
+        with _file_languages_lock:
+            _file_languages[key] = (detector.language, detector.probability)
+    return detector
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Identify the spoken language of audio files")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--engine", default="whisper", choices=["whisper", "whisper-ct2"])
+    parser.add_argument("--model", default="base")
+    args = parser.parse_args()
+    
+    from transcriptor_core.engines import create_engine
+    engine = create_engine(args.engine, model_name=args.model)
+    for path in args.paths:
+        detector = detect_file_language(engine, path)
+        print(f"{path}: {detector.language} ({detector.probability:.0%})")
+
+
+if __name__ == "__main__":
+    main()
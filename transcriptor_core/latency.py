@@ -0,0 +1,108 @@
+import csv
+import json
+import math
+import threading
+from collections import deque
+
+# Stages derived from the per-utterance timestamps, in pipeline order
+STAGES = [
+    ("segment", "capture_end", "enqueued"),        # end of speech to queue: the silence wait
+    ("queue_wait", "enqueued", "decode_start"),   # time spent waiting for the recognizer
+    ("decode", "decode_start", "decode_end"),      # all engines for the utterance
+    ("display", "decode_end", "displayed"),        # hand-off to the UI
+    ("end_to_end", "capture_end", "displayed"),
+]
+
+# Engines whose individual decode times are traced as "<engine>_start"/"<engine>_end"
+ENGINES = ["whisper", "sphinx"]
+
+PERCENTILES = [50, 95, 99]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile; good enough for a rolling window of a few hundred samples
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class LatencyTracker:
+    # Rolling per-stage, per-engine latency statistics for live utterances.
+    # Timestamps are time.perf_counter() values; durations are kept in milliseconds.
+    def __init__(self, window=200, history=10000):
+        self.window = window
+        self.samples = {}
+        self.traces = deque(maxlen=history)
+        self.lock = threading.Lock()
+    
+    def record(self, trace):
+        engine = trace.get("engine", "unknown")
+        durations = {}
+        for stage, start_key, end_key in STAGES:
+            if start_key in trace and end_key in trace:
+                durations[stage] = (trace[end_key] - trace[start_key]) * 1000.0
+        for name in ENGINES:
+            if f"{name}_start" in trace and f"{name}_end" in trace:
+                durations[f"decode_{name}"] = (trace[f"{name}_end"] - trace[f"{name}_start"]) * 1000.0
+        
+        with self.lock:
+            for stage, value in durations.items():
+                key = (stage, engine)
+                if key not in self.samples:
+                    self.samples[key] = deque(maxlen=self.window)
+                self.samples[key].append(value)
+            
+            row = {"engine": engine, "audio_ms": trace.get("audio_ms", 0)}
+            row.update({f"{stage}_ms": round(value, 2) for stage, value in durations.items()})
+            self.traces.append(row)
+        return durations
+    
+    def stats(self):
+        result = {}
+        with self.lock:
+            for (stage, engine), values in self.samples.items():
+                ordered = sorted(values)
+                entry = {f"p{pct}": round(percentile(ordered, pct), 1) for pct in PERCENTILES}
+                entry["count"] = len(ordered)
+                result.setdefault(engine, {})[stage] = entry
+        return result
+    
+    def summary(self, stages=("queue_wait", "decode", "end_to_end")):
+        # One line per engine for the status area, e.g. "tiny | decode 210/480/650 ms"
+        lines = []
+        for engine, engine_stats in sorted(self.stats().items()):
+            parts = []
+            for stage in stages:
+                if stage in engine_stats:
+                    entry = engine_stats[stage]
+                    parts.append(f"{stage} {entry['p50']:.0f}/{entry['p95']:.0f}/{entry['p99']:.0f}")
+            if parts:
+                lines.append(f"{engine} | " + "  ".join(parts) + " ms (p50/p95/p99)")
+        return "\n".join(lines)
+    
+    def reset(self):
+        with self.lock:
+            self.samples = {}
+            self.traces.clear()
+    
+    def export(self, path):
+        # .json gets percentiles plus raw rows; anything else is written as CSV rows
+        with self.lock:
+            rows = list(self.traces)
+        
+        if path.lower().endswith(".json"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"percentiles": self.stats(), "utterances": rows}, f, indent=2)
+            return path
+        
+        columns = ["engine", "audio_ms"]
+        for row in rows:
+            for key in row:
+                if key not in columns:
+                    columns.append(key)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
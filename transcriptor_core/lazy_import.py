@@ -0,0 +1,55 @@
+import importlib
+import threading
+import types
+
+_import_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    # Stands in for a heavy module and imports it on first attribute access,
+    # so `whisper.load_model(...)` call sites stay unchanged
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_module"] = None
+    
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _import_lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_lazy_name"])
+                    self.__dict__["_lazy_module"] = module
+        return module
+    
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+    
+    def __dir__(self):
+        return dir(self._load())
+    
+    def is_loaded(self):
+        return self.__dict__["_lazy_module"] is not None
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def warm_imports(names, on_done=None):
+    # Import heavy dependencies on a background thread once the window is up,
+    # so the first click on START does not pay for them
+    def run():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"Background import of {name} failed: {e}")
+        if on_done is not None:
+            on_done()
+    
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return thread
@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+
+from transcriptor_core.presets import DEFAULT_LIVE_PRESET
+
+
+class SilenceSegmenter:
+    # Splits a stream of 16-bit PCM into utterances at runs of silence; this is
+    # the segmentation used by the live tool and every network ingest connection
+    def __init__(self, rate=16000, chunk=1024, silence_threshold=1000, silence_duration=1.5,
+                 channels=1, sample_width=2, min_frames=10, max_duration=None):
+        self.rate = rate
+        self.chunk = chunk
+        self.channels = channels
+        self.sample_width = sample_width
+        self.silence_threshold = silence_threshold
+        self.min_frames = min_frames
+        self.max_silence_frames = int(rate / chunk * silence_duration)
+        # Files may run for minutes without a long pause; None never forces a cut
+        self.max_frames = int(rate / chunk * max_duration) if max_duration else None
+        self.chunk_bytes = chunk * channels * sample_width
+        
+        self.frames = []
+        self.silence_frames = 0
+        self.samples_seen = 0
+        self.pending = b""
+        # perf_counter() when the current utterance's last non-silent chunk was read,
+        # and the same for the utterance emitted last (None if it was all silence).
+        # The speaker stopped there; everything after is the silence wait.
+        self.speech_at = None
+        self.last_speech_at = None
+    
+    def reset(self):
+        self.frames = []
+        self.silence_frames = 0
+        self.samples_seen = 0
+        self.pending = b""
+        self.speech_at = None
+        self.last_speech_at = None
+    
+    def feed_chunk(self, data, read_at=None):
+        # Feed exactly one chunk; returns (frames, start_sample) when an utterance ends.
+        # read_at is when the chunk was read, if the caller knows it.
+        self.frames.append(data)
+        self.samples_seen += len(data) // (self.channels * self.sample_width)
+        
+        # Check for silence to segment speech
+        audio_data = np.frombuffer(data, dtype=np.int16)
+        if np.abs(audio_data).mean() < self.silence_threshold:
+            self.silence_frames += 1
+        else:
+            self.silence_frames = 0
+            self.speech_at = read_at if read_at is not None else time.perf_counter()
+        
+        # If we detect enough silence and have some data, emit it
+        if self.silence_frames > self.max_silence_frames and len(self.frames) > self.min_frames:
+            return self._emit()
+        if self.max_frames is not None and len(self.frames) >= self.max_frames:
+            return self._emit()
+        return None
+    
+    def feed_bytes(self, data):
+        # Network clients send arbitrary sized packets; re-chunk before segmenting
+        segments = []
+        self.pending += data
+        while len(self.pending) >= self.chunk_bytes:
+            chunk = self.pending[:self.chunk_bytes]
+            self.pending = self.pending[self.chunk_bytes:]
+            segment = self.feed_chunk(chunk)
+            if segment is not None:
+                segments.append(segment)
+        return segments
+    
+    def flush(self):
+        # Emit whatever is left once the stream ends
+        if self.pending:
+            self.frames.append(self.pending)
+            self.samples_seen += len(self.pending) // (self.channels * self.sample_width)
+            self.pending = b""
+        if self.frames:
+            return self._emit()
+        return None
+    
+    def _emit(self):
+        frames = self.frames
+        segment_samples = sum(len(f) for f in frames) // (self.channels * self.sample_width)
+        start_sample = self.samples_seen - segment_samples
+        self.frames = []
+        self.silence_frames = 0
+        self.last_speech_at = self.speech_at
+        self.speech_at = None
+        return frames, start_sample
+
+
+def pcm_to_float(pcm, channels=1):
+    # Whisper takes 16 kHz mono float32 in [-1, 1]; skip the temporary WAV round trip
+    samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def transcribe_pcm(engine, pcm, language="en", channels=1, preset=DEFAULT_LIVE_PRESET):
+    # Any TranscriptionEngine; utterances arrive as raw 16-bit PCM from the segmenter
+    result = engine.transcribe(pcm_to_float(pcm, channels), language=language, preset=preset)
+    return result["text"].strip()
@@ -0,0 +1,200 @@
+import contextlib
+import os
+import sys
+import threading
+
+try:
+    import resource
+    psutil = None
+except ImportError:
+    # No resource module on Windows; RSS comes from psutil there when it is installed
+    resource = None
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+from transcriptor_core.cancellation import POLL_SECONDS, checkpoint
+from transcriptor_core.config import load_config
+from transcriptor_core.quantize import split_quantized
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Approximate resident size of an fp32 Whisper model in MB (weights plus runtime overhead)
+MODEL_MEMORY_MB = {
+    "tiny": 200,
+    "base": 400,
+    "small": 1100,
+    "medium": 3000,
+    "large": 6000,
+}
+
+# Dynamic int8 shrinks the linear layers to a quarter; embeddings and convs stay fp32
+QUANTIZED_MEMORY_FACTOR = 0.4
+
+# Long files are cut into chunks of at most this length when they would not fit
+CHUNK_SECONDS = 600
+MIN_CHUNK_SECONDS = 60
+
+
+def estimated_memory_mb(model_name):
+    base_name, quantized = split_quantized(model_name)
+    estimate = MODEL_MEMORY_MB.get(base_name, 0)
+    return int(estimate * QUANTIZED_MEMORY_FACTOR) if quantized else estimate
+
+
+def _meminfo_mb(field):
+    # Fields of /proc/meminfo where present; None means unknown
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def available_memory_mb():
+    return _meminfo_mb("MemAvailable")
+
+
+def total_memory_mb():
+    return _meminfo_mb("MemTotal")
+
+
+def current_rss_mb():
+    # Resident set size right now; /proc where present, else psutil, else the lifetime peak
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / (1024 * 1024)
+    except (OSError, IndexError, ValueError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    return lifetime_peak_rss_mb()
+
+
+def lifetime_peak_rss_mb():
+    # 0.0 when the platform offers no way to tell
+    if resource is None:
+        if psutil is not None:
+            info = psutil.Process().memory_info()
+            # peak_wset is Windows' peak working set
+            return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class PeakRssMonitor:
+    # Samples RSS in the background so the peak while one job ran can be measured
+    # even though the process-wide maximum covers everything that ran before it.
+    # RSS is the whole process's; with a governor, max_jobs counts the jobs that
+    # held a reservation at once, and above 1 the peak includes their memory too.
+    def __init__(self, interval=0.05, governor=None):
+        self.interval = interval
+        self.governor = governor
+        self.start_mb = 0.0
+        self.peak_mb = 0.0
+        self.max_jobs = 0
+        self.stopped = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        self.start_mb = self.peak_mb = current_rss_mb()
+        self.max_jobs = 0
+        self.sample_jobs()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+    
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+            self.sample_jobs()
+    
+    def sample_jobs(self):
+        if self.governor is not None:
+            self.max_jobs = max(self.max_jobs, self.governor.active_jobs)
+    
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+        return self.peak_mb
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class MemoryGovernor:
+    # Keeps the jobs running in this process under a memory ceiling. Each job's
+    # peak is estimated up front from its audio duration and engine; a job that
+    # would not fit on its own is switched to chunked decoding, and a job that
+    # would not fit next to the running ones waits for them to finish.
+    def __init__(self, ceiling_mb):
+        self.ceiling_mb = ceiling_mb
+        self.reserved_mb = 0
+        self.active_jobs = 0
+        self.condition = threading.Condition()
+    
+    def plan(self, engine, duration):
+        estimate = engine.estimate_peak_mb(duration)
+        if estimate <= self.ceiling_mb:
+            return {"mode": "full", "estimate_mb": estimate, "chunk_seconds": None}
+        
+        # Halve the chunk length until a chunk fits, down to a minimum that still decodes well
+        chunk_seconds = int(min(CHUNK_SECONDS, duration))
+        estimate = engine.estimate_peak_mb(chunk_seconds)
+        while estimate > self.ceiling_mb and chunk_seconds > MIN_CHUNK_SECONDS:
+            chunk_seconds = max(MIN_CHUNK_SECONDS, chunk_seconds // 2)
+            estimate = engine.estimate_peak_mb(chunk_seconds)
+        return {"mode": "chunked", "estimate_mb": estimate, "chunk_seconds": chunk_seconds}
+    
+    @contextlib.contextmanager
+    def reserve(self, estimate_mb, on_wait=None):
+        with self.condition:
+            # A job always runs when nothing else does, even if it is over the ceiling
+            if self.active_jobs and self.reserved_mb + estimate_mb > self.ceiling_mb:
+                if on_wait is not None:
+                    on_wait()
+                while self.active_jobs and self.reserved_mb + estimate_mb > self.ceiling_mb:
+                    # A job cancelled while it waits leaves without reserving anything
+                    self.condition.wait(POLL_SECONDS)
+                    checkpoint()
+            self.reserved_mb += estimate_mb
+            self.active_jobs += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.reserved_mb -= estimate_mb
+                self.active_jobs -= 1
+                self.condition.notify_all()
+
+
+def default_ceiling_mb():
+    total = total_memory_mb()
+    return int(total * 0.75) if total else 4096
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_memory_governor():
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            ceiling = load_config()["job_memory_ceiling_mb"] or default_ceiling_mb()
+            _governor = MemoryGovernor(ceiling)
+        return _governor
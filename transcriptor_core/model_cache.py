@@ -0,0 +1,93 @@
+import threading
+import weakref
+
+from transcriptor_core.lazy_import import lazy_import
+from transcriptor_core import tracing
+from transcriptor_core.quantize import split_quantized, load_quantized_model
+
+whisper = lazy_import("whisper")
+
+# Whisper models stay resident for the life of the process and are shared by
+# every tool, so switching between tools never reloads the same weights
+_models = {}
+_load_locks = {}
+_cache_lock = threading.Lock()
+
+# Models tools have asked for, and callbacks interested in those requests
+_requested = set()
+_request_listeners = []
+
+# Whisper installs kv-cache hooks on the model for every decode, so two decodes
+# on the same model instance must never overlap
+_inference_locks = weakref.WeakKeyDictionary()
+_inference_locks_guard = threading.Lock()
+
+
+def inference_lock(model):
+    with _inference_locks_guard:
+        lock = _inference_locks.get(model)
+        if lock is None:
+            lock = threading.Lock()
+            _inference_locks[model] = lock
+        return lock
+
+
+def get_whisper_model(name, notify=True):
+    # notify=False is for background loads that are not a tool's choice
+    if notify:
+        with _cache_lock:
+            _requested.add(name)
+            listeners = list(_request_listeners)
+        for listener in listeners:
+            listener(name)
+    
+    # "base-int8" and friends are the dynamically quantized variants
+    base_name, quantized = split_quantized(name)
+    if quantized:
+        return get_engine_model(name, lambda: load_quantized_model(base_name))
+    return get_engine_model(name, lambda: whisper.load_model(name))
+
+
+def get_engine_model(key, loader):
+    # Loads each model once and keeps it resident; key identifies backend, size and precision
+    with _cache_lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+    
+    with load_lock:
+        with _cache_lock:
+            model = _models.get(key)
+        if model is None:
+            with tracing.span("model_load", key=str(key)):
+                model = loader()
+            with _cache_lock:
+                _models[key] = model
+        return model
+
+
+def add_request_listener(listener):
+    with _cache_lock:
+        _request_listeners.append(listener)
+
+
+def requested_models():
+    with _cache_lock:
+        return set(_requested)
+
+
+def is_loaded(name):
+    with _cache_lock:
+        return name in _models
+
+
+def loaded_models():
+    with _cache_lock:
+        return list(_models)
+
+
+def evict(name):
+    # Drop the cache's reference; tools still holding the model keep it alive
+    with _cache_lock:
+        return _models.pop(name, None) is not None
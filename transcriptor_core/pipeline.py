@@ -0,0 +1,536 @@
+import argparse
+import contextlib
+import json
+import os
+import queue
+import threading
+import time
+import wave
+
+from transcriptor_core import tracing
+from transcriptor_core.audio_io import SAMPLE_RATE, StreamResampler, _pcm_blocks, pcm16_to_float
+from transcriptor_core.cancellation import CancelToken, JobCancelled, cancel_scope, current_token
+from transcriptor_core.engines import ENGINES, NoSpeechError, create_engine
+from transcriptor_core.live_pipeline import SilenceSegmenter
+from transcriptor_core.presets import DECODE_PRESETS, DEFAULT_FILE_PRESET
+
+# Source -> stages -> sinks, every hop a bounded queue so a slow stage pushes back
+# on the ones before it instead of letting audio pile up in memory. Each stage
+# runs its own worker threads, so the slow one (usually recognition) can be given
+# more workers than the rest.
+#
+# Packets are dicts. Audio packets carry "pcm" (16-bit bytes), "rate", "channels"
+# and "offset" (seconds from the start of the stream); the engine stage turns them
+# into segment packets with "start", "end" and "text".
+#
+# Every item read from the source travels as an envelope (seq, [packets]), and a
+# stage answers each envelope with exactly one envelope of the same seq, even an
+# empty one. Stateful stages and sinks can then put work back in source order
+# however many workers ran in between.
+
+DEFAULT_QUEUE_SIZE = 8
+DEFAULT_BLOCK_SECONDS = 10
+
+_END = object()
+
+
+class PipelineStopped(Exception):
+    pass
+
+
+class Stage:
+    # fn(packet) returns a list of output packets (possibly empty). Ordered stages
+    # see packets in source order and so run on a single worker.
+    def __init__(self, name, fn, workers=1, ordered=False, flush=None):
+        if ordered and workers != 1:
+            raise ValueError(f"Stage {name} is ordered and must run with one worker")
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.ordered = ordered
+        # Called once after the last packet; returns packets still held (e.g. a VAD tail)
+        self.flush = flush
+
+
+class StageMetrics:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.packets_in = 0
+        self.packets_out = 0
+        self.busy_seconds = 0.0
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.max_depth = 0
+        self.lock = threading.Lock()
+    
+    def sample_depth(self, depth):
+        with self.lock:
+            self.depth_total += depth
+            self.depth_samples += 1
+            self.max_depth = max(self.max_depth, depth)
+    
+    def record(self, packets_in, packets_out, seconds):
+        with self.lock:
+            self.packets_in += packets_in
+            self.packets_out += packets_out
+            self.busy_seconds += seconds
+    
+    def snapshot(self, wall_seconds):
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "packets_in": self.packets_in,
+                "packets_out": self.packets_out,
+                "busy_seconds": round(self.busy_seconds, 4),
+                "packets_per_second": round(self.packets_in / wall_seconds, 2) if wall_seconds else 0.0,
+                # Share of the stage's worker time spent working rather than waiting
+                "utilization": round(self.busy_seconds / (wall_seconds * self.workers), 3) if wall_seconds else 0.0,
+                "mean_queue_depth": round(self.depth_total / self.depth_samples, 2) if self.depth_samples else 0.0,
+                "max_queue_depth": self.max_depth,
+            }
+
+
+class Pipeline:
+    def __init__(self, source, stages, sinks, queue_size=DEFAULT_QUEUE_SIZE, name="pipeline"):
+        self.source = source
+        self.stages = stages
+        self.sinks = sinks
+        self.name = name
+        # queues[i] feeds stages[i]; the last one feeds the sinks
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+        self.metrics = {stage.name: StageMetrics(stage.name, stage.workers) for stage in stages}
+        self.metrics["sink"] = StageMetrics("sink", 1)
+        
+        # Stopping (or a failure) also interrupts decodes in progress in the stage workers
+        self.cancel_token = CancelToken()
+        self.stop_event = self.cancel_token.event
+        self.error = None
+        self.threads = []
+        self.started = None
+        self.finished = None
+        self._remaining = {}
+        self._remaining_lock = threading.Lock()
+    
+    def _put(self, target, item):
+        while not self.stop_event.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+        raise PipelineStopped()
+    
+    def _get(self, source, metrics):
+        metrics.sample_depth(source.qsize())
+        while not self.stop_event.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        raise PipelineStopped()
+    
+    def _fail(self, where, error):
+        if self.error is None:
+            self.error = error
+            print(f"Pipeline {self.name}: {where} failed: {error}")
+        self.cancel_token.cancel(f"{where} failed")
+    
+    def _ordered(self, source, metrics):
+        # Yields envelopes in seq order, holding early arrivals back
+        pending = {}
+        next_seq = 0
+        while True:
+            item = self._get(source, metrics)
+            if item is _END:
+                for seq in sorted(pending):
+                    yield pending[seq]
+                return
+            pending[item[0]] = item
+            while next_seq in pending:
+                yield pending.pop(next_seq)
+                next_seq += 1
+    
+    def _unordered(self, source, metrics):
+        while True:
+            item = self._get(source, metrics)
+            if item is _END:
+                # Let the stage's other workers see the end too
+                source.put(_END)
+                return
+            yield item
+    
+    def _run_source(self):
+        try:
+            for seq, packet in enumerate(self.source):
+                self._put(self.queues[0], (seq, [packet]))
+            self._put(self.queues[0], _END)
+        except PipelineStopped:
+            pass
+        except Exception as e:
+            self._fail("source", e)
+        finally:
+            # Closing the generator ends any decoder subprocess it holds
+            close = getattr(self.source, "close", None)
+            if close is not None:
+                close()
+    
+    def _run_stage(self, index):
+        stage = self.stages[index]
+        metrics = self.metrics[stage.name]
+        source, target = self.queues[index], self.queues[index + 1]
+        envelopes = self._ordered(source, metrics) if stage.ordered else self._unordered(source, metrics)
+        last_seq = -1
+        try:
+            with cancel_scope(self.cancel_token):
+                for seq, packets in envelopes:
+                    started = time.perf_counter()
+                    outputs = []
+                    with tracing.span(f"{self.name}.{stage.name}", packets=len(packets)):
+                        for packet in packets:
+                            outputs.extend(stage.fn(packet) or [])
+                    metrics.record(len(packets), len(outputs), time.perf_counter() - started)
+                    last_seq = max(last_seq, seq)
+                    self._put(target, (seq, outputs))
+            
+            with self._remaining_lock:
+                self._remaining[index] -= 1
+                last_worker = self._remaining[index] == 0
+            if last_worker:
+                if stage.flush is not None:
+                    # Sorts after every real envelope; only ordered stages hold state to flush
+                    tail = stage.flush() or []
+                    metrics.record(0, len(tail), 0.0)
+                    self._put(target, (last_seq + 0.5, tail))
+                self._put(target, _END)
+        except (PipelineStopped, JobCancelled):
+            pass
+        except Exception as e:
+            self._fail(stage.name, e)
+    
+    def _run_sinks(self):
+        metrics = self.metrics["sink"]
+        try:
+            for _, packets in self._ordered(self.queues[-1], metrics):
+                started = time.perf_counter()
+                for packet in packets:
+                    for sink in self.sinks:
+                        sink.write(packet)
+                metrics.record(len(packets), 0, time.perf_counter() - started)
+        except PipelineStopped:
+            pass
+        except Exception as e:
+            self._fail("sink", e)
+        finally:
+            for sink in self.sinks:
+                try:
+                    sink.close()
+                except Exception as e:
+                    print(f"Warning: Could not close {type(sink).__name__}: {e}")
+    
+    def start(self):
+        self.started = time.perf_counter()
+        self.threads.append(threading.Thread(target=self._run_source, name=f"{self.name}-source", daemon=True))
+        for index, stage in enumerate(self.stages):
+            self._remaining[index] = stage.workers
+            for worker in range(stage.workers):
+                self.threads.append(threading.Thread(target=self._run_stage, args=(index,),
+                                                     name=f"{self.name}-{stage.name}-{worker}", daemon=True))
+        self.threads.append(threading.Thread(target=self._run_sinks, name=f"{self.name}-sink", daemon=True))
+        for thread in self.threads:
+            thread.start()
+        return self
+    
+    def stop(self):
+        self.cancel_token.cancel("Pipeline stopped")
+    
+    def wait(self):
+        for thread in self.threads:
+            thread.join()
+        self.finished = time.perf_counter()
+        if self.error is not None:
+            raise self.error
+        return self.report()
+    
+    def run(self):
+        return self.start().wait()
+    
+    def report(self):
+        wall = (self.finished or time.perf_counter()) - self.started
+        return {"wall_seconds": round(wall, 4),
+                "stages": {name: metrics.snapshot(wall) for name, metrics in self.metrics.items()}}
+
+
+def format_report(report):
+    lines = [f"{'stage':12s} {'workers':>7s} {'in':>6s} {'out':>6s} {'per s':>8s} {'busy':>6s} "
+             f"{'depth':>6s} {'max':>4s}"]
+    for name, entry in report["stages"].items():
+        lines.append(f"{name:12s} {entry['workers']:7d} {entry['packets_in']:6d} {entry['packets_out']:6d} "
+                     f"{entry['packets_per_second']:8.2f} {entry['utilization'] * 100:5.0f}% "
+                     f"{entry['mean_queue_depth']:6.2f} {entry['max_queue_depth']:4d}")
+    lines.append(f"wall {report['wall_seconds']:.3f}s")
+    return "\n".join(lines)
+
+
+# Sources: generators of audio packets
+
+def file_source(path, block_seconds=DEFAULT_BLOCK_SECONDS):
+    # WAV files are read at their own rate and channel count for the resample stage;
+    # anything else goes through ffmpeg, which decodes straight to 16 kHz mono
+    if path.lower().endswith(".wav"):
+        try:
+            f = wave.open(path, "rb")
+        except (wave.Error, EOFError):
+            f = None
+        if f is not None and f.getsampwidth() == 2 and f.getcomptype() == "NONE":
+            with contextlib.closing(f):
+                rate, channels = f.getframerate(), f.getnchannels()
+                frames_read = 0
+                while True:
+                    pcm = f.readframes(int(block_seconds * rate))
+                    if not pcm:
+                        return
+                    yield {"pcm": pcm, "rate": rate, "channels": channels, "offset": frames_read / float(rate)}
+                    frames_read += len(pcm) // (2 * channels)
+        if f is not None:
+            f.close()
+    yield from video_source(path, block_seconds)
+
+
+def video_source(path, block_seconds=DEFAULT_BLOCK_SECONDS):
+    # ffmpeg demuxes the first audio stream of any container
+    samples_read = 0
+    for pcm in _pcm_blocks(path, int(block_seconds * SAMPLE_RATE) * 2):
+        yield {"pcm": pcm, "rate": SAMPLE_RATE, "channels": 1, "offset": samples_read / float(SAMPLE_RATE)}
+        samples_read += len(pcm) // 2
+
+
+def capture_source(capture, rate=SAMPLE_RATE, channels=1, chunk=1024, block_chunks=16):
+    # Any capture_sources object (microphone, replay); ends on an empty read or stop()
+    capture.open(rate, channels, chunk)
+    frames_read = 0
+    try:
+        while True:
+            pcm = b"".join(capture.read(chunk) for _ in range(block_chunks))
+            if not pcm:
+                return
+            yield {"pcm": pcm, "rate": rate, "channels": channels, "offset": frames_read / float(rate)}
+            frames_read += len(pcm) // (2 * channels)
+    finally:
+        capture.close()
+
+
+def socket_source(connection, rate=SAMPLE_RATE, channels=1, block_bytes=32768):
+    # Raw 16-bit PCM from a network client until it closes the connection
+    frames_read = 0
+    pending = b""
+    frame_bytes = 2 * channels
+    while True:
+        data = connection.recv(block_bytes)
+        if not data:
+            break
+        pending += data
+        usable = len(pending) - len(pending) % frame_bytes
+        if usable:
+            yield {"pcm": pending[:usable], "rate": rate, "channels": channels, "offset": frames_read / float(rate)}
+            frames_read += usable // frame_bytes
+            pending = pending[usable:]
+
+
+# Stages
+
+def resample_stage():
+    # One resampler for the whole stream, started by the first packet that needs
+    # it; stateful, so ordered and single-worker. Output offsets count resampled
+    # samples, since the filter's output lags its input by a few milliseconds.
+    state = {"resampler": None, "offset": 0.0, "samples_out": 0}
+    
+    def packet_for(pcm):
+        offset = state["offset"] + state["samples_out"] / float(SAMPLE_RATE)
+        state["samples_out"] += len(pcm) // 2
+        return {"pcm": pcm, "rate": SAMPLE_RATE, "channels": 1, "offset": offset}
+    
+    def resample(packet):
+        if state["resampler"] is None:
+            if packet["rate"] == SAMPLE_RATE and packet["channels"] == 1:
+                return [packet]
+            state["resampler"] = StreamResampler(packet["rate"], packet["channels"])
+            state["offset"] = packet["offset"]
+            # A stopped or failed pipeline never flushes; end ffmpeg then instead
+            token = current_token()
+            if token is not None:
+                token.on_cancel(state["resampler"].abort)
+        try:
+            pcm = state["resampler"].feed(packet["pcm"])
+        except Exception:
+            state["resampler"].abort()
+            raise
+        return [packet_for(pcm)] if pcm else []
+    
+    def flush():
+        if state["resampler"] is None:
+            return []
+        pcm = state["resampler"].close()
+        return [packet_for(pcm)] if pcm else []
+    
+    return Stage("resample", resample, ordered=True, flush=flush)
+
+
+def vad_stage(silence_threshold=1000, silence_duration=1.5, max_duration=30.0):
+    # Cuts the stream into utterances at pauses; stateful, so ordered and single-worker
+    segmenter = SilenceSegmenter(rate=SAMPLE_RATE, silence_threshold=silence_threshold,
+                                 silence_duration=silence_duration, max_duration=max_duration)
+    
+    def utterance(frames, start_sample):
+        return {"pcm": b"".join(frames), "rate": SAMPLE_RATE, "channels": 1,
+                "offset": start_sample / float(SAMPLE_RATE)}
+    
+    def segment(packet):
+        return [utterance(frames, start) for frames, start in segmenter.feed_bytes(packet["pcm"])]
+    
+    def flush():
+        final = segmenter.flush()
+        return [utterance(*final)] if final is not None else []
+    
+    return Stage("vad", segment, ordered=True, flush=flush)
+
+
+def engine_stage(engine, language="en", preset=None, workers=1):
+    # Shares one loaded engine between workers. Whisper decodes serialize on the
+    # model's inference lock, so extra workers pay off most with CTranslate2 or Sphinx.
+    engine.load()
+    
+    def recognize(packet):
+        samples = pcm16_to_float(packet["pcm"])
+        duration = len(samples) / float(SAMPLE_RATE)
+        try:
+            result = engine.transcribe(samples, language=language, preset=preset)
+        except NoSpeechError:
+            # Nothing recognizable in this stretch; any other engine error fails the run
+            return []
+        offset = packet["offset"]
+        if result["segments"]:
+            return [dict(segment, start=segment["start"] + offset, end=segment["end"] + offset)
+                    for segment in result["segments"]]
+        text = result["text"].strip()
+        return [{"start": offset, "end": offset + duration, "text": text}] if text else []
+    return Stage("recognize", recognize, workers=workers)
+
+
+# Sinks: write(segment) in source order, then close()
+
+def format_srt_time(seconds):
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+
+class TextSink:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+        self.first = True
+    
+    def write(self, segment):
+        text = segment["text"].strip()
+        if text:
+            self.file.write(text if self.first else " " + text)
+            self.first = False
+    
+    def close(self):
+        self.file.close()
+
+
+class SrtSink:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+        self.index = 0
+    
+    def write(self, segment):
+        text = segment["text"].strip()
+        if not text:
+            return
+        self.index += 1
+        self.file.write(f"{self.index}\n{format_srt_time(segment['start'])} --> "
+                        f"{format_srt_time(segment['end'])}\n{text}\n\n")
+    
+    def close(self):
+        self.file.close()
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+    
+    def write(self, segment):
+        self.file.write(json.dumps({"start": round(segment["start"], 3), "end": round(segment["end"], 3),
+                                    "text": segment["text"].strip()}) + "\n")
+        # Readers may tail the file while the job runs
+        self.file.flush()
+    
+    def close(self):
+        self.file.close()
+
+
+class CallbackSink:
+    # For UIs: Tk callers should hand the segment to root.after, since this runs on the sink thread
+    def __init__(self, callback, on_close=None):
+        self.callback = callback
+        self.on_close = on_close
+    
+    def write(self, segment):
+        self.callback(segment)
+    
+    def close(self):
+        if self.on_close is not None:
+            self.on_close()
+
+
+def transcription_pipeline(source, engine, sinks, language="en", preset=None,
+                           recognize_workers=1, vad=True, queue_size=DEFAULT_QUEUE_SIZE, name="pipeline"):
+    stages = [resample_stage()]
+    if vad:
+        stages.append(vad_stage())
+    stages.append(engine_stage(engine, language, preset, recognize_workers))
+    return Pipeline(source, stages, sinks, queue_size=queue_size, name=name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe a file through the staged streaming pipeline")
+    parser.add_argument("path")
+    parser.add_argument("--engine", default="whisper", choices=list(ENGINES))
+    parser.add_argument("--model", help="Model name for the engine (default: the engine's own)")
+    parser.add_argument("--preset", default=DEFAULT_FILE_PRESET, choices=list(DECODE_PRESETS))
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--recognize-workers", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--block-seconds", type=float, default=DEFAULT_BLOCK_SECONDS)
+    parser.add_argument("--no-vad", action="store_true", help="Decode fixed blocks instead of utterances")
+    parser.add_argument("--txt", help="Write the plain transcript here")
+    parser.add_argument("--srt", help="Write SRT subtitles here")
+    parser.add_argument("--jsonl", help="Write one JSON segment per line here")
+    args = parser.parse_args()
+    
+    sinks = []
+    if args.txt:
+        sinks.append(TextSink(args.txt))
+    if args.srt:
+        sinks.append(SrtSink(args.srt))
+    if args.jsonl:
+        sinks.append(JsonlSink(args.jsonl))
+    if not sinks:
+        sinks.append(TextSink(os.path.splitext(args.path)[0] + "_transcript.txt"))
+    
+    options = {"preset": args.preset}
+    if args.model:
+        options["model_name"] = args.model
+    engine = create_engine(args.engine, **options)
+    pipeline = transcription_pipeline(file_source(args.path, args.block_seconds), engine, sinks,
+                                      language=args.language, recognize_workers=args.recognize_workers, vad=not args.no_vad,
+                                      queue_size=args.queue_size)
+    print(format_report(pipeline.run()))
+
+
+if __name__ == "__main__":
+    main()
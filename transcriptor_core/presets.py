@@ -0,0 +1,130 @@
+import argparse
+import json
+import time
+
+# Named decoding presets for whisper's transcribe(). Every preset pins the
+# options the library would otherwise pick for us: greedy vs beam search,
+# best_of for sampled fallbacks, the temperature fallback schedule, fp16 vs
+# fp32, the no-speech/logprob/compression thresholds and whether previous
+# text conditions the next window (which triggers re-decodes on loops).
+#
+# The "Fastest"/"Slowest" labels only follow from how many decodes each preset
+# may run (beam width, best_of, fallback temperatures); no timings have been
+# measured for them. main() below measures speed and word error rate on real
+# audio and hardware.
+DECODE_PRESETS = {
+    "realtime": {
+        "label": "Realtime (Fastest)",
+        "beam_size": None,
+        "best_of": None,
+        "temperature": (0.0,),  # no fallback retries
+        "compression_ratio_threshold": 2.4,
+        "logprob_threshold": -1.0,
+        "no_speech_threshold": 0.6,
+        "condition_on_previous_text": False,
+    },
+    "balanced": {
+        "label": "Balanced",
+        "beam_size": None,
+        "best_of": 2,
+        "temperature": (0.0, 0.4, 0.8),
+        "compression_ratio_threshold": 2.4,
+        "logprob_threshold": -1.0,
+        "no_speech_threshold": 0.6,
+        "condition_on_previous_text": True,
+    },
+    "accurate": {
+        "label": "Accurate (Slowest)",
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "compression_ratio_threshold": 2.4,
+        "logprob_threshold": -1.0,
+        "no_speech_threshold": 0.6,
+        "condition_on_previous_text": True,
+    },
+}
+
+DEFAULT_FILE_PRESET = "balanced"
+DEFAULT_LIVE_PRESET = "realtime"
+
+
+def decode_options(preset_name, device=None):
+    # Keyword arguments for model.transcribe(); fp16 only where it is supported
+    preset = DECODE_PRESETS[preset_name]
+    options = {key: value for key, value in preset.items() if key != "label"}
+    options["fp16"] = device is not None and getattr(device, "type", str(device)) == "cuda"
+    return options
+
+
+def batch_decode_options(preset_name, device=None):
+    # whisper.decode() takes a single temperature and no transcribe-level thresholds
+    options = decode_options(preset_name, device)
+    return {
+        "beam_size": options["beam_size"],
+        "temperature": options["temperature"][0],
+        "fp16": options["fp16"],
+    }
+
+
+def word_error_rate(reference, hypothesis):
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / float(len(ref))
+
+
+def benchmark_presets(audio_path, reference_text, model_name="base", presets=None, language="en"):
+    # Measures real-time factor and word error rate of each preset on one file
+    import whisper
+    
+    model = whisper.load_model(model_name)
+    audio = whisper.load_audio(audio_path)
+    duration = len(audio) / float(whisper.audio.SAMPLE_RATE)
+    
+    results = {}
+    for name in presets or DECODE_PRESETS:
+        started = time.perf_counter()
+        result = model.transcribe(audio, language=language, task="transcribe",
+                                  **decode_options(name, model.device))
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            "model": model_name,
+            "seconds": round(elapsed, 2),
+            "real_time_factor": round(elapsed / duration, 3),
+            "wer": round(word_error_rate(reference_text, result["text"]), 4),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure speed and accuracy of the decode presets")
+    parser.add_argument("audio_path")
+    parser.add_argument("reference", help="Text file with the reference transcript")
+    parser.add_argument("--model", default="base", choices=["tiny", "base", "small"])
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    with open(args.reference, "r", encoding="utf-8") as f:
+        reference_text = f.read()
+    
+    results = benchmark_presets(args.audio_path, reference_text, model_name=args.model)
+    for name, entry in results.items():
+        print(f"{name:10s} RTF {entry['real_time_factor']:.3f}  WER {entry['wer'] * 100:.1f}%")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import importlib
+import threading
+
+from transcriptor_core import model_cache
+from transcriptor_core.memory import estimated_memory_mb, available_memory_mb
+
+
+class PrewarmService:
+    # Loads the most likely Whisper model into the shared model cache while the
+    # user is still looking at the launcher. Loading cannot be interrupted once
+    # whisper.load_model runs, so cancelling drops the model as soon as it lands.
+    def __init__(self, memory_budget_mb=2048, on_status=None):
+        self.memory_budget_mb = memory_budget_mb
+        self.on_status = on_status
+        self.model_name = None
+        self.thread = None
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.loaded_model = None  # Set once a pre-load finished and was not cancelled
+        # run() decides whether its model stays and cancel() decides what to
+        # release under this lock, so a model is never kept and forgotten
+        self.lock = threading.Lock()
+        model_cache.add_request_listener(self.on_model_requested)
+    
+    def start(self, model_name):
+        if self.thread is not None:
+            self.cancel()
+        
+        estimate = estimated_memory_mb(model_name)
+        available = available_memory_mb()
+        if estimate > self.memory_budget_mb:
+            self.report(f"Skipped pre-loading {model_name} model (over the {self.memory_budget_mb} MB budget)")
+            return False
+        if available is not None and estimate > available:
+            self.report(f"Skipped pre-loading {model_name} model (only {available} MB free)")
+            return False
+        
+        self.model_name = model_name
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.loaded_model = None
+        self.thread = threading.Thread(target=self.run, args=(model_name, self.cancelled, self.done))
+        self.thread.daemon = True
+        self.thread.start()
+        return True
+    
+    def run(self, model_name, cancelled, done):
+        try:
+            if model_cache.is_loaded(model_name):
+                self.report(f"Whisper {model_name} model ready")
+                return
+            self.report(f"Pre-loading Whisper {model_name} model...")
+            
+            # Import the stack first; this is the last cheap point to bail out
+            importlib.import_module("whisper")
+            if cancelled.is_set():
+                self.report("")
+                return
+            
+            model_cache.get_whisper_model(model_name, notify=False)
+            
+            with self.lock:
+                keep = not cancelled.is_set()
+                if keep:
+                    self.loaded_model = model_name
+            if keep:
+                self.report(f"Whisper {model_name} model ready")
+            else:
+                self.release(model_name)
+                self.report("")
+        except Exception as e:
+            self.report(f"Pre-loading failed: {e}")
+        finally:
+            done.set()
+    
+    def cancel(self):
+        # Stops a pending pre-load; a model that already finished loading is released
+        if self.thread is None:
+            return
+        with self.lock:
+            self.cancelled.set()
+            loaded_model = self.loaded_model
+            self.loaded_model = None
+        if loaded_model is not None:
+            self.release(loaded_model)
+        self.thread = None
+    
+    def release(self, model_name):
+        # Only drop the model if no tool has asked for it in the meantime
+        if model_name not in model_cache.requested_models():
+            model_cache.evict(model_name)
+    
+    def on_model_requested(self, model_name):
+        # A tool asked for a different model while the guess was still loading, so
+        # the guess was wrong. A finished pre-load stays resident: one tool may load
+        # several models, like the cascade's tiny draft before its refine model.
+        if self.thread is not None and not self.done.is_set() and model_name != self.model_name:
+            self.cancel()
+    
+    def report(self, message):
+        if self.on_status is not None:
+            try:
+                self.on_status(message)
+            except Exception:
+                pass
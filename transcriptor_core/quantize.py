@@ -0,0 +1,148 @@
+import argparse
+import io
+import json
+import os
+import time
+
+from transcriptor_core.lazy_import import lazy_import
+from transcriptor_core.presets import DEFAULT_FILE_PRESET, decode_options, word_error_rate
+
+torch = lazy_import("torch")
+whisper = lazy_import("whisper")
+
+# Quantized models are named like "base-int8" everywhere a model name is stored
+# (model cache keys, saved settings), so they sit beside the fp32 models
+QUANTIZED_SUFFIX = "-int8"
+
+CACHE_DIR = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+                         "transcriptor", "quantized")
+
+
+def quantized_name(name, quantized=True):
+    return name + QUANTIZED_SUFFIX if quantized else name
+
+
+def split_quantized(name):
+    # "base-int8" -> ("base", True), "base" -> ("base", False)
+    if name.endswith(QUANTIZED_SUFFIX):
+        return name[:-len(QUANTIZED_SUFFIX)], True
+    return name, False
+
+
+def cache_path(name):
+    # Packed int8 weights depend on the torch build and quantized kernel backend
+    version = torch.__version__.split("+")[0]
+    backend = torch.backends.quantized.engine
+    return os.path.join(CACHE_DIR, f"{name}{QUANTIZED_SUFFIX}-torch{version}-{backend}.pt")
+
+
+def quantize_model(model):
+    # Whisper's Linear subclass only casts weights to the input dtype, which is a
+    # no-op in fp32; quantize_dynamic matches exact types, so make them plain nn.Linear
+    for module in model.modules():
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
+    model.eval()
+    from torch.ao.quantization import quantize_dynamic
+    return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_quantized_model(name):
+    # Dynamic int8 quantization of every linear layer; the quantized weights are
+    # cached on disk so later loads skip the fp32 checkpoint and the conversion
+    path = cache_path(name)
+    if os.path.exists(path):
+        try:
+            checkpoint = torch.load(path, map_location="cpu", weights_only=False)
+            model = whisper.model.Whisper(whisper.model.ModelDimensions(**checkpoint["dims"]))
+            model = quantize_model(model)
+            model.load_state_dict(checkpoint["model_state_dict"])
+            if name in whisper._ALIGNMENT_HEADS:
+                model.set_alignment_heads(whisper._ALIGNMENT_HEADS[name])
+            return model
+        except Exception as e:
+            print(f"Warning: Could not load quantized {name} model from cache, rebuilding: {e}")
+    
+    # Quantized kernels run on CPU only
+    model = quantize_model(whisper.load_model(name, device="cpu"))
+    
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_path = path + ".tmp"
+        torch.save({"dims": model.dims.__dict__, "model_state_dict": model.state_dict()}, temp_path)
+        os.replace(temp_path, path)
+    except Exception as e:
+        print(f"Warning: Could not cache quantized {name} model: {e}")
+    return model
+
+
+def weights_mb(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def benchmark_quantization(audio_path, model_name="base", reference_text=None,
+                           preset=DEFAULT_FILE_PRESET, language="en"):
+    # Weight memory, load time and real-time factor of fp32 versus int8 on one file
+    audio = whisper.load_audio(audio_path)
+    duration = len(audio) / float(whisper.audio.SAMPLE_RATE)
+    
+    loaders = {
+        "fp32": lambda: whisper.load_model(model_name, device="cpu"),
+        "int8": lambda: load_quantized_model(model_name),
+    }
+    results = {}
+    for label, loader in loaders.items():
+        started = time.perf_counter()
+        model = loader()
+        load_seconds = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        result = model.transcribe(audio, language=language, task="transcribe",
+                                  **decode_options(preset, model.device))
+        elapsed = time.perf_counter() - started
+        
+        results[label] = {
+            "model": quantized_name(model_name, label == "int8"),
+            "weights_mb": round(weights_mb(model), 1),
+            "load_seconds": round(load_seconds, 2),
+            "seconds": round(elapsed, 2),
+            "real_time_factor": round(elapsed / duration, 3),
+        }
+        if reference_text is not None:
+            results[label]["wer"] = round(word_error_rate(reference_text, result["text"]), 4)
+        del model
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fp32 and dynamic int8 Whisper models on CPU")
+    parser.add_argument("audio_path")
+    parser.add_argument("--reference", help="Text file with the reference transcript, to report WER")
+    parser.add_argument("--model", default="base", choices=["tiny", "base", "small"])
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    reference_text = None
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            reference_text = f.read()
+    
+    results = benchmark_quantization(args.audio_path, model_name=args.model, reference_text=reference_text)
+    for label, entry in results.items():
+        line = (f"{label:5s} weights {entry['weights_mb']:.1f} MB  load {entry['load_seconds']:.2f}s  "
+                f"RTF {entry['real_time_factor']:.3f}")
+        if "wer" in entry:
+            line += f"  WER {entry['wer'] * 100:.1f}%"
+        print(line)
+    fp32, int8 = results["fp32"], results["int8"]
+    print(f"int8 uses {int8['weights_mb'] / fp32['weights_mb'] * 100:.0f}% of the fp32 weight memory "
+          f"and runs at {fp32['real_time_factor'] / int8['real_time_factor']:.2f}x the speed")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
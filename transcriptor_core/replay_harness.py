@@ -0,0 +1,102 @@
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import tkinter as tk
+
+from transcriptor_core.capture_sources import FileSource, SyntheticSource
+from transcriptor_core.engines import WHISPER_ENGINES
+
+# Drives the real LiveTranscriptorApp (record_audio -> process_audio ->
+# update_transcription) from a file or synthetic signal instead of a microphone.
+# On machines without a display run it under xvfb-run.
+LIVE_MODULE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "live_transcriptor", "live_transcriptor.py")
+
+
+def load_live_module():
+    spec = importlib.util.spec_from_file_location("live_transcriptor", LIVE_MODULE_PATH)
+    live_module = importlib.util.module_from_spec(spec)
+    sys.modules["live_transcriptor"] = live_module
+    spec.loader.exec_module(live_module)
+    return live_module
+
+
+def run_replay(source, model="tiny", dual_engine=False, poll_ms=50, engine="whisper"):
+    live_module = load_live_module()
+    root = tk.Tk()
+    root.withdraw()
+    app = live_module.LiveTranscriptorApp(root, capture_source=source)
+    app.model_var.set(model)
+    app.engine_var.set(engine)
+    app.change_whisper_model()
+    app.dual_engine_var.set(dual_engine)
+    
+    report = {}
+    timing = {}
+    
+    def wait_for_model():
+        if app.active_model_name != f"{engine}/{model}":
+            root.after(poll_ms, wait_for_model)
+            return
+        timing["start"] = time.perf_counter()
+        app.start_recording()
+        root.after(poll_ms, wait_for_finish)
+    
+    def wait_for_finish():
+        if app.is_recording or app.is_transcribing or app.update_thread.is_alive():
+            root.after(poll_ms, wait_for_finish)
+            return
+        wall = time.perf_counter() - timing["start"]
+        audio_seconds = source.duration()
+        report.update({
+            "model": model,
+            "engine": engine,
+            "dual_engine": dual_engine,
+            "speed": source.speed,
+            "audio_seconds": round(audio_seconds, 3),
+            "wall_seconds": round(wall, 3),
+            "throughput_x_realtime": round(audio_seconds / wall, 3) if wall > 0 else 0.0,
+            "utterances": len(app.latency_tracker.traces),
+            "latency_ms": app.latency_tracker.stats(),
+            "transcript": app.whisper_text.get("1.0", tk.END).strip(),
+        })
+        root.destroy()
+    
+    root.after(poll_ms, wait_for_model)
+    root.mainloop()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay audio through the live transcription pipeline")
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument("--input", help="Audio file to replay (WAV, FLAC, ...)")
+    source_group.add_argument("--synthetic", type=float, metavar="SECONDS",
+                              help="Replay a synthetic speech-like signal of this length")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed (1 = real time, 0 = as fast as possible)")
+    parser.add_argument("--model", default="tiny", choices=["tiny", "base", "small"])
+    parser.add_argument("--engine", default="whisper", choices=WHISPER_ENGINES)
+    parser.add_argument("--dual-engine", action="store_true")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic signal")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    
+    if args.input:
+        source = FileSource(args.input, speed=args.speed)
+    else:
+        source = SyntheticSource(duration=args.synthetic, seed=args.seed, speed=args.speed)
+    
+    report = run_replay(source, model=args.model, dual_engine=args.dual_engine, engine=args.engine)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
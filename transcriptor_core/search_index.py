@@ -0,0 +1,190 @@
+import argparse
+import contextlib
+import os
+import sqlite3
+import time
+
+# Full-text index over every transcript the suite produces, one row per segment
+# with its time range, so a search answers "which file, and where in it". Each
+# finished job replaces its own media file's rows, so the index stays current
+# without ever being rebuilt. SQLite's FTS5 does the tokenizing and ranking.
+INDEX_PATH = os.environ.get("TRANSCRIPTOR_INDEX",
+                            os.path.join(os.path.expanduser("~"), ".transcriptor_index.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    transcript_path TEXT,
+    engine TEXT,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    media_id INTEGER NOT NULL REFERENCES media(id),
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_media ON segments(media_id);
+-- The full-text index reads its text from segments; the triggers keep the two in step
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS segments_insert AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_delete AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts(segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+@contextlib.contextmanager
+def connect(path=None):
+    # A short-lived connection per call: jobs finish on worker threads and SQLite
+    # connections must not be shared between threads
+    connection = sqlite3.connect(path or INDEX_PATH, timeout=30)
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
+def add_transcript(media_path, segments, transcript_path=None, engine="", index_path=None):
+    # segments are engine segments ({"start", "end", "text"} in seconds)
+    media_path = os.path.abspath(media_path)
+    rows = [(segment["text"].strip(), int(segment["start"] * 1000), int(segment["end"] * 1000))
+            for segment in segments if segment["text"].strip()]
+    with connect(index_path) as connection:
+        row = connection.execute("SELECT id FROM media WHERE path = ?", (media_path,)).fetchone()
+        if row is not None:
+            media_id = row[0]
+            connection.execute("DELETE FROM segments WHERE media_id = ?", (media_id,))
+            connection.execute("UPDATE media SET transcript_path = ?, engine = ?, indexed_at = ? WHERE id = ?",
+                               (transcript_path, engine, time.time(), media_id))
+        else:
+            media_id = connection.execute(
+                "INSERT INTO media (path, transcript_path, engine, indexed_at) VALUES (?, ?, ?, ?)",
+                (media_path, transcript_path, engine, time.time())).lastrowid
+        connection.executemany("INSERT INTO segments (text, media_id, start_ms, end_ms) VALUES (?, ?, ?, ?)",
+                               [(text, media_id, start_ms, end_ms) for text, start_ms, end_ms in rows])
+    return len(rows)
+
+
+def index_result(media_path, result, transcript_path=None, engine="", duration=None):
+    # Engines without timing (Sphinx) give one untimed text; index it as a single
+    # segment covering the file so it is still searchable
+    segments = result["segments"]
+    if not segments and result["text"].strip():
+        segments = [{"start": 0.0, "end": duration or 0.0, "text": result["text"]}]
+    try:
+        count = add_transcript(media_path, segments, transcript_path, engine)
+        print(f"Indexed {count} segment(s) of {os.path.basename(media_path)}")
+    except sqlite3.Error as e:
+        # The transcript itself is already saved; a locked or broken index must not fail the job
+        print(f"Warning: Could not update the search index: {e}")
+
+
+def index_session(session_index_path, engine="whisper"):
+    # A live session's recording is indexed from the lines in its session index
+    from transcriptor_core.session_recorder import load_index
+    header, entries = load_index(session_index_path)
+    if header is None:
+        return
+    recording_path = os.path.join(os.path.dirname(session_index_path), header["recording"])
+    segments = [{"start": entry["start_ms"] / 1000.0, "end": entry["end_ms"] / 1000.0, "text": entry["text"]}
+                for entry in entries if entry.get("engine") == engine]
+    index_result(recording_path, {"text": "", "segments": segments}, session_index_path, engine)
+
+
+def remove_media(media_path, index_path=None):
+    media_path = os.path.abspath(media_path)
+    with connect(index_path) as connection:
+        row = connection.execute("SELECT id FROM media WHERE path = ?", (media_path,)).fetchone()
+        if row is None:
+            return False
+        connection.execute("DELETE FROM segments WHERE media_id = ?", (row[0],))
+        connection.execute("DELETE FROM media WHERE id = ?", (row[0],))
+        return True
+
+
+def fts_query(text):
+    # Plain words match as a phrase; FTS5 syntax (AND, OR, NEAR, "quotes", prefix*)
+    # is passed through when the query already uses it
+    text = text.strip()
+    if any(token in text for token in ('"', "*", " AND ", " OR ", " NOT ", "NEAR(")):
+        return text
+    return '"' + text.replace('"', '""') + '"'
+
+
+def search(query, limit=50, index_path=None):
+    with connect(index_path) as connection:
+        rows = connection.execute(
+            "SELECT media.path, segments.start_ms, segments.end_ms, segments.text, "
+            "snippet(segments_fts, 0, '[', ']', '...', 12) "
+            "FROM segments_fts JOIN segments ON segments.id = segments_fts.rowid "
+            "JOIN media ON media.id = segments.media_id "
+            "WHERE segments_fts MATCH ? ORDER BY rank LIMIT ?",
+            (fts_query(query), limit)).fetchall()
+    return [{"media": path, "start_ms": start_ms, "end_ms": end_ms, "text": text, "snippet": snippet}
+            for path, start_ms, end_ms, text, snippet in rows]
+
+
+def stats(index_path=None):
+    with connect(index_path) as connection:
+        media_count = connection.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+        segment_count = connection.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+    return {"media": media_count, "segments": segment_count}
+
+
+def format_ms(milliseconds):
+    hours, milliseconds = divmod(int(milliseconds), 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search every indexed transcript")
+    parser.add_argument("--index", help=f"Index database (default: {INDEX_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    search_parser = subparsers.add_parser("search", help="Find a phrase")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=50)
+    
+    add_parser = subparsers.add_parser("add", help="Index an existing plain-text transcript")
+    add_parser.add_argument("media_path")
+    add_parser.add_argument("transcript_path")
+    
+    remove_parser = subparsers.add_parser("remove", help="Drop a media file from the index")
+    remove_parser.add_argument("media_path")
+    
+    subparsers.add_parser("stats", help="Count indexed files and segments")
+    args = parser.parse_args()
+    
+    if args.command == "search":
+        hits = search(args.query, args.limit, args.index)
+        for hit in hits:
+            print(f"{hit['media']}  {format_ms(hit['start_ms'])} ({hit['start_ms']} ms)  {hit['snippet']}")
+        print(f"{len(hits)} match(es)")
+    elif args.command == "add":
+        # Old _transcript.txt files carry no timing, so the whole text sits at offset 0
+        with open(args.transcript_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        count = add_transcript(args.media_path, [{"start": 0.0, "end": 0.0, "text": text}],
+                               os.path.abspath(args.transcript_path), index_path=args.index)
+        print(f"Indexed {count} segment(s)")
+    elif args.command == "remove":
+        print("Removed" if remove_media(args.media_path, args.index) else "Not in the index")
+    else:
+        entry = stats(args.index)
+        print(f"{entry['media']} file(s), {entry['segments']} segment(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+import argparse
+import itertools
+import json
+import os
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from transcriptor_core.cancellation import CancelToken, JobCancelled
+from transcriptor_core.cpu_scheduler import get_cpu_scheduler
+from transcriptor_core.engines import ENGINES, WHISPER_ENGINES, EngineError, create_engine, engine_uses_torch
+from transcriptor_core.file_jobs import run_file_job
+from transcriptor_core.model_cache import loaded_models
+from transcriptor_core.presets import DEFAULT_LIVE_PRESET
+from transcriptor_core.service_client import DEFAULT_PORT, ServiceError, to_json
+from transcriptor_core.workers import submit_cpu_job
+
+# One long-lived process per machine that keeps models resident and runs every
+# tool's transcriptions, so a model is loaded once rather than once per window.
+# It listens on localhost only and reads media paths straight from disk.
+#
+#   GET  /status                  resident models, running and queued jobs, limits
+#   POST /jobs                    {"path", "engine", "options", "language"} -> {"id"}
+#   GET  /jobs/<id>               state, progress, and the result once done
+#   GET  /jobs/<id>/events?from=N JSON lines: stage changes and segments as they
+#                                 are decoded, ending with the final state
+#   POST /jobs/<id>/cancel        drop a queued job or stop a running one
+#   POST /transcribe?engine=&model=&language=&preset=
+#                                 one utterance of 16 kHz mono 16-bit PCM -> {"text", "segments"};
+#                                 an empty body only loads the model
+#   POST /detect?engine=&model=   up to 30 s of speech as PCM -> {"language", "probability"}
+MAX_QUEUED = 32       # Submissions beyond this are refused with 503
+MAX_UTTERANCES = 2    # Concurrent /transcribe decodes, kept apart from the file job slots
+KEEP_FINISHED = 100   # Finished jobs kept for status queries
+MAX_UTTERANCE_BYTES = 16000 * 2 * 60
+
+
+class ServiceJob:
+    def __init__(self, job_id, path, engine_name, options, language):
+        self.id = job_id
+        self.path = path
+        self.engine_name = engine_name
+        self.options = options
+        self.language = language
+        self.state = "queued"   # queued, running, done, failed, cancelled
+        self.stage = "Queued"
+        self.progress = 0
+        self.events = []
+        self.result = None
+        self.report = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.cancel_token = CancelToken()
+        self.changed = threading.Condition()
+    
+    def add_event(self, event):
+        with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+    
+    def start(self):
+        # False when the job was cancelled before its slot came free
+        with self.changed:
+            if self.finished_at is not None or self.cancel_token.is_cancelled():
+                return False
+            self.state = "running"
+            return True
+    
+    def finish(self, state, error=None):
+        with self.changed:
+            if self.finished_at is not None:
+                # A queued job cancelled just as its slot came free
+                return
+            self.state = state
+            self.error = error
+            self.finished_at = time.time()
+            self.events.append({"state": state, "error": error})
+            self.changed.notify_all()
+    
+    def events_from(self, start, timeout=1.0):
+        # Events after `start`, waiting up to `timeout` for new ones; None once finished
+        with self.changed:
+            if len(self.events) <= start and self.finished_at is None:
+                self.changed.wait(timeout)
+            if len(self.events) <= start and self.finished_at is not None:
+                return None
+            return self.events[start:]
+    
+    def summary(self, with_result=False):
+        entry = {
+            "id": self.id,
+            "path": self.path,
+            "engine": self.engine_name,
+            "state": self.state,
+            "stage": self.stage,
+            "progress": self.progress,
+            "segments": sum(1 for event in self.events if "segment" in event),
+            "error": self.error,
+        }
+        if with_result and self.state == "done":
+            entry["result"] = self.result
+            entry["report"] = self.report
+        return entry
+
+
+class TranscriptionService:
+    def __init__(self, max_queued=MAX_QUEUED, max_utterances=MAX_UTTERANCES):
+        self.max_queued = max_queued
+        self.jobs = {}
+        self.jobs_lock = threading.Lock()
+        self.job_ids = itertools.count(1)
+        self.utterance_slots = threading.BoundedSemaphore(max_utterances)
+        # Engines for /transcribe, kept so their models and decoders stay warm
+        self.engines = {}
+        self.engines_lock = threading.Lock()
+        self.started_at = time.time()
+    
+    def submit(self, path, engine_name="whisper", options=None, language="en"):
+        if engine_name not in ENGINES:
+            raise ServiceError(f"Unknown transcription engine: {engine_name}")
+        if not os.path.isfile(path):
+            raise ServiceError(f"No such file: {path}")
+        with self.jobs_lock:
+            if sum(1 for job in self.jobs.values() if job.state == "queued") >= self.max_queued:
+                raise ServiceError("Too many queued jobs; try again later")
+            job = ServiceJob(next(self.job_ids), path, engine_name, options or {}, language)
+            self.jobs[job.id] = job
+            self.prune()
+        # File jobs share the process's CPU slots, so at most parallel_jobs run at once
+        submit_cpu_job(self.run_job, job, uses_torch=engine_uses_torch(engine_name),
+                       cancel_token=job.cancel_token)
+        print(f"Job {job.id} queued: {path} ({engine_name})")
+        return job
+    
+    def prune(self):
+        finished = sorted((job for job in self.jobs.values() if job.finished_at is not None),
+                          key=lambda job: job.finished_at)
+        for job in finished[:max(0, len(finished) - KEEP_FINISHED)]:
+            del self.jobs[job.id]
+    
+    def get_job(self, job_id):
+        with self.jobs_lock:
+            return self.jobs.get(job_id)
+    
+    def cancel(self, job):
+        # A running job stops at its next checkpoint, mid-decode included
+        job.cancel_token.cancel()
+        with job.changed:
+            if job.state == "queued":
+                # The slot it is waiting for will find it cancelled and skip it
+                job.finish("cancelled")
+    
+    def run_job(self, job):
+        if not job.start():
+            return
+        
+        def on_stage(message, progress):
+            job.stage = message
+            job.progress = progress
+            job.add_event({"stage": message, "progress": progress})
+        
+        def on_segment(segment):
+            job.add_event({"segment": segment})
+        
+        try:
+            engine = create_engine(job.engine_name, **job.options)
+            result, report = run_file_job(engine, job.path, job.language, on_stage=on_stage,
+                                          trace_prefix="service", on_segment=on_segment,
+                                          cancel_token=job.cancel_token)
+            job.cancel_token.check()
+            job.result = result
+            job.report = report
+            job.stage = "Done"
+            job.progress = 100
+            job.finish("done")
+            print(f"Job {job.id} done: {job.path}")
+        except JobCancelled:
+            job.finish("cancelled")
+            print(f"Job {job.id} cancelled")
+        except Exception as e:
+            job.finish("failed", str(e))
+            print(f"Job {job.id} failed: {e}")
+    
+    def utterance_engine(self, engine_name, options):
+        key = (engine_name, to_json(sorted(options.items())))
+        with self.engines_lock:
+            engine = self.engines.get(key)
+            if engine is None:
+                engine = create_engine(engine_name, **options)
+                self.engines[key] = engine
+        return engine.load()
+    
+    def transcribe_utterance(self, pcm, engine_name="whisper", options=None, language="en",
+                             preset=DEFAULT_LIVE_PRESET):
+        from transcriptor_core.live_pipeline import pcm_to_float
+        engine = self.utterance_engine(engine_name, options or {})
+        if not pcm:
+            # An empty request only loads the model
+            return {"text": "", "segments": []}
+        with self.utterance_slots:
+            result = engine.transcribe(pcm_to_float(pcm), language=language, preset=preset)
+        # Segments carry the log probabilities clients use to judge the decode
+        return {"text": result["text"].strip(), "segments": result["segments"]}
+    
+    def detect_language(self, pcm, engine_name="whisper", options=None):
+        from transcriptor_core.live_pipeline import pcm_to_float
+        engine = self.utterance_engine(engine_name, options or {})
+        with self.utterance_slots:
+            language, probability = engine.detect_language(pcm_to_float(pcm))
+        return {"language": language, "probability": probability}
+    
+    def status(self):
+        with self.jobs_lock:
+            jobs = list(self.jobs.values())
+        with self.engines_lock:
+            engines = [engine.describe() for engine in self.engines.values()]
+        return {
+            "uptime_seconds": round(time.time() - self.started_at),
+            "models": [str(key) for key in loaded_models()],
+            "utterance_engines": engines,
+            "parallel_jobs": get_cpu_scheduler().parallel_jobs,
+            "max_queued": self.max_queued,
+            "jobs": {state: sum(1 for job in jobs if job.state == state)
+                     for state in ("queued", "running", "done", "failed", "cancelled")},
+        }
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    server_version = "TranscriptorService/1.0"
+    
+    def log_message(self, format, *args):
+        # Job progress is printed by the service; per-request lines are noise
+        pass
+    
+    def send_json(self, value, status=200):
+        body = to_json(value).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_error_json(self, status, message):
+        self.send_json({"error": message}, status)
+    
+    def read_body(self, limit):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > limit:
+            raise ServiceError(f"Request body too large ({length} bytes)")
+        return self.rfile.read(length)
+    
+    def route(self):
+        url = urllib.parse.urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = dict(urllib.parse.parse_qsl(url.query))
+        job = None
+        if len(parts) >= 2 and parts[0] == "jobs":
+            try:
+                job = self.server.service.get_job(int(parts[1]))
+            except ValueError:
+                pass
+            if job is None:
+                self.send_error_json(404, f"No such job: {parts[1]}")
+                return None
+        return parts, query, job
+    
+    def do_GET(self):
+        routed = self.route()
+        if routed is None:
+            return
+        parts, query, job = routed
+        service = self.server.service
+        if parts == ["status"]:
+            self.send_json(service.status())
+        elif job is not None and len(parts) == 2:
+            self.send_json(job.summary(with_result=True))
+        elif job is not None and parts[2:] == ["events"]:
+            self.stream_events(job, int(query.get("from", 0)))
+        else:
+            self.send_error_json(404, f"Unknown path: {self.path}")
+    
+    def do_POST(self):
+        routed = self.route()
+        if routed is None:
+            return
+        parts, query, job = routed
+        service = self.server.service
+        try:
+            if parts == ["jobs"]:
+                request = json.loads(self.read_body(1 << 20) or b"{}")
+                job = service.submit(request["path"], request.get("engine", "whisper"),
+                                     request.get("options"), request.get("language", "en"))
+                self.send_json({"id": job.id}, 202)
+            elif job is not None and parts[2:] == ["cancel"]:
+                service.cancel(job)
+                self.send_json(job.summary())
+            elif parts == ["transcribe"]:
+                pcm = self.read_body(MAX_UTTERANCE_BYTES)
+                options = {"model_name": query["model"]} if "model" in query else {}
+                self.send_json(service.transcribe_utterance(pcm, query.get("engine", "whisper"), options,
+                                                            query.get("language", "en"),
+                                                            query.get("preset", DEFAULT_LIVE_PRESET)))
+            elif parts == ["detect"]:
+                pcm = self.read_body(MAX_UTTERANCE_BYTES)
+                options = {"model_name": query["model"]} if "model" in query else {}
+                self.send_json(service.detect_language(pcm, query.get("engine", "whisper"), options))
+            else:
+                self.send_error_json(404, f"Unknown path: {self.path}")
+        except ServiceError as e:
+            self.send_error_json(503 if "Too many" in str(e) else 400, str(e))
+        except (KeyError, ValueError, TypeError) as e:
+            self.send_error_json(400, f"Bad request: {e}")
+        except EngineError as e:
+            self.send_error_json(500, str(e))
+        except Exception as e:
+            print(f"Service request {self.path} failed: {e}")
+            try:
+                self.send_error_json(500, f"Internal error: {e}")
+            except OSError:
+                # The client is gone
+                pass
+    
+    def stream_events(self, job, start):
+        # One JSON object per line, written as it happens; the connection closes
+        # after the final state
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            while True:
+                events = job.events_from(start)
+                if events is None:
+                    break
+                if not events:
+                    # A blank line while a long decode runs keeps the client's read from timing out
+                    self.wfile.write(b"\n")
+                for event in events:
+                    self.wfile.write((to_json(event) + "\n").encode("utf-8"))
+                start += len(events)
+                self.wfile.flush()
+        except OSError:
+            # The client went away; the job carries on
+            pass
+
+
+class ServiceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, service, host="127.0.0.1", port=DEFAULT_PORT):
+        self.service = service
+        super().__init__((host, port), ServiceRequestHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local transcription service the tools can use")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--engine", default="whisper", choices=WHISPER_ENGINES)
+    parser.add_argument("--preload", nargs="*", default=["base"], help="Models to load before serving")
+    parser.add_argument("--max-queued", type=int, default=MAX_QUEUED)
+    parser.add_argument("--max-utterances", type=int, default=MAX_UTTERANCES,
+                        help="Live utterances decoded at once")
+    args = parser.parse_args()
+    
+    service = TranscriptionService(args.max_queued, args.max_utterances)
+    for model_name in args.preload:
+        print(f"Loading {args.engine} {model_name}...")
+        service.utterance_engine(args.engine, {"model_name": model_name})
+    
+    server = ServiceServer(service, args.host, args.port)
+    print(f"Transcription service on http://{args.host}:{args.port} "
+          f"({get_cpu_scheduler().parallel_jobs} parallel job(s))")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import json
+import os
+import time
+import urllib.parse
+
+from transcriptor_core.cancellation import JobCancelled, current_token
+from transcriptor_core.config import load_config
+from transcriptor_core.engines import ENGINES, EngineError, TranscriptionEngine
+from transcriptor_core.lazy_import import lazy_import
+from transcriptor_core.presets import DEFAULT_LIVE_PRESET
+
+urllib_request = lazy_import("urllib.request")
+urllib_error = lazy_import("urllib.error")
+
+# Client side of the local transcription service (see service.py). The tools
+# import this at startup, so urllib is only loaded once a job is handed over.
+DEFAULT_PORT = 8766
+DEFAULT_URL = f"http://127.0.0.1:{DEFAULT_PORT}"
+
+
+class ServiceError(Exception):
+    pass
+
+
+def _json_default(value):
+    # numpy scalars in engine segments
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def to_json(value):
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+
+class ServiceClient:
+    def __init__(self, url=DEFAULT_URL, timeout=30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+    
+    def request(self, method, path, body=None, content_type="application/json", timeout=None):
+        if body is not None and content_type == "application/json":
+            body = to_json(body).encode("utf-8")
+        request = urllib_request.Request(self.url + path, data=body, method=method,
+                                         headers={"Content-Type": content_type})
+        try:
+            with urllib_request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read())
+        except urllib_error.HTTPError as e:
+            try:
+                message = json.loads(e.read())["error"]
+            except Exception:
+                message = str(e)
+            raise ServiceError(message)
+        except (urllib_error.URLError, OSError) as e:
+            raise ServiceError(f"Transcription service unreachable at {self.url}: {e}")
+    
+    def status(self, timeout=None):
+        return self.request("GET", "/status", timeout=timeout)
+    
+    def submit(self, path, engine="whisper", options=None, language="en"):
+        return self.request("POST", "/jobs", {"path": os.path.abspath(path), "engine": engine,
+                                              "options": options or {}, "language": language})["id"]
+    
+    def job(self, job_id):
+        return self.request("GET", f"/jobs/{job_id}")
+    
+    def cancel(self, job_id):
+        return self.request("POST", f"/jobs/{job_id}/cancel")
+    
+    def events(self, job_id, start=0):
+        # Yields events as the service sends them; reconnects if the stream drops mid-job
+        while True:
+            try:
+                with urllib_request.urlopen(f"{self.url}/jobs/{job_id}/events?from={start}",
+                                            timeout=self.timeout) as response:
+                    for line in response:
+                        if not line.strip():
+                            continue
+                        event = json.loads(line)
+                        start += 1
+                        yield event
+                        if "state" in event:
+                            return
+            except (urllib_error.URLError, OSError) as e:
+                if self.job(job_id)["state"] not in ("queued", "running"):
+                    return
+                print(f"Service event stream interrupted, reconnecting: {e}")
+                time.sleep(1)
+    
+    def transcribe_pcm(self, pcm, engine="whisper", model_name=None, language="en", preset=DEFAULT_LIVE_PRESET):
+        query = {"engine": engine, "language": language, "preset": preset}
+        if model_name:
+            query["model"] = model_name
+        return self.request("POST", "/transcribe?" + urllib.parse.urlencode(query), pcm,
+                            content_type="application/octet-stream")
+    
+    def detect_language(self, pcm, engine="whisper", model_name=None):
+        query = {"engine": engine}
+        if model_name:
+            query["model"] = model_name
+        return self.request("POST", "/detect?" + urllib.parse.urlencode(query), pcm,
+                            content_type="application/octet-stream")
+
+
+def find_service(config=None):
+    # The running service if the settings name one and it answers, else None so
+    # the caller transcribes in its own process
+    url = (config or load_config()).get("service_url")
+    if not url:
+        return None
+    client = ServiceClient(url)
+    try:
+        client.status(timeout=0.5)
+    except ServiceError:
+        return None
+    return client
+
+
+def run_remote_file_job(client, engine_name, options, path, language="en", on_stage=None, on_segment=None,
+                        cancel_token=None):
+    # run_file_job's counterpart for a job run by the service: same callbacks, the
+    # same cancellation and the same (result, report) return, so the tools treat
+    # both alike
+    token = cancel_token or current_token()
+    if token is not None:
+        token.check()
+    job_id = client.submit(path, engine_name, options, language)
+    if token is not None:
+        # The service stops the job at its own checkpoints and ends the event stream
+        token.on_cancel(lambda: client.cancel(job_id))
+    if on_stage is not None:
+        on_stage("Queued on the transcription service...", 20)
+    for event in client.events(job_id):
+        if "stage" in event and on_stage is not None:
+            on_stage(event["stage"], event["progress"])
+        elif "segment" in event and on_segment is not None:
+            on_segment(event["segment"])
+    job = client.job(job_id)
+    if job["state"] == "cancelled":
+        raise JobCancelled(token.reason if token is not None else "Cancelled on the service")
+    if job["state"] != "done":
+        raise EngineError(job["error"] or f"Service job {job['state']}")
+    return job["result"], job["report"]
+
+
+class RemoteEngine(TranscriptionEngine):
+    # Sends each utterance to the service, whose resident model decodes it; used
+    # by the live tool in place of a model of its own
+    capabilities = {"timestamps": False, "streaming": False, "batch": False, "multilingual": True}
+    
+    def __init__(self, client, engine_name="whisper", model_name="base"):
+        super().__init__(model_name)
+        self.client = client
+        self.name = engine_name
+        self.label = f"{ENGINES[engine_name].label} (service)"
+    
+    def describe(self):
+        return super().describe() + "@service"
+    
+    def load(self):
+        # An empty utterance makes the service load the model now rather than on the first words
+        try:
+            self.client.transcribe_pcm(b"", self.name, self.model_name)
+        except ServiceError as e:
+            raise EngineError(str(e))
+        self.model = self.client.url
+        return self
+    
+    def transcribe(self, samples, language="en", preset=None):
+        from transcriptor_core.audio_io import float_to_pcm16
+        try:
+            response = self.client.transcribe_pcm(float_to_pcm16(samples), self.name, self.model_name,
+                                                  language, preset or DEFAULT_LIVE_PRESET)
+        except ServiceError as e:
+            raise EngineError(str(e))
+        return {"text": response["text"], "segments": response["segments"], "language": language}
+    
+    def detect_language(self, samples):
+        from transcriptor_core.audio_io import float_to_pcm16
+        try:
+            response = self.client.detect_language(float_to_pcm16(samples), self.name, self.model_name)
+        except ServiceError as e:
+            raise EngineError(str(e))
+        return response["language"], response["probability"]
@@ -0,0 +1,114 @@
+import os
+import json
+import subprocess
+import time
+
+# Compressed formats supported for session recordings (ffmpeg codec arguments)
+RECORDING_FORMATS = {
+    "flac": {"extension": ".flac", "codec_args": ["-c:a", "flac", "-compression_level", "5"]},
+    "opus": {"extension": ".opus", "codec_args": ["-c:a", "libopus", "-b:a", "24k", "-application", "voip"]},
+}
+
+INDEX_SUFFIX = ".index.jsonl"
+
+
+class SessionRecorder:
+    # Streams raw PCM capture into a compressed file through ffmpeg and keeps a
+    # JSONL index that maps every finalized transcript line to its audio offset.
+    def __init__(self, output_path, rate=16000, channels=1, sample_width=2, audio_format="flac"):
+        if audio_format not in RECORDING_FORMATS:
+            raise ValueError(f"Unsupported recording format: {audio_format}")
+        
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.audio_format = audio_format
+        self.output_path = os.path.splitext(output_path)[0] + RECORDING_FORMATS[audio_format]["extension"]
+        self.index_path = self.output_path + INDEX_SUFFIX
+        self.samples_written = 0
+        self.process = None
+        
+        # ffmpeg encodes incrementally, so memory use stays flat for all-day sessions
+        command = [
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+            "-f", f"s{sample_width * 8}le", "-ar", str(rate), "-ac", str(channels),
+            "-i", "pipe:0",
+        ] + RECORDING_FORMATS[audio_format]["codec_args"] + [self.output_path]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        
+        # The first index line describes the recording itself
+        self._append_index({
+            "recording": os.path.basename(self.output_path),
+            "format": audio_format,
+            "rate": rate,
+            "channels": channels,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+    
+    def write(self, data):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.write(data)
+            self.samples_written += len(data) // (self.sample_width * self.channels)
+        except (BrokenPipeError, OSError) as e:
+            print(f"Session recording error: {e}")
+            self.close_audio()
+    
+    def add_entry(self, start_sample, end_sample, engine, text):
+        if not text:
+            return
+        self._append_index({
+            "start_ms": int(start_sample * 1000 / self.rate),
+            "end_ms": int(end_sample * 1000 / self.rate),
+            "engine": engine,
+            "text": text,
+        })
+    
+    def _append_index(self, entry):
+        # Append and flush line by line so a crash never loses finalized captions
+        with open(self.index_path, "a", encoding="utf-8") as index_file:
+            index_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    
+    def close_audio(self):
+        if self.process is None:
+            return
+        process = self.process
+        self.process = None
+        try:
+            process.stdin.close()
+            process.wait(timeout=10)
+        except Exception as e:
+            print(f"Warning: Could not finalize session recording: {e}")
+            process.kill()
+
+
+def load_index(index_path):
+    # Returns (header, entries) for a session index file
+    header = None
+    entries = []
+    with open(index_path, "r", encoding="utf-8") as index_file:
+        for line in index_file:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if header is None and "recording" in entry:
+                header = entry
+            else:
+                entries.append(entry)
+    return header, entries
+
+
+def extract_clip(recording_path, start_ms, end_ms, output_path, padding_ms=250):
+    # Input-side -ss lets ffmpeg use the FLAC seek table / Ogg page bisection,
+    # so only the requested span is decoded instead of the whole recording
+    start = max(0, start_ms - padding_ms) / 1000.0
+    duration = (end_ms - start_ms + 2 * padding_ms) / 1000.0
+    subprocess.run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-ss", f"{start:.3f}", "-i", recording_path, "-t", f"{duration:.3f}",
+        output_path,
+    ], check=True)
+    return output_path
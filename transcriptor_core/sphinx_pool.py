@@ -0,0 +1,200 @@
+import argparse
+import contextlib
+import os
+import queue
+import threading
+import time
+
+from transcriptor_core.lazy_import import lazy_import
+from transcriptor_core.cancellation import POLL_SECONDS, JobCancelled, checkpoint
+
+sr = lazy_import("speech_recognition")
+
+# recognize_sphinx builds a fresh pocketsphinx decoder for every call, reading the
+# acoustic model, dictionary and language model from disk each time. The pool keeps
+# decoders warm instead: a decoder is created the first time it is needed and is
+# then handed from call to call, so there are only ever as many as calls that ran
+# at once. A decoder is not thread-safe, so each is held by one caller at a time.
+POOL_SIZE = 4
+
+
+def sphinx_data_paths(language="en-US"):
+    # The model files SpeechRecognition ships, laid out as recognize_sphinx expects
+    language_directory = os.path.join(os.path.dirname(os.path.realpath(sr.__file__)), "pocketsphinx-data", language)
+    paths = (
+        os.path.join(language_directory, "acoustic-model"),
+        os.path.join(language_directory, "language-model.lm.bin"),
+        os.path.join(language_directory, "pronounciation-dictionary.dict"),
+    )
+    if not os.path.isdir(paths[0]) or not all(os.path.isfile(path) for path in paths[1:]):
+        raise sr.RequestError(f"missing PocketSphinx language data directory: \"{language_directory}\"")
+    return paths
+
+
+def new_decoder(language="en-US", keyword_file=None):
+    try:
+        from pocketsphinx import pocketsphinx
+    except ImportError:
+        raise sr.RequestError("missing PocketSphinx module: ensure that PocketSphinx is set up correctly.")
+    acoustic_model, language_model, dictionary = sphinx_data_paths(language)
+    config = pocketsphinx.Config()
+    config.set_string("-hmm", acoustic_model)
+    if keyword_file is not None:
+        # Keyword spotting searches only for the listed phrases; the language model is never loaded
+        config.set_string("-kws", keyword_file)
+    else:
+        config.set_string("-lm", language_model)
+    config.set_string("-dict", dictionary)
+    config.set_string("-logfn", os.devnull)
+    return pocketsphinx.Decoder(config)
+
+
+def decode_utterance(decoder, pcm):
+    # 16 kHz mono 16-bit PCM as one utterance; returns the hypothesis text or None
+    decoder.start_utt()
+    decoder.process_raw(pcm, False, True)
+    decoder.end_utt()
+    hypothesis = decoder.hyp()
+    return hypothesis.hypstr if hypothesis is not None else None
+
+
+class DecoderPool:
+    def __init__(self, language="en-US", size=POOL_SIZE, keyword_file=None):
+        self.language = language
+        self.keyword_file = keyword_file
+        self.size = size
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+    
+    def warm_count(self):
+        with self.lock:
+            return self.created
+    
+    def take(self):
+        while True:
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self.lock:
+                create = self.created < self.size
+                if create:
+                    self.created += 1
+            if create:
+                try:
+                    return new_decoder(self.language, self.keyword_file)
+                except Exception:
+                    with self.lock:
+                        self.created -= 1
+                    raise
+            
+            # Every decoder is in use. A holder that fails frees its place rather
+            # than handing a decoder back, so look at the count again now and then.
+            checkpoint()
+            try:
+                return self.idle.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                pass
+    
+    @contextlib.contextmanager
+    def decoder(self):
+        decoder = self.take()
+        try:
+            yield decoder
+        except JobCancelled:
+            # Cancellation lands between blocks and spot() ends the utterance on
+            # the way out, so the decoder is still good
+            self.idle.put(decoder)
+            raise
+        except Exception:
+            # A decoder that failed mid-utterance may be left in a bad state
+            with self.lock:
+                self.created -= 1
+            raise
+        else:
+            self.idle.put(decoder)
+    
+    def clear(self):
+        # Idle decoders are freed; ones in use are dropped when handed back
+        while True:
+            try:
+                self.idle.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                self.created -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_decoder_pool(language="en-US", keyword_file=None):
+    # One pool per language for transcription and one per keyphrase list for spotting
+    key = (language, keyword_file)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = DecoderPool(language, keyword_file=keyword_file)
+            _pools[key] = pool
+        return pool
+
+
+def measure_latency(path, utterances=20, language="en-US"):
+    # Per-utterance latency with a new decoder per call (the old recognize_sphinx
+    # behaviour) versus a warm pooled decoder, on utterances cut from one file
+    from transcriptor_core.audio_io import load_audio, float_to_pcm16
+    from transcriptor_core.latency import percentile
+    from transcriptor_core.live_pipeline import SilenceSegmenter
+    
+    segmenter = SilenceSegmenter(max_duration=10.0)
+    pieces = segmenter.feed_bytes(float_to_pcm16(load_audio(path)))
+    final = segmenter.flush()
+    if final is not None:
+        pieces.append(final)
+    pcms = [b"".join(frames) for frames, _ in pieces][:utterances]
+    if not pcms:
+        raise ValueError(f"No utterances found in {path}")
+    
+    pool = DecoderPool(language, size=1)
+    with pool.decoder():
+        pass  # The first load is paid once per process, outside the measurement
+    
+    results = {}
+    for label in ("cold", "warm"):
+        latencies = []
+        for pcm in pcms:
+            started = time.perf_counter()
+            if label == "cold":
+                decode_utterance(new_decoder(language), pcm)
+            else:
+                with pool.decoder() as decoder:
+                    decode_utterance(decoder, pcm)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+        latencies.sort()
+        results[label] = {
+            "utterances": len(latencies),
+            "mean_ms": round(sum(latencies) / len(latencies), 1),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-utterance Sphinx latency with and without warm decoders")
+    parser.add_argument("audio_path")
+    parser.add_argument("--utterances", type=int, default=20)
+    args = parser.parse_args()
+    
+    results = measure_latency(args.audio_path, args.utterances)
+    for label, entry in results.items():
+        print(f"{label}: {entry['utterances']} utterances, mean {entry['mean_ms']:.1f} ms, "
+              f"p50 {entry['p50_ms']:.1f} ms, p95 {entry['p95_ms']:.1f} ms")
+    saved = results["cold"]["mean_ms"] - results["warm"]["mean_ms"]
+    print(f"Warm decoders save {saved:.1f} ms per utterance")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import atexit
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Lightweight spans for finding where a slow job spent its time. Disabled by
+# default; when off, span() costs one attribute check. Exports the Chrome trace
+# event format, which chrome://tracing and ui.perfetto.dev both open, with one
+# row per thread so overlap and idle gaps between stages are visible.
+#
+# Set TRANSCRIPTOR_TRACE=/path/trace.json to trace from startup and save on exit.
+
+MAX_EVENTS = 200000
+
+_enabled = False
+_events = deque(maxlen=MAX_EVENTS)
+_thread_names = {}
+_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def clear():
+    with _lock:
+        _events.clear()
+        _thread_names.clear()
+
+
+def event_count():
+    with _lock:
+        return len(_events)
+
+
+def _microseconds(perf_counter_value):
+    return int(perf_counter_value * 1000000)
+
+
+def _thread_id():
+    thread = threading.current_thread()
+    thread_id = threading.get_native_id() if hasattr(threading, "get_native_id") else threading.get_ident()
+    if thread_id not in _thread_names:
+        _thread_names[thread_id] = thread.name
+    return thread_id
+
+
+def add_span(name, start, end, category="transcriptor", **args):
+    # Complete event from two time.perf_counter() values taken elsewhere
+    if not _enabled:
+        return
+    with _lock:
+        _events.append({
+            "name": name, "cat": category, "ph": "X",
+            "ts": _microseconds(start), "dur": max(0, _microseconds(end) - _microseconds(start)),
+            "pid": _pid, "tid": _thread_id(), "args": args,
+        })
+
+
+def instant(name, category="transcriptor", **args):
+    if not _enabled:
+        return
+    with _lock:
+        _events.append({
+            "name": name, "cat": category, "ph": "i", "s": "t",
+            "ts": _microseconds(time.perf_counter()), "pid": _pid, "tid": _thread_id(), "args": args,
+        })
+
+
+@contextlib.contextmanager
+def span(name, category="transcriptor", **args):
+    if not _enabled:
+        yield args
+        return
+    start = time.perf_counter()
+    try:
+        # Callers may add details (segment counts, sizes) to the dict while inside
+        yield args
+    finally:
+        add_span(name, start, time.perf_counter(), category, **args)
+
+
+def export(path):
+    with _lock:
+        events = list(_events)
+        names = dict(_thread_names)
+    metadata = [{"name": "process_name", "ph": "M", "pid": _pid, "args": {"name": "Transcriptor"}}]
+    metadata += [
+        {"name": "thread_name", "ph": "M", "pid": _pid, "tid": thread_id, "args": {"name": thread_name}}
+        for thread_id, thread_name in names.items()
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+    return len(events)
+
+
+def _export_at_exit(path):
+    try:
+        count = export(path)
+        print(f"Wrote {count} trace events to {path}")
+    except Exception as e:
+        print(f"Warning: Could not write trace to {path}: {e}")
+
+
+if os.environ.get("TRANSCRIPTOR_TRACE"):
+    enable()
+    atexit.register(_export_at_exit, os.environ["TRANSCRIPTOR_TRACE"])
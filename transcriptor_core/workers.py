@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from transcriptor_core.cancellation import JobCancelled
+from transcriptor_core.cpu_scheduler import get_cpu_scheduler
+
+# One worker pool for file transcription jobs across every tool in the process
+MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+# Futures not yet finished, so shutdown() can drop the queued ones
+_pending = set()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="transcriptor-job")
+        return _executor
+
+
+def submit_job(fn, *args, **kwargs):
+    future = get_executor().submit(fn, *args, **kwargs)
+    with _executor_lock:
+        _pending.add(future)
+    future.add_done_callback(_forget)
+    return future
+
+
+def _forget(future):
+    with _executor_lock:
+        _pending.discard(future)
+
+
+def submit_cpu_job(fn, *args, uses_torch=True, on_wait=None, cancel_token=None):
+    # Heavy jobs take a CPU slot first, so concurrent jobs split the cores
+    # instead of each starting a full set of intra-op threads
+    def run():
+        started = False
+        try:
+            with get_cpu_scheduler().job_slot(uses_torch=uses_torch, on_wait=on_wait,
+                                              cancel_token=cancel_token):
+                started = True
+                return fn(*args)
+        except JobCancelled:
+            if started:
+                raise
+        # Cancelled while waiting for a slot; fn checks its token first thing and
+        # does its own cleanup without taking a slot
+        return fn(*args)
+    return submit_job(run)
+
+
+def shutdown(wait=False):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            return
+        executor = _executor
+        _executor = None
+        pending = list(_pending)
+    # shutdown(cancel_futures=True) needs Python 3.9; cancel() only stops jobs
+    # that have not started, which is the same thing
+    for future in pending:
+        future.cancel()
+    executor.shutdown(wait=wait)
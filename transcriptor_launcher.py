@@ -1,9 +1,13 @@
 import os
 import tkinter as tk
-from tkinter import ttk, font
+from tkinter import ttk, font, filedialog, messagebox
 import importlib.util
 import sys
 
+from transcriptor_core import workers, tracing
+from transcriptor_core.config import load_config, remember_tool, predicted_model
+from transcriptor_core.prewarm import PrewarmService
+
 # Custom color scheme
 COLORS = {
     "primary_red": "#C41E3A",      # Cardinal red - primary color
@@ -16,63 +20,44 @@ COLORS = {
     "hover_red": "#D32C47"         # Slightly lighter red for hover effects
 }
 
-def launch_audio_transcriptor():
-    # Load the audio_transcriptor.py module dynamically
-    audio_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                                 "audio_transcriptor", "audio_transcriptor.py")
-    
-    # Import the module dynamically
-    spec = importlib.util.spec_from_file_location("audio_transcriptor", audio_file_path)
-    audio_module = importlib.util.module_from_spec(spec)
-    sys.modules["audio_transcriptor"] = audio_module
-    spec.loader.exec_module(audio_module)
-    
-    # Create a new window and application
-    root = tk.Tk()
-    app = audio_module.AudioTranscriptorApp(root)
-    root.mainloop()
+# Tools hosted by the launcher: key -> (folder/module name, app class, tab title)
+TOOLS = {
+    "audio": ("audio_transcriptor", "AudioTranscriptorApp", "Audio Transcriptor"),
+    "video": ("video_transcriptor", "VideoTranscriptorApp", "Video Transcriptor"),
+    "live": ("live_transcriptor", "LiveTranscriptorApp", "Live Transcriptor"),
+    "search": ("transcript_search", "TranscriptSearchApp", "Transcript Search"),
+}
 
-def launch_video_transcriptor():
-    # Load the video_transcriptor.py module dynamically
-    video_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                                 "video_transcriptor", "video_transcriptor.py")
-    
-    # Import the module dynamically
-    spec = importlib.util.spec_from_file_location("video_transcriptor", video_file_path)
-    video_module = importlib.util.module_from_spec(spec)
-    sys.modules["video_transcriptor"] = video_module
-    spec.loader.exec_module(video_module)
-    
-    # Create a new window and application
-    root = tk.Tk()
-    app = video_module.VideoTranscriptorApp(root)
-    root.mainloop()
+_tool_modules = {}
 
-def launch_live_transcriptor():
-    # Load the live_transcriptor.py module dynamically
-    live_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                                 "live_transcriptor", "live_transcriptor.py")
+def load_tool_module(module_name):
+    # Load each tool module from its folder once per process
+    if module_name in _tool_modules:
+        return _tool_modules[module_name]
     
-    # Import the module dynamically
-    spec = importlib.util.spec_from_file_location("live_transcriptor", live_file_path)
-    live_module = importlib.util.module_from_spec(spec)
-    sys.modules["live_transcriptor"] = live_module
-    spec.loader.exec_module(live_module)
+    module_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                               module_name, f"{module_name}.py")
     
-    # Create a new window and application
-    root = tk.Tk()
-    app = live_module.LiveTranscriptorApp(root)
-    root.protocol("WM_DELETE_WINDOW", app.on_closing)
-    root.mainloop()
+    # Import the module dynamically
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    _tool_modules[module_name] = module
+    return module
 
 class TranscriptorLauncherApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Transcriptor Suite")
-        self.root.geometry("650x950")
+        self.root.geometry("800x950")
         self.root.resizable(True, True)
         self.root.configure(bg=COLORS["white"])
         
+        # Tools opened so far; they stay alive in their tabs until the launcher closes
+        self.tool_apps = {}
+        self.tool_tabs = {}
+        
         # Set icon if available
         try:
             self.root.iconbitmap("icon.ico")
@@ -84,6 +69,15 @@ class TranscriptorLauncherApp:
         
         # Create widgets
         self.create_widgets()
+        
+        # Load the most likely model while the user reads the cards
+        self.config = load_config()
+        self.prewarm = PrewarmService(
+            memory_budget_mb=self.config["prewarm_memory_budget_mb"],
+            on_status=lambda message: self.root.after(0, self.prewarm_var.set, message)
+        )
+        if self.config["prewarm_enabled"]:
+            self.root.after(300, self.prewarm.start, predicted_model(self.config))
     
     def configure_styles(self):
         # Create custom styles for widgets
@@ -143,9 +137,13 @@ class TranscriptorLauncherApp:
                       foreground=[("active", COLORS["primary_red"])])
     
     def create_widgets(self):
+        # Every tool gets a tab next to the home page, all in this one process
+        self.notebook = ttk.Notebook(self.root)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+        
         # Main container frame
-        main_frame = ttk.Frame(self.root, style="Main.TFrame", padding=20)
-        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame = ttk.Frame(self.notebook, style="Main.TFrame", padding=20)
+        self.notebook.add(main_frame, text="Home")
         
         # Header section
         header_frame = ttk.Frame(main_frame, style="Main.TFrame")
@@ -206,10 +204,35 @@ class TranscriptorLauncherApp:
             is_new=True
         )
         
+        # Transcript Search card
+        self.create_app_card(
+            cards_frame,
+            "Transcript Search",
+            "Find where a phrase was said across every transcript.\nResults show the file and the time offset.",
+            self.open_transcript_search
+        )
+        
         # Footer
         footer_frame = ttk.Frame(main_frame, style="Main.TFrame")
         footer_frame.pack(fill=tk.X, pady=10)
         
+        # Stage tracing, switchable while jobs run
+        trace_frame = ttk.Frame(footer_frame, style="Main.TFrame")
+        trace_frame.pack(side=tk.BOTTOM, pady=(0, 5))
+        
+        self.trace_var = tk.BooleanVar(value=tracing.is_enabled())
+        trace_check = ttk.Checkbutton(trace_frame, text="Record trace", variable=self.trace_var,
+                                      command=self.toggle_tracing)
+        trace_check.pack(side=tk.LEFT, padx=5)
+        
+        save_trace_button = ttk.Button(trace_frame, text="Save Trace...", command=self.save_trace)
+        save_trace_button.pack(side=tk.LEFT, padx=5)
+        
+        # Pre-warm status
+        self.prewarm_var = tk.StringVar(value="")
+        prewarm_label = ttk.Label(footer_frame, textvariable=self.prewarm_var, style="Footer.TLabel")
+        prewarm_label.pack(side=tk.BOTTOM, pady=(0, 5))
+        
         footer_text = "Powered by OpenAI Whisper and CMU Sphinx • ItsAeox • 2025"
         footer_label = ttk.Label(footer_frame, text=footer_text, style="Footer.TLabel", justify="center")
         footer_label.pack(side=tk.BOTTOM)
@@ -257,19 +280,78 @@ class TranscriptorLauncherApp:
         )
         launch_button.pack(pady=(0, 5))
     
+    def open_tool(self, key):
+        # Switching back to an open tool is instant: its models and state are still there
+        if key not in self.tool_apps:
+            # Only tools that run a model steer the pre-warm (search has none)
+            uses_model = key in self.config["last_models"]
+            if uses_model:
+                remember_tool(key)
+            
+            # Re-aim the pre-warm if this tool usually runs a different model
+            if self.config["prewarm_enabled"] and uses_model:
+                model_name = predicted_model(self.config, key)
+                if self.prewarm.model_name != model_name:
+                    self.prewarm.start(model_name)
+            
+            module_name, class_name, title = TOOLS[key]
+            module = load_tool_module(module_name)
+            
+            tab = ttk.Frame(self.notebook, style="Main.TFrame")
+            self.notebook.add(tab, text=title)
+            self.tool_tabs[key] = tab
+            self.tool_apps[key] = getattr(module, class_name)(self.root, container=tab)
+        
+        self.notebook.select(self.tool_tabs[key])
+    
     def open_audio_transcriptor(self):
-        self.root.destroy()
-        launch_audio_transcriptor()
+        self.open_tool("audio")
     
     def open_video_transcriptor(self):
-        self.root.destroy()
-        launch_video_transcriptor()
+        self.open_tool("video")
     
     def open_live_transcriptor(self):
+        self.open_tool("live")
+    
+    def open_transcript_search(self):
+        self.open_tool("search")
+    
+    def toggle_tracing(self):
+        if self.trace_var.get():
+            tracing.enable()
+        else:
+            tracing.disable()
+    
+    def save_trace(self):
+        file_path = filedialog.asksaveasfilename(
+            title="Save Trace As",
+            defaultextension=".json",
+            filetypes=[("Chrome trace", "*.json"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        try:
+            count = tracing.export(file_path)
+            messagebox.showinfo("Trace Saved",
+                                f"Saved {count} events to:\n{file_path}\n\nOpen it in ui.perfetto.dev or chrome://tracing.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not save trace:\n{str(e)}")
+    
+    def on_closing(self):
+        self.prewarm.cancel()
+        
+        # Let tools stop recording and servers before the window goes away
+        for app in self.tool_apps.values():
+            if hasattr(app, "shutdown"):
+                try:
+                    app.shutdown()
+                except Exception as e:
+                    print(f"Error shutting down tool: {e}")
+        workers.shutdown()
         self.root.destroy()
-        launch_live_transcriptor()
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = TranscriptorLauncherApp(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
\ No newline at end of file